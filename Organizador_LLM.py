@@ -21,14 +21,286 @@ Exemplo de uso:
 
 from pathlib import Path
 from datetime import datetime
+import filecmp
+import itertools
 import shutil
-from typing import Optional, List, Dict, Any
+from typing import Optional, Iterable, List, Dict, Any
+import threading
+import time
+import errno
+import json
+import os
 import sys
 
+from cache_metadados import CAMINHO_PADRAO as CACHE_PADRAO, CacheMetadados
+from deduplicacao import EstatisticasHash, encontrar_duplicatas
+from diario import DiarioMovimentos
+from estatisticas import EstatisticasArquivos
+from metadados_midia import CRITERIOS_MIDIA, data_midia
+from eventos import Eventos, SaidaEmoji, criar_eventos
+from varredura import Entrada, varrer, varrer_arvore
+from vigia import VigiaPasta
+
+# Critérios de data obtidos diretamente do stat
+CRITERIOS_STAT = ("modificacao", "criacao", "acesso")
+
+# Threads mínimas para ler metadados de mídia (leituras pequenas, limitadas por latência)
+WORKERS_MIDIA = 8
+
+# Marca o fim do iterador compartilhado em _executar_tarefas
+_FIM = object()
+
+# Temporários de cópias entre dispositivos: .<nome>.<pid>.organizando
+SUFIXO_TEMPORARIO = ".organizando"
+
+
+def _carregar_renomear_exclusivo():
+    """
+    rename que falha com FileExistsError em vez de substituir o destino
+    
+    Linux: renameat2 com RENAME_NOREPLACE; macOS: renamex_np com
+    RENAME_EXCL; Windows: os.rename, que já não sobrescreve. None se o
+    sistema não tiver nenhum deles.
+    """
+    if sys.platform == "win32":
+        return os.rename
+    import ctypes
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return None
+    if hasattr(libc, "renameat2"):
+        AT_FDCWD, RENAME_NOREPLACE = -100, 1
+        funcao = libc.renameat2
+        
+        def chamar(origem: bytes, destino: bytes) -> int:
+            return funcao(AT_FDCWD, origem, AT_FDCWD, destino, RENAME_NOREPLACE)
+    elif hasattr(libc, "renamex_np"):
+        RENAME_EXCL = 4
+        funcao = libc.renamex_np
+        
+        def chamar(origem: bytes, destino: bytes) -> int:
+            return funcao(origem, destino, RENAME_EXCL)
+    else:
+        return None
+    
+    def renomear(origem, destino):
+        if chamar(os.fsencode(origem), os.fsencode(destino)) != 0:
+            erro = ctypes.get_errno()
+            raise OSError(erro, os.strerror(erro), str(destino))
+    return renomear
+
+
+_renomear_exclusivo = _carregar_renomear_exclusivo()
+
+
+def _temporario_abandonado(entrada: Entrada) -> bool:
+    """Se o temporário .nome.PID.organizando sobrou de uma execução interrompida"""
+    pid = entrada.nome[:-len(SUFIXO_TEMPORARIO)].rpartition(".")[2]
+    if not pid.isdigit():
+        return False
+    if sys.platform == "win32":
+        # Lá os.kill encerraria o processo em vez de testá-lo: vale a idade
+        st = entrada.stat
+        return time.time() - getattr(st, "st_birthtime", st.st_ctime) > 86400
+    if int(pid) == os.getpid():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        pass  # existe, mas é de outro usuário
+    return False
+
+
+class ItemPlano:
+    """Registro compacto de uma movimentação planejada"""
+    
+    __slots__ = ("origem", "destino", "tamanho", "timestamp", "duplicata_de")
+    
+    def __init__(self, origem: str, destino: str, tamanho: int, timestamp: float,
+                 duplicata_de: Optional[str] = None):
+        self.origem = origem
+        self.destino = destino
+        self.tamanho = tamanho
+        self.timestamp = timestamp
+        # Origem do arquivo de conteúdo idêntico que será mantido
+        self.duplicata_de = duplicata_de
+    
+    def registro(self) -> list:
+        """Linha do item no formato JSONL do plano"""
+        registro = [self.origem, self.destino, self.tamanho, self.timestamp]
+        if self.duplicata_de:
+            registro.append(self.duplicata_de)
+        return registro
+    
+    def __repr__(self) -> str:
+        return f"ItemPlano({self.origem!r} → {self.destino!r})"
+
+
+class Plano:
+    """
+    Plano de organização: lista de movimentações calculadas na simulação
+    
+    Pode ser salvo em disco (JSONL), revisado e executado depois sem
+    varrer a pasta novamente.
+    
+    Formato do arquivo:
+        1ª linha: {"pasta": ..., "criterio": ..., "formato": ..., ...}
+        demais:   [origem, destino, tamanho, timestamp(, duplicata_de)]
+    """
+    
+    def __init__(self, pasta: Path, criterio: str = "modificacao", formato: str = "%Y-%m"):
+        self.pasta = Path(pasta)
+        self.criterio = criterio
+        self.formato = formato
+        self.itens: List[ItemPlano] = []
+        self.pastas_novas = 0
+        self.ignorados = 0
+        self.erros = 0
+        # Deduplicação: None, "pular", "hardlink" ou "relatorio"
+        self.deduplicacao: Optional[str] = None
+        self.hash_mb_por_s = 0.0
+    
+    def adicionar(self, origem: Path, destino: Path, tamanho: int, timestamp: float):
+        """Acrescenta uma movimentação ao plano"""
+        self.itens.append(ItemPlano(str(origem), str(destino), tamanho, timestamp))
+    
+    def __len__(self) -> int:
+        return len(self.itens)
+    
+    def __iter__(self):
+        return iter(self.itens)
+    
+    def estatisticas(self) -> Dict[str, int]:
+        """Estatísticas no mesmo formato de processar_pasta (simulação)"""
+        stats = {
+            "arquivos_processados": len(self.itens),
+            "arquivos_movidos": 0,
+            "pastas_criadas": self.pastas_novas,
+            "erros": self.erros,
+            "arquivos_ignorados": self.ignorados
+        }
+        if self.deduplicacao:
+            duplicatas = [i for i in self.itens if i.duplicata_de]
+            stats["duplicatas"] = len(duplicatas)
+            stats["bytes_duplicados"] = sum(i.tamanho for i in duplicatas)
+            stats["bytes_economizados"] = 0
+            stats["hash_mb_por_s"] = round(self.hash_mb_por_s, 1)
+        return stats
+    
+    def cabecalho(self) -> Dict[str, Any]:
+        """Primeira linha do formato JSONL do plano"""
+        return {
+            "pasta": str(self.pasta),
+            "criterio": self.criterio,
+            "formato": self.formato,
+            "pastas_novas": self.pastas_novas,
+            "ignorados": self.ignorados,
+            "erros": self.erros,
+            "deduplicacao": self.deduplicacao
+        }
+    
+    def salvar(self, caminho: str):
+        """Grava o plano em disco no formato JSONL"""
+        with open(Path(caminho).expanduser(), "w", encoding="utf-8") as f:
+            f.write(json.dumps(self.cabecalho(), ensure_ascii=False) + "\n")
+            for item in self.itens:
+                f.write(json.dumps(item.registro(), ensure_ascii=False) + "\n")
+    
+    @classmethod
+    def de_registros(cls, cabecalho: Dict[str, Any], registros) -> "Plano":
+        """Monta um plano a partir do cabeçalho e das linhas de itens"""
+        plano = cls(Path(cabecalho["pasta"]),
+                    cabecalho.get("criterio", "modificacao"),
+                    cabecalho.get("formato", "%Y-%m"))
+        plano.pastas_novas = cabecalho.get("pastas_novas", 0)
+        plano.ignorados = cabecalho.get("ignorados", 0)
+        plano.erros = cabecalho.get("erros", 0)
+        plano.deduplicacao = cabecalho.get("deduplicacao")
+        plano.itens = [ItemPlano(*registro) for registro in registros]
+        return plano
+    
+    @classmethod
+    def carregar(cls, caminho: str) -> "Plano":
+        """Lê um plano gravado por salvar()"""
+        with open(Path(caminho).expanduser(), encoding="utf-8") as f:
+            cabecalho = json.loads(f.readline())
+            return cls.de_registros(cabecalho, (json.loads(linha) for linha in f if linha.strip()))
+
+
+class _IndiceNomes:
+    """
+    Nomes ocupados em uma pasta de destino
+    
+    Carregado com um único scandir na primeira reserva e atualizado a cada
+    arquivo que chega, de modo que colisões (IMG_0001.jpg de várias
+    câmeras) são resolvidas em memória, sem um exists() por tentativa.
+    O mesmo scandir remove os temporários de cópia deixados por execuções
+    interrompidas.
+    """
+    
+    # Sistemas de arquivos que não diferenciam maiúsculas de minúsculas
+    _SEM_CAIXA = sys.platform in ("win32", "darwin")
+    
+    def __init__(self, pasta: Path):
+        self.pasta = pasta
+        self._trava = threading.Lock()
+        self._ocupados: Optional[set] = None
+        self._proximo_sufixo: Dict[str, int] = {}
+    
+    def _chave(self, nome: str) -> str:
+        return nome.casefold() if self._SEM_CAIXA else nome
+    
+    def reservar(self, nome: str) -> Path:
+        """Marca e devolve o primeiro nome livre: nome, nome_1, nome_2..."""
+        with self._trava:
+            if self._ocupados is None:
+                self._ocupados = set()
+                try:
+                    for entrada in varrer(self.pasta):
+                        if (entrada.nome.endswith(SUFIXO_TEMPORARIO)
+                                and _temporario_abandonado(entrada)):
+                            try:
+                                os.remove(entrada.caminho)
+                                continue
+                            except OSError:
+                                pass
+                        self._ocupados.add(self._chave(entrada.nome))
+                except FileNotFoundError:
+                    pass
+            
+            candidato = nome
+            if self._chave(candidato) in self._ocupados:
+                base = Path(nome)
+                # Continua de onde a última colisão deste nome parou
+                contador = self._proximo_sufixo.get(self._chave(nome), 1)
+                while True:
+                    candidato = f"{base.stem}_{contador}{base.suffix}"
+                    contador += 1
+                    if self._chave(candidato) not in self._ocupados:
+                        break
+                self._proximo_sufixo[self._chave(nome)] = contador
+            
+            self._ocupados.add(self._chave(candidato))
+            return self.pasta / candidato
+
+
 class Organizador:
     """Organizador inteligente de arquivos"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[CacheMetadados] = None,
+                 eventos: Optional[Eventos] = None):
+        """
+        Args:
+            cache: CacheMetadados opcional; reaproveita datas e hashes de
+                   arquivos que não mudaram desde a última execução
+            eventos: Para onde vão o progresso e os tempos por fase
+                     (padrão: a saída com emojis no terminal)
+        """
+        self.cache = cache
+        self.eventos = eventos if eventos is not None else Eventos(SaidaEmoji())
         self.estatisticas: Dict[str, int] = {}
         self.emoji_status = {
             "sucesso": "✅",
@@ -41,15 +313,8 @@ class Organizador:
     
     def obter_data_arquivo(self, arquivo: Path, criterio: str = "modificacao") -> datetime:
         """Obtém a data do arquivo baseado no critério escolhido"""
-        stat = arquivo.stat()
-        
-        mapeamento_datas = {
-            "modificacao": stat.st_mtime,
-            "criacao": stat.st_ctime,
-            "acesso": stat.st_atime
-        }
-        
-        return datetime.fromtimestamp(mapeamento_datas.get(criterio, stat.st_mtime))
+        return datetime.fromtimestamp(
+            self._timestamp_criterio(arquivo.stat(), criterio, arquivo))
     
     def criar_nome_pasta(self, data: datetime, formato: str = "%Y-%m") -> str:
         """Cria nome da pasta baseado no formato especificado"""
@@ -60,96 +325,753 @@ class Organizador:
                        criterio: str = "modificacao",
                        formato: str = "%Y-%m",
                        simular: bool = True,
-                       backup: bool = False) -> Dict[str, int]:
+                       backup: bool = False,
+                       workers: int = 1,
+                       recursivo: bool = False,
+                       incluir: Optional[List[str]] = None,
+                       excluir: Optional[List[str]] = None,
+                       profundidade_max: Optional[int] = None,
+                       deduplicar: Optional[str] = None,
+                       diario: Optional[DiarioMovimentos] = None) -> Dict[str, int]:
         """
         Processa todos os arquivos na pasta especificada
         
+        Equivale a planejar() seguido de executar_plano() quando simular=False.
+        
         Args:
             caminho: Caminho da pasta
-            criterio: "modificacao", "criacao" ou "acesso"
+            criterio: "modificacao", "criacao", "acesso", "exif", "video",
+                      "audio" ou "midia" (ver planejar)
             formato: Formato strftime para nome da pasta
             simular: Se True, apenas mostra ações sem executar
             backup: Se True, cria backup antes de mover
+            workers: Número de threads para stat/cópia/movimentação
+                     (1 = sequencial, útil em compartilhamentos de rede)
+            recursivo: Se True, organiza também os arquivos das subpastas
+            incluir: Globs de arquivos a organizar (modo recursivo)
+            excluir: Globs de arquivos/pastas a pular (modo recursivo)
+            profundidade_max: Níveis de subpastas a percorrer (modo recursivo)
+            deduplicar: None, "pular", "hardlink" ou "relatorio" (ver planejar)
+            diario: DiarioMovimentos opcional (ver executar_plano)
         
         Returns:
             Dicionário com estatísticas da operação
         """
+        plano = self.planejar(caminho, criterio, formato,
+                              workers=workers, mostrar=simular,
+                              recursivo=recursivo, incluir=incluir,
+                              excluir=excluir, profundidade_max=profundidade_max,
+                              deduplicar=deduplicar)
+        if plano is None:
+            return {}
+        if simular:
+            return plano.estatisticas()
+        return self.executar_plano(plano, backup=backup, workers=workers, diario=diario)
+    
+    def planejar(self,
+                 caminho: str,
+                 criterio: str = "modificacao",
+                 formato: str = "%Y-%m",
+                 workers: int = 1,
+                 mostrar: bool = True,
+                 recursivo: bool = False,
+                 incluir: Optional[List[str]] = None,
+                 excluir: Optional[List[str]] = None,
+                 profundidade_max: Optional[int] = None,
+                 deduplicar: Optional[str] = None,
+                 estatisticas: Optional[EstatisticasArquivos] = None,
+                 entradas: Optional[Iterable[Entrada]] = None) -> Optional["Plano"]:
+        """
+        Calcula o destino de cada arquivo sem alterar nada (simulação)
+        
+        No modo recursivo os arquivos de todas as subpastas vão para as
+        pastas de data da raiz; pastas de data já geradas e backup_* são
+        puladas automaticamente.
+        
+        Args:
+            caminho: Caminho da pasta
+            criterio: "modificacao", "criacao", "acesso" ou data da mídia:
+                      "exif", "video", "audio", "midia" (qualquer uma);
+                      sem a data no arquivo, vale a de modificação
+            formato: Formato strftime para nome da pasta
+            workers: Número de threads para obter os metadados (ao menos
+                     WORKERS_MIDIA com critérios de mídia)
+            mostrar: Se True, mostra uma linha por arquivo planejado
+            recursivo: Se True, percorre também as subpastas
+            incluir: Globs de arquivos a organizar (modo recursivo)
+            excluir: Globs de arquivos/pastas a pular (modo recursivo)
+            profundidade_max: Níveis de subpastas a percorrer (modo recursivo)
+            deduplicar: O que fazer com arquivos de conteúdo idêntico:
+                        "pular" (ficam no lugar), "hardlink" (viram links
+                        para o arquivo mantido) ou "relatorio" (só listar);
+                        None desliga a etapa de hash
+            estatisticas: EstatisticasArquivos opcional, alimentado enquanto
+                          o plano é montado; o período de cada arquivo é a
+                          pasta de data para onde ele iria
+            entradas: Arquivos a planejar, já conhecidos (ex.: modo vigia);
+                      dispensa a varredura da pasta
+        
+        Returns:
+            Plano com origem, destino, tamanho e data de cada arquivo,
+            ou None se a pasta não existir
+        """
         pasta = Path(caminho).expanduser().resolve()
         
         if not pasta.exists():
             print(f"{self.emoji_status['erro']} Pasta não encontrada: {pasta}")
-            return {}
+            return None
         
-        # Inicializar estatísticas
-        stats = {
-            "arquivos_processados": 0,
-            "arquivos_movidos": 0,
-            "pastas_criadas": 0,
-            "erros": 0,
-            "arquivos_ignorados": 0
-        }
+        plano = Plano(pasta, criterio, formato)
         
-        print(f"\n{self.emoji_status['info']} Processando: {pasta}")
-        print(f"{self.emoji_status['info']} Modo: {'Simulação' if simular else 'Execução'}")
-        print("-" * 50)
+        eventos = self.eventos
+        if mostrar:
+            eventos.emitir("inicio", ferramenta="organizador", pasta=str(pasta),
+                           modo="simulacao", total=None)
         
-        # Criar pasta de backup se necessário
-        pasta_backup = None
-        if backup and not simular:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            pasta_backup = pasta / f"backup_{timestamp}"
-            pasta_backup.mkdir(exist_ok=True)
-            print(f"{self.emoji_status['info']} Backup em: {pasta_backup}")
+        self._trava = threading.Lock()
+        pastas_vistas: set = set()
         
-        # Processar cada arquivo
-        for item in pasta.iterdir():
+        def tarefa(entrada: Entrada):
             try:
-                if item.is_file() and not item.is_symlink():
-                    stats["arquivos_processados"] += 1
-                    
-                    # Obter data e nome da pasta
-                    data = self.obter_data_arquivo(item, criterio)
-                    nome_pasta = self.criar_nome_pasta(data, formato)
-                    
-                    # Criar pasta de destino
+                if entrada.eh_arquivo:
+                    with eventos.medir("stat"):
+                        stat = entrada.stat
+                        timestamp = self._timestamp_entrada(entrada, criterio)
+                    nome_pasta = self.criar_nome_pasta(
+                        datetime.fromtimestamp(timestamp), formato)
                     pasta_destino = pasta / nome_pasta
-                    if not pasta_destino.exists():
-                        if not simular:
-                            pasta_destino.mkdir(parents=True, exist_ok=True)
-                        stats["pastas_criadas"] += 1
-                    
-                    # Criar backup
-                    if backup and not simular and pasta_backup:
-                        shutil.copy2(item, pasta_backup / item.name)
-                    
-                    # Mover arquivo
-                    if not simular:
-                        # Evitar sobrescrita
-                        destino_final = pasta_destino / item.name
-                        contador = 1
-                        while destino_final.exists():
-                            novo_nome = f"{item.stem}_{contador}{item.suffix}"
-                            destino_final = pasta_destino / novo_nome
-                            contador += 1
-                        
-                        shutil.move(str(item), str(destino_final))
-                        stats["arquivos_movidos"] += 1
-                        emoji = "🚀"
-                    else:
-                        emoji = "👀"
-                    
-                    # Mostrar progresso
-                    print(f"{emoji} {item.name} → {nome_pasta}/")
                     
+                    with self._trava:
+                        if pasta_destino not in pastas_vistas:
+                            pastas_vistas.add(pasta_destino)
+                            if not pasta_destino.exists():
+                                plano.pastas_novas += 1
+                        plano.adicionar(entrada.caminho, pasta_destino / entrada.nome,
+                                        stat.st_size, timestamp)
+                        if estatisticas is not None:
+                            estatisticas.adicionar(entrada.nome, stat.st_size,
+                                                   periodo=nome_pasta)
+                    if mostrar:
+                        eventos.emitir("arquivo_planejado", arquivo=str(entrada.caminho),
+                                       destino=str(pasta_destino))
                 else:
-                    stats["arquivos_ignorados"] += 1
-                    
+                    with self._trava:
+                        plano.ignorados += 1
             except Exception as e:
-                stats["erros"] += 1
-                print(f"{self.emoji_status['erro']} Erro com {item.name}: {str(e)[:50]}...")
+                with self._trava:
+                    plano.erros += 1
+                eventos.emitir("erro", arquivo=str(entrada.caminho), mensagem=str(e))
+        
+        if entradas is None and recursivo:
+            entradas = varrer_arvore(
+                pasta,
+                profundidade_max=profundidade_max,
+                incluir=incluir,
+                excluir=excluir,
+                ignorar_pasta=lambda e: self._eh_pasta_gerada(e.nome, formato)
+            )
+        elif entradas is None:
+            entradas = varrer(pasta)
+        
+        if criterio in CRITERIOS_MIDIA:
+            # Cada arquivo custa algumas leituras pequenas do cabeçalho
+            workers = max(workers, WORKERS_MIDIA)
+        self._executar_tarefas(tarefa, entradas, workers)
+        
+        if deduplicar:
+            self._marcar_duplicatas(plano, deduplicar, workers, mostrar)
+        if mostrar:
+            eventos.emitir("fim", ferramenta="organizador", modo="simulacao",
+                           estatisticas=plano.estatisticas())
+        return plano
+    
+    def _marcar_duplicatas(self, plano: "Plano", modo: str, workers: int, mostrar: bool):
+        """Etapa de deduplicação: marca no plano as cópias de conteúdo idêntico"""
+        estatisticas = EstatisticasHash()
+        grupos = encontrar_duplicatas(
+            ((i.origem, i.tamanho) for i in plano), workers, estatisticas, self.cache)
+        
+        por_origem = {i.origem: i for i in plano}
+        for mantido, *copias in grupos:
+            for copia in copias:
+                por_origem[copia].duplicata_de = mantido
+                if mostrar:
+                    self.eventos.emitir("duplicata", arquivo=copia, original=mantido)
+        
+        plano.deduplicacao = modo
+        plano.hash_mb_por_s = estatisticas.mb_por_segundo
+    
+    def _eh_pasta_gerada(self, nome: str, formato: str) -> bool:
+        """Indica se a pasta foi criada pelo organizador (data ou backup)"""
+        if nome.startswith("backup_"):
+            return True
+        # Formatos com "/" (ex.: %Y/%m) geram um nível por componente
+        for parte in [formato] + formato.split("/"):
+            try:
+                datetime.strptime(nome, parte)
+                return True
+            except ValueError:
+                continue
+        return False
+    
+    def executar_plano(self,
+                       plano: "Plano",
+                       backup: bool = False,
+                       workers: int = 1,
+                       diario: Optional[DiarioMovimentos] = None) -> Dict[str, int]:
+        """
+        Executa um plano gerado por planejar() (ou carregado do disco)
+        
+        Args:
+            plano: Plano a executar
+            backup: Se True, cria backup antes de mover
+            workers: Número de threads para cópia/movimentação
+            diario: DiarioMovimentos opcional; um diário novo recebe o plano
+                    antes da primeira movimentação, e cada movimentação
+                    concluída é registrada (ver retomar_diario/desfazer_diario)
+        
+        Returns:
+            Dicionário com estatísticas da operação
+        """
+        stats = plano.estatisticas()
+        stats["pastas_criadas"] = 0
+        eventos = self.eventos
+        
+        # Criar pasta de backup se necessário (na retomada, a mesma de antes)
+        pasta_backup = None
+        if diario is not None and diario.iniciado and diario.cabecalho.get("backup"):
+            pasta_backup = Path(diario.cabecalho["backup"])
+            pasta_backup.mkdir(exist_ok=True)
+        elif backup:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            pasta_backup = plano.pasta / f"backup_{timestamp}"
+            pasta_backup.mkdir(exist_ok=True)
         
+        if diario is not None and not diario.iniciado:
+            diario.iniciar(plano.cabecalho(), (i.registro() for i in plano),
+                           backup=str(pasta_backup) if pasta_backup else None)
+        self._diario = diario
+        
+        eventos.emitir("inicio", ferramenta="organizador", pasta=str(plano.pasta),
+                       modo="execucao", workers=workers, total=len(plano),
+                       backup=str(pasta_backup) if pasta_backup else None)
+        
+        # Estado compartilhado entre workers (protegido por self._trava)
+        self._trava = threading.Lock()
+        # Pasta de destino -> Event marcado quando ela já existe no disco
+        self._pastas_vistas: Dict[Path, threading.Event] = {}
+        self._indices_destino: Dict[Path, _IndiceNomes] = {}
+        self._dispositivos: Dict[Path, int] = {}
+        self._reflink_disponivel = sys.platform.startswith("linux")
+        self._hardlink_disponivel = True
+        self._renomear_exclusivo_disponivel = _renomear_exclusivo is not None
+        self._link_exclusivo_disponivel = True
+        
+        modo = plano.deduplicacao
+        # Destino final dos arquivos mantidos que têm duplicatas
+        referenciados = {i.duplicata_de for i in plano if i.duplicata_de}
+        destinos_mantidos: Dict[str, Path] = {}
+        if diario is not None:
+            # Retomada: arquivos mantidos que já tinham sido movidos
+            for origem in referenciados & diario.concluidos.keys():
+                destinos_mantidos[origem] = Path(diario.concluidos[origem][0])
+        
+        def tarefa(registro: "ItemPlano"):
+            if registro.duplicata_de and modo in ("pular", "hardlink"):
+                if modo == "pular":
+                    self._somar(stats, "bytes_economizados", registro.tamanho)
+                    eventos.emitir("arquivo_movido", arquivo=registro.origem,
+                                   destino=registro.origem, acao="pular")
+                    if diario is not None:
+                        diario.registrar_movimento(registro.origem, registro.origem, "pular")
+                return
+            final = self._executar_item(registro, plano.pasta, pasta_backup, stats)
+            if final is not None and registro.origem in referenciados:
+                with self._trava:
+                    destinos_mantidos[registro.origem] = final
+        
+        try:
+            self._executar_tarefas(tarefa, plano, workers)
+            
+            # Segunda etapa: duplicatas viram hardlinks dos arquivos mantidos
+            if modo == "hardlink":
+                def tarefa_vinculo(registro: "ItemPlano"):
+                    self._executar_item(registro, plano.pasta, pasta_backup, stats,
+                                        vincular_a=destinos_mantidos.get(registro.duplicata_de))
+                
+                duplicatas = (i for i in plano if i.duplicata_de)
+                self._executar_tarefas(tarefa_vinculo, duplicatas, workers)
+        finally:
+            # Inclusive com Ctrl+C: o que já foi movido fica registrado
+            if diario is not None:
+                diario.confirmar()
+        eventos.emitir("fim", ferramenta="organizador", modo="execucao", estatisticas=stats)
         return stats
     
+    def retomar_diario(self, caminho: str, workers: int = 1) -> Dict[str, int]:
+        """
+        Continua uma execução interrompida a partir do seu diário
+        
+        Não varre a pasta: os itens pendentes vêm do plano gravado no
+        diário, depois de reconciliados com o disco (ver
+        DiarioMovimentos.reconciliar). O backup, se havia, continua na
+        mesma pasta.
+        
+        Returns:
+            Estatísticas da execução dos itens pendentes (com as chaves
+            "recuperados" e "perdidos" da reconciliação), ou {} se o
+            diário não tiver um plano completo
+        """
+        diario = DiarioMovimentos(caminho)
+        if not diario.iniciado:
+            print(f"{self.emoji_status['erro']} Diário sem plano completo: {diario.caminho}")
+            return {}
+        try:
+            reconciliacao = diario.reconciliar()
+            if reconciliacao["recuperados"]:
+                print(f"{self.emoji_status['info']} Reconciliação: "
+                      f"{reconciliacao['recuperados']} movimentação(ões) sem registro recuperada(s)")
+            if reconciliacao["perdidos"]:
+                print(f"{self.emoji_status['alerta']} {reconciliacao['perdidos']} arquivo(s) "
+                      f"não encontrado(s) nem na origem nem no destino")
+            plano = Plano.de_registros(diario.cabecalho, diario.pendentes())
+            stats = self.executar_plano(plano, workers=workers, diario=diario)
+        finally:
+            diario.fechar()
+        stats["recuperados"] = reconciliacao["recuperados"]
+        stats["perdidos"] = reconciliacao["perdidos"]
+        return stats
+    
+    def desfazer_diario(self, caminho: str) -> Dict[str, int]:
+        """
+        Devolve à origem tudo o que uma execução com diário moveu
+        
+        Returns:
+            {"restaurados", "erros", "pastas_removidas"}, ou {} se o
+            diário não tiver um plano completo
+        """
+        diario = DiarioMovimentos(caminho)
+        if not diario.iniciado:
+            print(f"{self.emoji_status['erro']} Diário sem plano completo: {diario.caminho}")
+            return {}
+        try:
+            return diario.desfazer(self.eventos)
+        finally:
+            diario.fechar()
+    
+    def _executar_tarefas(self, tarefa, itens, workers: int):
+        """
+        Aplica tarefa a cada item, em série ou em `workers` threads
+        
+        As threads dividem o mesmo iterador, pegando um item de cada vez:
+        memória constante mesmo com centenas de milhares de arquivos, sem
+        um Future (e a espera por ele) por arquivo.
+        """
+        if workers <= 1:
+            for item in itens:
+                tarefa(item)
+            return
+        
+        iterador = iter(itens)
+        trava = threading.Lock()
+        parar = threading.Event()
+        falhas: List[BaseException] = []
+        
+        def trabalhar():
+            while not parar.is_set():
+                try:
+                    with trava:
+                        item = next(iterador, _FIM)
+                    if item is _FIM:
+                        return
+                    tarefa(item)
+                except BaseException as e:
+                    # Como no modo em série: a primeira falha interrompe e
+                    # é repassada a quem chamou (ex.: erro da varredura)
+                    falhas.append(e)
+                    parar.set()
+                    return
+        
+        threads = [threading.Thread(target=trabalhar, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                thread.join()
+        except BaseException:
+            # Ctrl+C: os arquivos em andamento terminam, nenhum outro começa
+            parar.set()
+            for thread in threads:
+                thread.join()
+            raise
+        if falhas:
+            raise falhas[0]
+    
+    def _executar_item(self,
+                       registro: "ItemPlano",
+                       raiz: Path,
+                       pasta_backup: Optional[Path],
+                       stats: Dict[str, int],
+                       vincular_a: Optional[Path] = None) -> Optional[Path]:
+        """
+        Move um único arquivo do plano (seguro para uso em threads)
+        
+        Se vincular_a for informado (duplicata no modo "hardlink"), o
+        destino vira um hardlink para esse arquivo e a origem é removida;
+        se o hardlink não for possível, o arquivo é movido normalmente.
+        
+        Returns:
+            Caminho final do arquivo, ou None em caso de erro
+        """
+        origem = Path(registro.origem)
+        destino = Path(registro.destino)
+        pasta_destino = destino.parent
+        eventos = self.eventos
+        try:
+            # Criar pasta de destino (uma única vez por execução)
+            with self._trava:
+                pronta = self._pastas_vistas.get(pasta_destino)
+                nova = pronta is None
+                if nova:
+                    pronta = self._pastas_vistas[pasta_destino] = threading.Event()
+            if nova:
+                try:
+                    with eventos.medir("mkdir"):
+                        pasta_destino.mkdir(parents=True)
+                    self._somar(stats, "pastas_criadas")
+                    if self._diario is not None:
+                        self._diario.registrar_pasta(str(pasta_destino))
+                except FileExistsError:
+                    pass
+                finally:
+                    pronta.set()
+            else:
+                # Outro worker pode ainda estar criando a pasta
+                pronta.wait()
+            
+            # Origem, destino e backup no mesmo dispositivo: só metadados
+            mesmo_dispositivo = self._mesmo_dispositivo(
+                origem.parent, pasta_destino, pasta_backup)
+            
+            # Criar backup (mantendo a estrutura de subpastas da origem)
+            if pasta_backup is not None:
+                copia = pasta_backup / os.path.relpath(origem, raiz)
+                if copia.parent != pasta_backup:
+                    with eventos.medir("mkdir"):
+                        copia.parent.mkdir(parents=True, exist_ok=True)
+                with eventos.medir("copy"):
+                    self._criar_backup(origem, copia, mesmo_dispositivo)
+            
+            # Plano aplicado depois (--aplicar-plano): uma duplicata editada
+            # desde o hash é movida normalmente, nunca trocada por um link
+            if vincular_a is not None and not self._duplicata_confirmada(registro, vincular_a):
+                eventos.emitir("duplicata_alterada", arquivo=registro.origem,
+                               original=str(vincular_a))
+                vincular_a = None
+            
+            # Mover arquivo (ou vincular à cópia mantida)
+            acao = "mover"
+            with eventos.medir("move"):
+                while True:
+                    destino_final = self._reservar_destino(pasta_destino, destino.name)
+                    try:
+                        if vincular_a is not None and self._vincular(vincular_a, destino_final):
+                            os.remove(origem)
+                            self._somar(stats, "bytes_economizados", registro.tamanho)
+                            acao = "vincular"
+                        else:
+                            self._mover_arquivo(origem, destino_final, mesmo_dispositivo)
+                        break
+                    except FileExistsError:
+                        # Ocupado por outro programa depois da leitura do índice
+                        continue
+            self._somar(stats, "arquivos_movidos")
+            
+            if self._diario is not None:
+                self._diario.registrar_movimento(registro.origem, str(destino_final), acao)
+            eventos.emitir("arquivo_movido", arquivo=registro.origem,
+                           destino=str(destino_final), acao=acao)
+            return destino_final
+                
+        except Exception as e:
+            self._somar(stats, "erros")
+            eventos.emitir("erro", arquivo=registro.origem, mensagem=str(e))
+            return None
+    
+    def _duplicata_confirmada(self, registro: "ItemPlano", mantido: Path) -> bool:
+        """
+        Confere, logo antes de vincular, se a duplicata ainda é igual ao mantido
+        
+        O tamanho de ambos precisa ser o do plano e o conteúdo é comparado
+        byte a byte (o hash do plano pode ter ficado velho).
+        """
+        try:
+            st_origem = os.stat(registro.origem)
+            st_mantido = os.stat(mantido)
+            if os.path.samestat(st_origem, st_mantido):
+                return True
+            if st_origem.st_size != registro.tamanho or st_mantido.st_size != registro.tamanho:
+                return False
+            with self.eventos.medir("comparar"):
+                return filecmp.cmp(registro.origem, mantido, shallow=False)
+        except OSError:
+            return False
+    
+    def _vincular(self, original: Path, destino: Path) -> bool:
+        """
+        Cria destino como hardlink para original
+        
+        Returns:
+            False se o hardlink não for possível (o arquivo é movido)
+        
+        Raises:
+            FileExistsError: destino já existe
+        """
+        try:
+            os.link(original, destino)
+        except FileExistsError:
+            raise
+        except OSError:
+            return False
+        return True
+    
+    def _mesmo_dispositivo(self, *pastas: Optional[Path]) -> bool:
+        """Verifica se as pastas estão no mesmo dispositivo (1 stat por pasta)"""
+        dispositivos = set()
+        for pasta in pastas:
+            if pasta is None:
+                continue
+            dispositivo = self._dispositivos.get(pasta)
+            if dispositivo is None:
+                dispositivo = os.stat(pasta).st_dev
+                with self._trava:
+                    self._dispositivos[pasta] = dispositivo
+            dispositivos.add(dispositivo)
+        return len(dispositivos) <= 1
+    
+    def _mover_arquivo(self, origem: Path, destino: Path, mesmo_dispositivo: bool):
+        """
+        Move sem nunca substituir o destino
+        
+        No mesmo dispositivo é um único rename exclusivo. Entre
+        dispositivos, copia para um temporário na pasta de destino
+        (.nome.PID.organizando), coloca-o no lugar com o rename exclusivo e
+        só então remove a origem: uma interrupção no meio deixa no máximo o
+        temporário, removido pela próxima execução que usar a pasta.
+        
+        Raises:
+            FileExistsError: destino já existe
+        """
+        if mesmo_dispositivo:
+            try:
+                self._renomear_exclusivo(origem, destino)
+                return
+            except OSError as e:
+                # Ex.: bind mounts com o mesmo st_dev
+                if e.errno != errno.EXDEV:
+                    raise
+        temporario = destino.with_name(f".{destino.name}.{os.getpid()}{SUFIXO_TEMPORARIO}")
+        try:
+            shutil.copy2(origem, temporario)
+            self._renomear_exclusivo(temporario, destino)
+        except BaseException:
+            try:
+                os.remove(temporario)
+            except OSError:
+                pass
+            raise
+        os.remove(origem)
+    
+    def _renomear_exclusivo(self, origem: Path, destino: Path):
+        """
+        Renomeia sem nunca substituir o destino
+        
+        Usa o rename exclusivo do sistema; sem ele (kernel antigo, sistema
+        de arquivos sem suporte), link + unlink, que também falha com o
+        destino ocupado. Sem hardlinks (FAT/exFAT, alguns compartilhamentos)
+        resta checar e renomear: seguro entre os workers, que recebem nomes
+        distintos do índice, mas não contra outro programa gravando o mesmo
+        nome no mesmo instante.
+        
+        Raises:
+            FileExistsError: destino já existe
+        """
+        if self._renomear_exclusivo_disponivel:
+            try:
+                _renomear_exclusivo(origem, destino)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EINVAL, errno.ENOSYS, errno.ENOTSUP, errno.EOPNOTSUPP):
+                    raise
+                self._renomear_exclusivo_disponivel = False
+        if self._link_exclusivo_disponivel:
+            try:
+                os.link(origem, destino)
+            except OSError as e:
+                if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.EMLINK):
+                    raise
+                self._link_exclusivo_disponivel = False
+            else:
+                os.unlink(origem)
+                return
+        if os.path.lexists(destino):
+            raise FileExistsError(errno.EEXIST, "o destino já existe", str(destino))
+        os.rename(origem, destino)
+    
+    def _criar_backup(self, origem: Path, copia: Path, mesmo_dispositivo: bool) -> Path:
+        """
+        Cria o backup da forma mais barata disponível
+        
+        No mesmo dispositivo tenta reflink (cópia copy-on-write, Btrfs/XFS),
+        depois hardlink; a cópia completa fica só como último recurso. Se
+        um método não é suportado, ele não é tentado de novo nesta execução.
+        
+        Um backup existente nunca é sobrescrito: se o nome já estiver
+        ocupado (retomada, ou duas execuções no mesmo segundo), usa
+        nome_1, nome_2... Cada método cria o arquivo de forma exclusiva,
+        então a checagem e a criação são uma coisa só.
+        
+        Atenção: um backup por hardlink compartilha o conteúdo com o
+        arquivo organizado; ele protege contra exclusão/renomeação, não
+        contra edição do arquivo no lugar.
+        
+        Returns:
+            Caminho do backup criado
+        """
+        for contador in itertools.count():
+            candidato = copia if contador == 0 else copia.with_name(
+                f"{copia.stem}_{contador}{copia.suffix}")
+            try:
+                self._criar_backup_em(origem, candidato, mesmo_dispositivo)
+                return candidato
+            except FileExistsError:
+                continue
+    
+    def _criar_backup_em(self, origem: Path, copia: Path, mesmo_dispositivo: bool):
+        """
+        Cria o backup em copia (ver _criar_backup)
+        
+        Raises:
+            FileExistsError: copia já existe
+        """
+        if mesmo_dispositivo and self._reflink_disponivel:
+            if self._clonar_reflink(origem, copia):
+                return
+        if mesmo_dispositivo and self._hardlink_disponivel:
+            try:
+                os.link(origem, copia)
+                return
+            except OSError as e:
+                if e.errno in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    self._hardlink_disponivel = False
+                else:
+                    raise
+        # Reserva o nome antes de copiar: copy2 sobrescreveria um arquivo existente
+        fd = os.open(copia, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        os.close(fd)
+        try:
+            shutil.copy2(origem, copia)
+        except BaseException:
+            try:
+                os.remove(copia)
+            except OSError:
+                pass
+            raise
+    
+    def _clonar_reflink(self, origem: Path, copia: Path) -> bool:
+        """
+        Clona o arquivo com o ioctl FICLONE do Linux
+        
+        Returns:
+            True se clonou, False se não suportado
+        
+        Raises:
+            FileExistsError: copia já existe
+        """
+        import fcntl
+        FICLONE = 0x40049409
+        try:
+            with open(origem, "rb") as f_origem:
+                fd = os.open(copia, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                try:
+                    fcntl.ioctl(fd, FICLONE, f_origem.fileno())
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            if e.errno == errno.EEXIST:
+                raise
+            try:
+                os.remove(copia)
+            except OSError:
+                pass
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL,
+                           errno.EXDEV, errno.ENOSYS):
+                self._reflink_disponivel = False
+            return False
+        shutil.copystat(origem, copia)
+        return True
+    
+    def _timestamp_entrada(self, entrada: Entrada, criterio: str) -> float:
+        """
+        Timestamp da entrada conforme o critério, usando o cache se houver
+        
+        Datas que vêm direto do stat não vão para o cache: o stat já é
+        necessário para a chave, então não haveria economia. Datas de
+        mídia vão, e uma nova execução não reabre os arquivos.
+        """
+        stat = entrada.stat
+        if self.cache is None or criterio in CRITERIOS_STAT:
+            return self._timestamp_criterio(stat, criterio, entrada.caminho)
+        campo = f"data_{criterio}"
+        timestamp = self.cache.obter(stat, campo)
+        if timestamp is None:
+            timestamp = self._timestamp_criterio(stat, criterio, entrada.caminho)
+            self.cache.gravar(stat, campo, timestamp)
+        return timestamp
+    
+    def _timestamp_criterio(self, stat, criterio: str, caminho: Optional[Path] = None) -> float:
+        """
+        Escolhe o timestamp conforme o critério
+        
+        Critérios de mídia leem o cabeçalho do arquivo em caminho; sem a
+        data (outro tipo de arquivo, tag ausente), vale a de modificação.
+        """
+        if criterio in CRITERIOS_MIDIA and caminho is not None:
+            timestamp = data_midia(caminho, criterio, stat)
+            if timestamp is not None:
+                return timestamp
+        mapeamento_datas = {
+            "modificacao": stat.st_mtime,
+            "criacao": stat.st_ctime,
+            "acesso": stat.st_atime
+        }
+        return mapeamento_datas.get(criterio, stat.st_mtime)
+    
+    def _somar(self, stats: Dict[str, int], chave: str, valor: int = 1):
+        """Incrementa um contador de estatísticas de forma atômica"""
+        with self._trava:
+            stats[chave] += valor
+    
+    def _reservar_destino(self, pasta_destino: Path, nome: str) -> Path:
+        """
+        Escolhe um nome livre em pasta_destino (evitando sobrescrita).
+        
+        O nome vem do índice em memória da pasta (sem sondar o disco a cada
+        tentativa), então dois workers nunca recebem o mesmo. Contra outros
+        programas, quem reivindica o nome é a própria movimentação, que
+        nunca substitui um arquivo (ver _renomear_exclusivo); se ele foi
+        ocupado depois da leitura do índice, pede-se o próximo. Nada é
+        criado no destino antes disso: uma interrupção não deixa arquivos
+        vazios com o nome das fotos.
+        """
+        with self._trava:
+            indice = self._indices_destino.get(pasta_destino)
+            if indice is None:
+                indice = _IndiceNomes(pasta_destino)
+                self._indices_destino[pasta_destino] = indice
+        
+        return indice.reservar(nome)
+    
     def mostrar_resumo(self, stats: Dict[str, int], simular: bool):
         """Mostra resumo amigável da operação"""
         print("\n" + "=" * 50)
@@ -165,6 +1087,13 @@ class Organizador:
         print(f"{self.emoji_status['sucesso']} Movidos: {stats.get('arquivos_movidos', 0)}")
         print(f"{self.emoji_status['erro']} Erros: {stats.get('erros', 0)}")
         
+        if "duplicatas" in stats:
+            mb = 1024 * 1024
+            print(f"🔁 Duplicatas: {stats['duplicatas']} "
+                  f"({stats['bytes_duplicados'] / mb:.1f} MB)")
+            print(f"💾 Economizados: {stats['bytes_economizados'] / mb:.1f} MB")
+            print(f"⏱️ Hash: {stats['hash_mb_por_s']} MB/s")
+        
         if simular and stats.get('arquivos_processados', 0) > 0:
             print(f"\n{self.emoji_status['alerta']} Modo simulação ativado!")
             print(f"{self.emoji_status['info']} Para executar realmente, use 'simular=False'")
@@ -207,9 +1136,10 @@ def interface_conversacional():
         print("   1. Por data de modificação (padrão)")
         print("   2. Por data de criação")
         print("   3. Por data de acesso")
+        print("   4. Por data da foto/vídeo/áudio (EXIF e tags)")
         
-        opcao = input("👉 Escolha (1-3) [1]: ").strip() or "1"
-        criterios = {"1": "modificacao", "2": "criacao", "3": "acesso"}
+        opcao = input("👉 Escolha (1-4) [1]: ").strip() or "1"
+        criterios = {"1": "modificacao", "2": "criacao", "3": "acesso", "4": "midia"}
         criterio = criterios.get(opcao, "modificacao")
         
         # Perguntar formato
@@ -226,13 +1156,12 @@ def interface_conversacional():
         print(f"\n{org.emoji_status['info']} Vou mostrar o que será feito...")
         print("-" * 50)
         
-        stats = org.processar_pasta(
+        plano = org.planejar(
             caminho=caminho,
             criterio=criterio,
-            formato=formato,
-            simular=True,
-            backup=False
+            formato=formato
         )
+        stats = plano.estatisticas() if plano is not None else {}
         
         org.mostrar_resumo(stats, simular=True)
         
@@ -247,11 +1176,9 @@ def interface_conversacional():
                 print(f"\n{org.emoji_status['info']} Executando organização...")
                 print("-" * 50)
                 
-                stats_real = org.processar_pasta(
-                    caminho=caminho,
-                    criterio=criterio,
-                    formato=formato,
-                    simular=False,
+                # Executa o plano já calculado, sem varrer a pasta de novo
+                stats_real = org.executar_plano(
+                    plano,
                     backup=(backup_resp == 's')
                 )
                 
@@ -278,7 +1205,21 @@ def modo_rapido():
 Exemplos:
   %(prog)s ~/Downloads                      # Organiza Downloads
   %(prog)s ~/Pictures --criterio criacao    # Por data de criação
+  %(prog)s ~/DCIM -r --criterio midia       # Pela data EXIF/vídeo/áudio
   %(prog)s ~/Desktop --simular              # Apenas simula
+  %(prog)s /mnt/nas/fotos --workers 8       # Paralelo (rede lenta)
+  %(prog)s ~/DCIM -r --incluir '*.jpg'      # Árvore inteira, só JPG
+  %(prog)s ~/Downloads -d hardlink          # Duplicatas viram hardlinks
+  %(prog)s ~/Fotos -s --salvar-plano p.jsonl  # Simula e grava o plano
+  %(prog)s --aplicar-plano p.jsonl          # Executa um plano revisado
+  %(prog)s ~/Fotos -r --estatisticas e.csv  # Prévia agregada, sem mover
+  %(prog)s ~/Fotos -r --saida progresso --tempos  # Barra + tempos por fase
+  %(prog)s ~/Fotos --eventos ev.jsonl       # Eventos em JSON Lines
+  %(prog)s ~/Entrada --vigiar               # Organiza o que for chegando
+  %(prog)s ~/Fotos -r --diario f.diario     # Registra cada movimentação
+  %(prog)s --retomar f.diario               # Continua após uma interrupção
+  %(prog)s --desfazer f.diario              # Devolve tudo para a origem
+  %(prog)s /mnt/nas/in --vigiar --sondagem  # Idem, em pasta de rede
   %(prog)s --interativo                     # Modo conversacional
         """
     )
@@ -291,9 +1232,10 @@ Exemplos:
     
     parser.add_argument(
         "--criterio", "-c",
-        choices=["modificacao", "criacao", "acesso"],
+        choices=["modificacao", "criacao", "acesso", *CRITERIOS_MIDIA],
         default="modificacao",
-        help="Critério de data (padrão: modificacao)"
+        help="Critério de data (padrão: modificacao); exif/video/audio/midia "
+             "usam a data gravada no arquivo, com modificacao como reserva"
     )
     
     parser.add_argument(
@@ -314,6 +1256,144 @@ Exemplos:
         help="Criar backup antes de organizar"
     )
     
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Threads para mover arquivos em paralelo (padrão: 1). Ajuda em "
+             "pastas de rede (NFS/SMB) e discos lentos, onde cada operação "
+             "espera pela latência; em disco local mover é só renomear e 1 "
+             "costuma ser o mais rápido"
+    )
+    
+    parser.add_argument(
+        "--recursivo", "-r",
+        action="store_true",
+        help="Organizar também os arquivos das subpastas"
+    )
+    
+    parser.add_argument(
+        "--incluir",
+        action="append",
+        metavar="GLOB",
+        help="Organizar só arquivos que casam com GLOB (repetível, modo recursivo)"
+    )
+    
+    parser.add_argument(
+        "--excluir",
+        action="append",
+        metavar="GLOB",
+        help="Pular arquivos/pastas que casam com GLOB (repetível, modo recursivo)"
+    )
+    
+    parser.add_argument(
+        "--profundidade-max",
+        type=int,
+        metavar="N",
+        help="Níveis de subpastas a percorrer no modo recursivo"
+    )
+    
+    parser.add_argument(
+        "--deduplicar", "-d",
+        choices=["pular", "hardlink", "relatorio"],
+        help="Detectar arquivos idênticos por hash e pular, "
+             "transformar em hardlink ou só listar"
+    )
+    
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=CACHE_PADRAO,
+        metavar="ARQUIVO",
+        help="Reaproveitar hashes/datas entre execuções (SQLite, "
+             "padrão: %(const)s)"
+    )
+    
+    parser.add_argument(
+        "--salvar-plano",
+        metavar="ARQUIVO",
+        help="Grava o plano calculado em ARQUIVO (JSONL)"
+    )
+    
+    parser.add_argument(
+        "--aplicar-plano",
+        metavar="ARQUIVO",
+        help="Executa um plano gravado com --salvar-plano"
+    )
+    
+    parser.add_argument(
+        "--estatisticas",
+        metavar="ARQUIVO",
+        help="Só prever o resultado: agrega por extensão, pasta de data e "
+             "tamanho e grava em ARQUIVO (.csv ou .json), sem mover nada"
+    )
+    
+    parser.add_argument(
+        "--diario",
+        metavar="ARQUIVO",
+        help="Registrar o plano e cada movimentação em ARQUIVO, para "
+             "retomar uma execução interrompida ou desfazê-la depois"
+    )
+    
+    parser.add_argument(
+        "--retomar",
+        metavar="ARQUIVO",
+        help="Continuar a execução registrada em ARQUIVO, sem varrer a pasta"
+    )
+    
+    parser.add_argument(
+        "--desfazer",
+        metavar="ARQUIVO",
+        help="Devolver à origem os arquivos movidos na execução registrada em ARQUIVO"
+    )
+    
+    parser.add_argument(
+        "--vigiar",
+        action="store_true",
+        help="Continuar rodando e organizar cada arquivo novo da pasta "
+             "assim que ele terminar de ser gravado (substitui o cron)"
+    )
+    
+    parser.add_argument(
+        "--espera",
+        type=float,
+        default=2.0,
+        metavar="SEG",
+        help="Com --vigiar: segundos sem mudança para um arquivo "
+             "ser considerado pronto (padrão: 2)"
+    )
+    
+    parser.add_argument(
+        "--sondagem",
+        nargs="?",
+        type=float,
+        const=1.0,
+        metavar="SEG",
+        help="Com --vigiar: conferir a pasta a cada SEG segundos em vez de "
+             "usar inotify (pastas em rede; padrão: %(const)s)"
+    )
+    
+    parser.add_argument(
+        "--saida",
+        choices=["emoji", "progresso", "silenciosa"],
+        default="emoji",
+        help="Como mostrar o andamento: uma linha por arquivo (padrão), "
+             "barra de progresso ou nada"
+    )
+    
+    parser.add_argument(
+        "--eventos",
+        metavar="ARQUIVO",
+        help="Grava também cada evento (início, arquivo planejado/movido, "
+             "erro, fim) em ARQUIVO, em JSON Lines"
+    )
+    
+    parser.add_argument(
+        "--tempos",
+        action="store_true",
+        help="Mostrar ao final os tempos por fase (stat, mkdir, copy, move)"
+    )
+    
     parser.add_argument(
         "--interativo", "-i",
         action="store_true",
@@ -321,18 +1401,132 @@ Exemplos:
     )
     
     args = parser.parse_args()
+    if args.vigiar:
+        conflitantes = [opcao for opcao, valor in (
+            ("--simular", args.simular), ("--recursivo", args.recursivo),
+            ("--deduplicar", args.deduplicar), ("--salvar-plano", args.salvar_plano),
+            ("--aplicar-plano", args.aplicar_plano), ("--estatisticas", args.estatisticas),
+            ("--diario", args.diario),
+        ) if valor]
+        if conflitantes:
+            parser.error(f"--vigiar não combina com {', '.join(conflitantes)}")
+        if not args.pasta:
+            parser.error("--vigiar precisa da pasta")
+    if args.diario and DiarioMovimentos(args.diario).iniciado:
+        parser.error(f"o diário {args.diario} já existe; use --retomar ou --desfazer")
     
-    org = Organizador()
-    
-    if args.interativo or not args.pasta:
+    cache = CacheMetadados(args.cache) if args.cache else None
+    eventos = criar_eventos(args.saida, args.eventos)
+    org = Organizador(cache=cache, eventos=eventos)
+    try:
+        _executar_modo_rapido(org, args)
+        if args.tempos:
+            eventos.mostrar_tempos()
+    finally:
+        eventos.fechar()
+        if cache is not None:
+            cache.fechar()
+
+
+def _executar_modo_rapido(org: Organizador, args):
+    """Executa a ação escolhida na linha de comando"""
+    diario = DiarioMovimentos(args.diario) if args.diario and not args.simular else None
+    if args.retomar:
+        stats = org.retomar_diario(args.retomar, workers=args.workers)
+        org.mostrar_resumo(stats, simular=False)
+    elif args.desfazer:
+        resumo = org.desfazer_diario(args.desfazer)
+        if resumo:
+            print(f"\n{org.emoji_status['sucesso']} Restaurados: {resumo['restaurados']}")
+            print(f"{org.emoji_status['pasta']} Pastas removidas: {resumo['pastas_removidas']}")
+            print(f"{org.emoji_status['erro']} Erros: {resumo['erros']}")
+    elif args.aplicar_plano:
+        plano = Plano.carregar(args.aplicar_plano)
+        stats = org.executar_plano(plano, backup=args.backup, workers=args.workers,
+                                   diario=diario)
+        org.mostrar_resumo(stats, simular=False)
+    elif args.interativo or not args.pasta:
         interface_conversacional()
+    elif args.vigiar:
+        vigia = VigiaPasta(
+            org,
+            args.pasta,
+            criterio=args.criterio,
+            formato=args.formato,
+            backup=args.backup,
+            workers=args.workers,
+            espera=args.espera,
+            sondagem=args.sondagem is not None,
+            intervalo=args.sondagem or 1.0
+        )
+        try:
+            vigia.executar()
+        except KeyboardInterrupt:
+            pass
+        except FileNotFoundError as e:
+            print(f"{org.emoji_status['erro']} {e}")
+        print(f"\n{org.emoji_status['info']} Vigia encerrado ({vigia.lotes} lote(s))")
+        org.mostrar_resumo(vigia.totais, simular=False)
+    elif args.estatisticas:
+        estatisticas = EstatisticasArquivos(formato=args.formato)
+        plano = org.planejar(
+            caminho=args.pasta,
+            criterio=args.criterio,
+            formato=args.formato,
+            workers=args.workers,
+            mostrar=False,
+            recursivo=args.recursivo,
+            incluir=args.incluir,
+            excluir=args.excluir,
+            profundidade_max=args.profundidade_max,
+            deduplicar=args.deduplicar,
+            estatisticas=estatisticas
+        )
+        if plano is None:
+            org.mostrar_resumo({}, simular=True)
+            return
+        estatisticas.salvar(args.estatisticas)
+        org.mostrar_resumo(plano.estatisticas(), simular=True)
+        estatisticas.mostrar()
+        print(f"\n{org.emoji_status['info']} Estatísticas salvas em: {args.estatisticas}")
+    elif args.salvar_plano:
+        plano = org.planejar(
+            caminho=args.pasta,
+            criterio=args.criterio,
+            formato=args.formato,
+            workers=args.workers,
+            mostrar=args.simular,
+            recursivo=args.recursivo,
+            incluir=args.incluir,
+            excluir=args.excluir,
+            profundidade_max=args.profundidade_max,
+            deduplicar=args.deduplicar
+        )
+        if plano is None:
+            org.mostrar_resumo({}, simular=args.simular)
+            return
+        plano.salvar(args.salvar_plano)
+        print(f"{org.emoji_status['info']} Plano salvo em: {args.salvar_plano}")
+        if args.simular:
+            stats = plano.estatisticas()
+        else:
+            stats = org.executar_plano(plano, backup=args.backup, workers=args.workers,
+                                       diario=diario)
+        org.mostrar_resumo(stats, simular=args.simular)
     else:
         stats = org.processar_pasta(
             caminho=args.pasta,
             criterio=args.criterio,
             formato=args.formato,
             simular=args.simular,
-            backup=args.backup
+            backup=args.backup,
+            workers=args.workers,
+            recursivo=args.recursivo,
+            incluir=args.incluir,
+            excluir=args.excluir,
+            profundidade_max=args.profundidade_max,
+            deduplicar=args.deduplicar,
+            diario=diario
         )
         
         org.mostrar_resumo(stats, simular=args.simular)
@@ -381,7 +1575,7 @@ if __name__ == "__main__":
 """
 
 # Documentação adicional
-__all__ = ['Organizador', 'organizar_agora', 'simular_organizacao', 'interface_conversacional']
+__all__ = ['Organizador', 'Plano', 'ItemPlano', 'organizar_agora', 'simular_organizacao', 'interface_conversacional']
 __version__ = "1.0.0"
 __author__ = "Assistente de Organização"
 __description__ = "Organizador inteligente de arquivos com interface conversacional"
@@ -0,0 +1,501 @@
+"""
+Benchmark das ferramentas com cargas sintéticas reproduzíveis
+
+Gera pastas e áudios artificiais (sempre iguais para a mesma semente e
+escala) e mede contador, organizador e transcrição em cada modo:
+arquivos/s, bytes/s, chamadas ao sistema de arquivos e pico de memória.
+Cada medição roda num processo separado, para que o pico de memória de
+uma não contamine a outra. Os resultados vão para um JSON que pode ser
+comparado com execuções anteriores (--comparar).
+
+Cargas:
+    plano_N    N arquivos numa única pasta (1k, 100k, 1M conforme a escala)
+    arvore     árvore profunda, com arquivos em todos os níveis
+    colisoes   muitos arquivos com os mesmos nomes em pastas diferentes
+               (o organizador recursivo precisa renomear quase todos)
+    audio      WAVs de durações variadas (e MP3, se houver ffmpeg),
+               transcritos com o backend "teste" (sem rede)
+
+As chamadas são contadas envolvendo funções do módulo os (stat, scandir,
+mkdir, replace...), rotuladas "os.<nome>"; o open embutido vira
+"builtins.open" e o rename sem substituição do organizador (renameat2
+via ctypes, que não passa pelo módulo os) vira "renomear_exclusivo". O
+stat feito por DirEntry.stat não passa por nenhuma delas, então os
+números servem para comparar execuções, não como total exato.
+Na transcrição paralela as chamadas feitas pelos processos do pool
+também não são contadas (o pico de memória deles é).
+
+Exemplo de uso:
+    python benchmark.py                              # escala pequena
+    python benchmark.py --escala media --saida r.json
+    python benchmark.py --comparar r.json            # mostra a variação
+"""
+
+import argparse
+import builtins
+import contextlib
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from array import array
+from collections import Counter
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: sem pico de memória
+    resource = None
+
+SEMENTE = 20240101
+VERSAO_CARGA = 1  # mude ao alterar os geradores, para não reaproveitar cargas antigas
+
+ESCALAS = {
+    "pequena": {"plano": [1_000], "arvore": (4, 3, 5), "colisoes": (1_000, 20),
+                "audios": [5, 20, 60]},
+    "media": {"plano": [1_000, 100_000], "arvore": (6, 3, 10), "colisoes": (20_000, 50),
+              "audios": [5, 30, 120, 300]},
+    "grande": {"plano": [1_000, 100_000, 1_000_000], "arvore": (7, 4, 10),
+               "colisoes": (100_000, 100), "audios": [5, 30, 120, 300, 900, 1800]},
+}
+
+# Ferramenta e modos medidos em cada tipo de carga
+MODOS = {
+    "plano": [("contador", "listar"), ("contador", "arvore"),
+              ("organizador", "simular"), ("organizador", "mover"),
+              ("organizador", "mover_paralelo")],
+    "arvore": [("contador", "arvore"), ("organizador", "simular_recursivo"),
+               ("organizador", "mover_recursivo")],
+    "colisoes": [("organizador", "mover_recursivo")],
+    "audio": [("transcricao", "sequencial"), ("transcricao", "paralelo")],
+}
+# Modos que alteram a carga: cada medição recebe uma cópia recém-gerada
+DESTRUTIVOS = {"mover", "mover_paralelo", "mover_recursivo"}
+
+# Tamanho médio dos arquivos por carga (bytes)
+TAMANHO_MEDIO = {"plano": 2048, "arvore": 4096, "colisoes": 1024}
+# Datas espalhadas por dois anos, para gerar várias pastas de mês
+PERIODO_DATAS = 2 * 365 * 86400
+INICIO_DATAS = 1_672_531_200  # 2023-01-01
+
+TAXA_AUDIO = 16000
+
+
+# ---------------------------------------------------------------------------
+# Geração das cargas
+# ---------------------------------------------------------------------------
+
+class _Gerador:
+    """Escreve arquivos com tamanhos, conteúdos e datas determinísticos"""
+
+    def __init__(self, semente: int):
+        self.rnd = random.Random(semente)
+        self._dados = self.rnd.randbytes(1 << 20)
+        self.arquivos = 0
+        self.bytes = 0
+
+    def arquivo(self, caminho: str, tamanho_medio: int):
+        # Distribuição exponencial: muitos pequenos, alguns grandes
+        tamanho = min(int(self.rnd.expovariate(1 / tamanho_medio)), len(self._dados) - 1)
+        inicio = self.rnd.randrange(len(self._dados) - tamanho)
+        with open(caminho, "wb") as f:
+            f.write(self._dados[inicio:inicio + tamanho])
+        data = INICIO_DATAS + self.rnd.randrange(PERIODO_DATAS)
+        os.utime(caminho, (data, data))
+        self.arquivos += 1
+        self.bytes += tamanho
+
+
+def _gerar_plano(pasta, n, gerador):
+    for i in range(n):
+        gerador.arquivo(os.path.join(pasta, f"arquivo_{i:07d}.dat"), TAMANHO_MEDIO["plano"])
+
+
+def _gerar_arvore(pasta, profundidade, ramos, por_pasta, gerador):
+    pilha = [(pasta, 0)]
+    while pilha:
+        atual, nivel = pilha.pop()
+        for i in range(por_pasta):
+            gerador.arquivo(os.path.join(atual, f"f{i:03d}.bin"), TAMANHO_MEDIO["arvore"])
+        if nivel < profundidade:
+            for r in range(ramos):
+                sub = os.path.join(atual, f"n{nivel}_{r}")
+                os.mkdir(sub)
+                pilha.append((sub, nivel + 1))
+
+
+def _gerar_colisoes(pasta, n, nomes, gerador):
+    # Como câmeras diferentes: IMG_0001.jpg repetido em várias pastas
+    pastas = max(1, n // nomes)
+    for p in range(pastas):
+        sub = os.path.join(pasta, f"camera_{p:05d}")
+        os.mkdir(sub)
+        for i in range(min(nomes, n - p * nomes)):
+            gerador.arquivo(os.path.join(sub, f"IMG_{i:04d}.jpg"), TAMANHO_MEDIO["colisoes"])
+
+
+def _escrever_wav(caminho, segundos, rnd):
+    """Tons com pausas de silêncio (segmentação e pulo de silêncio são exercitados)"""
+    amostras = array("h")
+    t = 0.0
+    while t < segundos:
+        fala = min(rnd.uniform(1.5, 6.0), segundos - t)
+        frequencia = rnd.uniform(120, 400)
+        n = int(fala * TAXA_AUDIO)
+        passo = 2 * math.pi * frequencia / TAXA_AUDIO
+        amostras.extend(int(8000 * math.sin(passo * k)) for k in range(n))
+        t += fala
+        pausa = min(rnd.uniform(0.2, 1.2), max(0.0, segundos - t))
+        amostras.extend([0] * int(pausa * TAXA_AUDIO))
+        t += pausa
+    if sys.byteorder != "little":
+        amostras.byteswap()
+    with wave.open(caminho, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(TAXA_AUDIO)
+        w.writeframes(amostras.tobytes())
+
+
+def _gerar_audios(pasta, duracoes, gerador):
+    ffmpeg = shutil.which("ffmpeg")
+    for i, segundos in enumerate(duracoes):
+        caminho = os.path.join(pasta, f"audio_{i:02d}_{segundos}s.wav")
+        _escrever_wav(caminho, segundos, gerador.rnd)
+        # Metade em MP3, quando possível, para medir também a decodificação
+        if ffmpeg and i % 2:
+            mp3 = caminho[:-4] + ".mp3"
+            feito = subprocess.run([ffmpeg, "-nostdin", "-loglevel", "error", "-y", "-i", caminho,
+                                    "-b:a", "64k", mp3]).returncode == 0
+            if feito:
+                os.remove(caminho)
+                caminho = mp3
+        gerador.arquivos += 1
+        gerador.bytes += os.path.getsize(caminho)
+
+
+def cargas(escala):
+    """{nome da carga: (tipo, parâmetros)} de uma escala"""
+    config = ESCALAS[escala]
+    resultado = {f"plano_{n}": ("plano", n) for n in config["plano"]}
+    resultado["arvore"] = ("arvore", config["arvore"])
+    resultado["colisoes"] = ("colisoes", config["colisoes"])
+    resultado["audio"] = ("audio", config["audios"])
+    return resultado
+
+
+def preparar_carga(nome, tipo, parametros, pasta_trabalho, nova=False):
+    """
+    Gera (ou reaproveita) a carga e devolve (pasta, arquivos, bytes)
+
+    Cargas já geradas com os mesmos parâmetros são reaproveitadas; com
+    nova=True a carga é gerada numa pasta descartável.
+    """
+    assinatura = {"versao": VERSAO_CARGA, "tipo": tipo, "parametros": parametros,
+                  "semente": SEMENTE}
+    if nova:
+        pasta = tempfile.mkdtemp(prefix=f"{nome}_", dir=pasta_trabalho)
+    else:
+        pasta = os.path.join(pasta_trabalho, nome)
+        marcador = pasta + ".json"
+        if os.path.exists(marcador):
+            with open(marcador, encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados["assinatura"] == json.loads(json.dumps(assinatura)):
+                return pasta, dados["arquivos"], dados["bytes"]
+        shutil.rmtree(pasta, ignore_errors=True)
+        os.makedirs(pasta)
+
+    gerador = _Gerador(SEMENTE)
+    if tipo == "plano":
+        _gerar_plano(pasta, parametros, gerador)
+    elif tipo == "arvore":
+        _gerar_arvore(pasta, *parametros, gerador)
+    elif tipo == "colisoes":
+        _gerar_colisoes(pasta, *parametros, gerador)
+    else:
+        _gerar_audios(pasta, parametros, gerador)
+
+    if not nova:
+        with open(pasta + ".json", "w", encoding="utf-8") as f:
+            json.dump({"assinatura": assinatura, "arquivos": gerador.arquivos,
+                       "bytes": gerador.bytes}, f)
+    return pasta, gerador.arquivos, gerador.bytes
+
+
+# ---------------------------------------------------------------------------
+# Medição
+# ---------------------------------------------------------------------------
+
+# Funções de os que correspondem (quase sempre) a uma chamada ao sistema
+_CHAMADAS_OS = ("stat", "lstat", "scandir", "listdir", "mkdir", "rename", "replace",
+                "link", "remove", "unlink", "open", "utime", "sendfile", "copy_file_range")
+
+
+class ContadorChamadas:
+    """Conta chamadas a funções do módulo os, ao open embutido e ao rename
+    exclusivo do organizador enquanto instalado"""
+
+    def __init__(self):
+        self.contagem = Counter()
+        self._trava = threading.Lock()
+        self._originais = {}
+
+    def _envolver(self, modulo, nome, rotulo):
+        original = getattr(modulo, nome, None)
+        if original is None:
+            return
+        self._originais[(modulo, nome)] = original
+        contagem, trava = self.contagem, self._trava
+
+        def envolvida(*args, **kwargs):
+            with trava:
+                contagem[rotulo] += 1
+            return original(*args, **kwargs)
+
+        setattr(modulo, nome, envolvida)
+
+    def instalar(self, ferramenta=None):
+        if ferramenta == "organizador":
+            # O rename exclusivo chama a libc direto (ctypes); no Windows é
+            # o os.rename original, guardado antes de ser envolvido abaixo
+            import Organizador_LLM
+            self._envolver(Organizador_LLM, "_renomear_exclusivo", "renomear_exclusivo")
+        for nome in _CHAMADAS_OS:
+            self._envolver(os, nome, f"os.{nome}")
+        self._envolver(builtins, "open", "builtins.open")
+
+    def remover(self):
+        for (modulo, nome), original in self._originais.items():
+            setattr(modulo, nome, original)
+        self._originais.clear()
+
+
+def _pico_rss_kb():
+    """Pico de memória deste processo e dos filhos já encerrados (KB)"""
+    if resource is None:
+        return None
+    pico = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # macOS informa em bytes; Linux em KB
+    return pico // 1024 if sys.platform == "darwin" else pico
+
+
+def _totais_fases(eventos):
+    """Segundos gastos em cada fase instrumentada (stat, mkdir, move...)"""
+    return {fase: round(h["total"], 4) for fase, h in eventos.exportar().items()}
+
+
+def _executar_ferramenta(ferramenta, modo, pasta):
+    """Roda a ferramenta na carga; devolve dados extras do resultado"""
+    if ferramenta == "contador":
+        import contador
+        if modo == "listar":
+            return {"encontrados": len(contador.contar_arquivos(pasta) or [])}
+        resultado = contador.contar_arvore(pasta, workers=16, profundidade_resumo=0)
+        return {"encontrados": resultado["total"]["arquivos"]}
+
+    if ferramenta == "organizador":
+        from Organizador_LLM import Organizador
+        from eventos import Eventos
+        eventos = Eventos()
+        org = Organizador(eventos=eventos)
+        recursivo = modo.endswith("_recursivo")
+        workers = 8 if modo == "mover_paralelo" else 1
+        plano = org.planejar(pasta, mostrar=False, recursivo=recursivo, workers=workers)
+        if modo.startswith("simular"):
+            return {"encontrados": len(plano), "fases": _totais_fases(eventos)}
+        stats = org.executar_plano(plano, workers=workers)
+        return {"encontrados": stats.get("arquivos_processados", 0),
+                "erros": stats.get("erros", 0), "fases": _totais_fases(eventos)}
+
+    import transcribe_audio
+    jobs = 1 if modo == "sequencial" else max(2, min(8, os.cpu_count() or 2))
+    transcribe_audio.transcrever_pasta(pasta, jobs=jobs, backend="teste")
+    return {"jobs": jobs}
+
+
+def medir(carga, ferramenta, modo, escala, pasta_trabalho):
+    """Uma medição completa (chamada no processo filho)"""
+    tipo, parametros = cargas(escala)[carga]
+    pasta, arquivos, nbytes = preparar_carga(carga, tipo, parametros, pasta_trabalho,
+                                             nova=modo in DESTRUTIVOS)
+    contador = ContadorChamadas()
+    resultado = {"carga": carga, "ferramenta": ferramenta, "modo": modo,
+                 "arquivos": arquivos, "bytes": nbytes}
+    try:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo), \
+                contextlib.redirect_stderr(nulo):
+            contador.instalar(ferramenta)
+            inicio = time.perf_counter()
+            try:
+                extras = _executar_ferramenta(ferramenta, modo, pasta)
+            finally:
+                segundos = time.perf_counter() - inicio
+                contador.remover()
+    except ImportError as e:
+        resultado["indisponivel"] = str(e)
+        return resultado
+    finally:
+        if modo in DESTRUTIVOS:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    resultado.update(extras)
+    resultado["segundos"] = round(segundos, 4)
+    resultado["arquivos_por_s"] = round(arquivos / segundos, 1) if segundos > 0 else None
+    resultado["bytes_por_s"] = round(nbytes / segundos, 1) if segundos > 0 else None
+    resultado["chamadas"] = dict(contador.contagem.most_common())
+    resultado["chamadas_total"] = sum(contador.contagem.values())
+    resultado["chamadas_por_arquivo"] = round(resultado["chamadas_total"] / arquivos, 2) \
+        if arquivos else None
+    resultado["pico_rss_kb"] = _pico_rss_kb()
+    return resultado
+
+
+def _medir_em_processo(carga, ferramenta, modo, escala, pasta_trabalho):
+    """Roda medir() num processo novo e devolve o resultado"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as f:
+        saida = f.name
+    try:
+        cmd = [sys.executable, os.path.abspath(__file__), "--_medir",
+               f"{carga}:{ferramenta}:{modo}", "--escala", escala,
+               "--pasta-trabalho", pasta_trabalho, "--_resultado", saida]
+        processo = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if processo.returncode != 0:
+            return {"carga": carga, "ferramenta": ferramenta, "modo": modo,
+                    "erro": processo.stderr.strip().splitlines()[-1:] or ["falhou"]}
+        with open(saida, encoding="utf-8") as f:
+            return json.load(f)
+    finally:
+        os.remove(saida)
+
+
+# ---------------------------------------------------------------------------
+# Relatório
+# ---------------------------------------------------------------------------
+
+def _chave(r):
+    return (r["carga"], r["ferramenta"], r["modo"])
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=os.path.dirname(os.path.abspath(__file__)),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def mostrar_resultados(resultados, anteriores=None):
+    """Tabela no terminal; com anteriores, a variação de arquivos/s"""
+    anteriores = {_chave(r): r for r in (anteriores or [])}
+    print()
+    print(f"{'carga':<14} {'ferramenta':<12} {'modo':<18} {'arq/s':>12} {'MB/s':>9} "
+          f"{'chamadas/arq':>13} {'pico RSS':>10}")
+    print("─" * 94)
+    for r in resultados:
+        inicio = f"{r['carga']:<14} {r['ferramenta']:<12} {r['modo']:<18}"
+        if "erro" in r or "indisponivel" in r:
+            print(f"{inicio} ⚠️  {r.get('erro') or r.get('indisponivel')}")
+            continue
+        rss = f"{r['pico_rss_kb'] / 1024:.0f} MB" if r.get("pico_rss_kb") else "-"
+        linha = (f"{inicio} {r['arquivos_por_s'] or 0:>12,.0f} "
+                 f"{(r['bytes_por_s'] or 0) / (1 << 20):>9.1f} "
+                 f"{r['chamadas_por_arquivo'] or 0:>13} {rss:>10}")
+        anterior = anteriores.get(_chave(r))
+        if anterior and anterior.get("arquivos_por_s") and r.get("arquivos_por_s"):
+            variacao = r["arquivos_por_s"] / anterior["arquivos_por_s"] - 1
+            simbolo = "🔺" if variacao > 0.05 else "🔻" if variacao < -0.05 else "  "
+            linha += f"  {simbolo}{variacao:+.0%}"
+        print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark das ferramentas com cargas sintéticas")
+    parser.add_argument("--escala", choices=sorted(ESCALAS), default="pequena",
+                        help="Tamanho das cargas (padrão: pequena; grande inclui 1M arquivos)")
+    parser.add_argument("--cargas", metavar="LISTA",
+                        help="Só estas cargas, separadas por vírgula (ex.: plano_1000,audio)")
+    parser.add_argument("--ferramentas", metavar="LISTA",
+                        help="Só estas ferramentas (contador, organizador, transcricao)")
+    parser.add_argument("--pasta-trabalho", metavar="PASTA",
+                        help="Onde gerar as cargas; reaproveitadas entre execuções "
+                             "(padrão: pasta temporária apagada no fim)")
+    parser.add_argument("--saida", metavar="ARQUIVO",
+                        help="JSON dos resultados (padrão: benchmark_AAAAMMDD_HHMMSS.json)")
+    parser.add_argument("--comparar", metavar="ARQUIVO",
+                        help="Resultado anterior para mostrar a variação")
+    parser.add_argument("--_medir", help=argparse.SUPPRESS)
+    parser.add_argument("--_resultado", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._medir:
+        # Processo filho: uma medição só
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        resultado = medir(*args._medir.split(":"), args.escala, args.pasta_trabalho)
+        with open(args._resultado, "w", encoding="utf-8") as f:
+            json.dump(resultado, f)
+        return
+
+    todas = cargas(args.escala)
+    escolhidas = args.cargas.split(",") if args.cargas else list(todas)
+    desconhecidas = [c for c in escolhidas if c not in todas]
+    if desconhecidas:
+        parser.error(f"carga desconhecida: {', '.join(desconhecidas)} "
+                     f"(disponíveis: {', '.join(todas)})")
+    ferramentas = set(args.ferramentas.split(",")) if args.ferramentas else None
+
+    temporaria = args.pasta_trabalho is None
+    pasta_trabalho = os.path.abspath(args.pasta_trabalho or tempfile.mkdtemp(prefix="benchmark_"))
+    os.makedirs(pasta_trabalho, exist_ok=True)
+
+    resultados = []
+    try:
+        for carga in escolhidas:
+            tipo, parametros = todas[carga]
+            print(f"⏳ Gerando carga {carga}...", flush=True)
+            preparar_carga(carga, tipo, parametros, pasta_trabalho)
+            for ferramenta, modo in MODOS[tipo]:
+                if ferramentas and ferramenta not in ferramentas:
+                    continue
+                print(f"   ▶ {ferramenta} / {modo}", flush=True)
+                resultados.append(_medir_em_processo(carga, ferramenta, modo, args.escala,
+                                                     pasta_trabalho))
+    finally:
+        if temporaria:
+            shutil.rmtree(pasta_trabalho, ignore_errors=True)
+
+    anteriores = None
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            anteriores = json.load(f)["resultados"]
+    mostrar_resultados(resultados, anteriores)
+
+    saida = args.saida or datetime.now().strftime("benchmark_%Y%m%d_%H%M%S.json")
+    relatorio = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "escala": args.escala,
+        "semente": SEMENTE,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "resultados": resultados,
+    }
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\n📝 Resultados salvos em: {saida}")
+
+
+if __name__ == "__main__":
+    main()
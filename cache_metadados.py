@@ -0,0 +1,152 @@
+"""
+Cache persistente de dados calculados por arquivo
+
+Guarda em um SQLite o que é caro de recalcular (hash de conteúdo, data
+escolhida, duração e transcrição de áudios) para que execuções repetidas
+sobre as mesmas pastas pulem o trabalho em arquivos que não mudaram.
+
+A chave é (st_dev, st_ino, st_size, st_mtime_ns): se o arquivo for
+alterado, movido para outro disco ou substituído, a chave muda e o valor
+antigo simplesmente deixa de ser usado (e acaba removido pelo limite de
+tamanho, do menos usado para o mais usado).
+
+Exemplo de uso:
+    from cache_metadados import CacheMetadados
+    with CacheMetadados("~/.cache/arquivos_em_massa/metadados.sqlite") as cache:
+        st = os.stat(caminho)
+        h = cache.obter(st, "hash")
+        if h is None:
+            h = calcular_hash(caminho)
+            cache.gravar(st, "hash", h)
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+CAMINHO_PADRAO = os.path.join("~", ".cache", "arquivos_em_massa", "metadados.sqlite")
+
+Chave = Tuple[int, int, int, int]
+
+
+def chave_stat(stat: os.stat_result) -> Chave:
+    """Chave de cache de um arquivo a partir do seu stat"""
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+class CacheMetadados:
+    """
+    Cache em SQLite com remoção dos itens menos usados (LRU)
+
+    Seguro para uso por várias threads do mesmo processo. As gravações e
+    as atualizações de "último uso" são acumuladas em memória e enviadas
+    ao disco em lotes, para que o cache não vire o gargalo.
+    """
+
+    def __init__(self,
+                 caminho: str = CAMINHO_PADRAO,
+                 max_entradas: int = 1_000_000,
+                 lote: int = 1000):
+        """
+        Args:
+            caminho: Arquivo SQLite (criado se não existir)
+            max_entradas: Limite de registros; os menos usados são removidos
+            lote: Quantidade de alterações acumuladas antes de gravar
+        """
+        self.caminho = os.path.expanduser(caminho)
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self.max_entradas = max_entradas
+        self.lote = lote
+        self.acertos = 0
+        self.falhas = 0
+        self._trava = threading.Lock()
+        self._pendentes: Dict[Tuple[Chave, str], str] = {}
+        self._usados: Dict[Tuple[Chave, str], float] = {}
+        self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.execute("""
+            CREATE TABLE IF NOT EXISTS metadados (
+                dev INTEGER, ino INTEGER, tamanho INTEGER, mtime_ns INTEGER,
+                campo TEXT, valor TEXT, ultimo_uso REAL,
+                PRIMARY KEY (dev, ino, tamanho, mtime_ns, campo)
+            )
+        """)
+        self._conexao.execute(
+            "CREATE INDEX IF NOT EXISTS idx_ultimo_uso ON metadados (ultimo_uso)")
+        self._conexao.commit()
+
+    def obter(self, stat: os.stat_result, campo: str) -> Optional[Any]:
+        """Devolve o valor guardado para o arquivo, ou None se não houver"""
+        chave = (chave_stat(stat), campo)
+        with self._trava:
+            valor = self._pendentes.get(chave)
+            if valor is None:
+                linha = self._conexao.execute(
+                    "SELECT valor FROM metadados WHERE dev=? AND ino=? AND tamanho=? "
+                    "AND mtime_ns=? AND campo=?", (*chave[0], campo)).fetchone()
+                valor = linha[0] if linha else None
+            if valor is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+            self._usados[chave] = time.time()
+            self._talvez_gravar()
+        return json.loads(valor)
+
+    def gravar(self, stat: os.stat_result, campo: str, valor: Any):
+        """Guarda um valor (serializável em JSON) para o arquivo"""
+        chave = (chave_stat(stat), campo)
+        with self._trava:
+            self._pendentes[chave] = json.dumps(valor, ensure_ascii=False)
+            self._usados.pop(chave, None)
+            self._talvez_gravar()
+
+    def _talvez_gravar(self):
+        if len(self._pendentes) + len(self._usados) >= self.lote:
+            self._gravar_pendentes()
+
+    def _gravar_pendentes(self):
+        """Envia as alterações acumuladas ao disco (chamar com a trava)"""
+        agora = time.time()
+        with self._conexao:
+            self._conexao.executemany(
+                "INSERT OR REPLACE INTO metadados VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*c, campo, valor, agora) for (c, campo), valor in self._pendentes.items()])
+            self._conexao.executemany(
+                "UPDATE metadados SET ultimo_uso=? WHERE dev=? AND ino=? AND tamanho=? "
+                "AND mtime_ns=? AND campo=?",
+                [(uso, *c, campo) for (c, campo), uso in self._usados.items()])
+        self._pendentes.clear()
+        self._usados.clear()
+
+    def _remover_excedentes(self):
+        """Remove os registros menos usados acima de max_entradas"""
+        total = self._conexao.execute("SELECT COUNT(*) FROM metadados").fetchone()[0]
+        excesso = total - self.max_entradas
+        if excesso > 0:
+            with self._conexao:
+                self._conexao.execute(
+                    "DELETE FROM metadados WHERE rowid IN (SELECT rowid FROM metadados "
+                    "ORDER BY ultimo_uso LIMIT ?)", (excesso,))
+
+    def fechar(self):
+        """Grava o que falta, aplica o limite de tamanho e fecha o arquivo"""
+        with self._trava:
+            if self._conexao is None:
+                return
+            self._gravar_pendentes()
+            self._remover_excedentes()
+            self._conexao.close()
+            self._conexao = None
+
+    def __enter__(self) -> "CacheMetadados":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -1,9 +1,115 @@
+import json
 import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from estatisticas import EstatisticasArquivos, formatar_bytes
+from eventos import Eventos, Saida, SaidaJSONL
+from indice_arvore import IndiceArvore, atualizar_indice
+from varredura import varrer, varrer_paralelo
+
+# Navegação: itens por página e subpastas lidas em segundo plano
+ITENS_POR_PAGINA = 40
+PRE_CARREGAR = 8
+
+
+class CacheListagens:
+    """
+    Listagens de pastas já lidas na navegação.
+
+    Cada pasta é lida uma única vez (um scandir dá as subpastas e os
+    arquivos) e a listagem vale enquanto o mtime da pasta não mudar, que é
+    o que acontece quando algo é criado, removido ou renomeado nela. Ir e
+    voltar entre pastas custa um stat em vez de uma nova leitura, o que
+    faz diferença em compartilhamentos de rede lentos.
+
+    As subpastas mais prováveis de serem abertas em seguida podem ser
+    lidas antes, em segundo plano (pre_carregar).
+    """
+
+    def __init__(self, workers=4, max_pastas=64):
+        self.workers = workers
+        self.max_pastas = max_pastas
+        self._trava = threading.Lock()
+        self._itens = OrderedDict()   # caminho -> (mtime_ns, pastas, arquivos)
+        self._em_andamento = {}       # caminho -> Future da leitura antecipada
+        self._executor = None
+
+    def listar(self, caminho):
+        """
+        Retorna (pastas, arquivos), nomes ordenados.
+
+        Raises:
+            OSError: se a pasta não puder ser lida
+        """
+        mtime = os.stat(caminho).st_mtime_ns
+        with self._trava:
+            item = self._itens.get(caminho)
+            if item is not None and item[0] == mtime:
+                self._itens.move_to_end(caminho)
+                return item[1], item[2]
+            futuro = self._em_andamento.get(caminho)
+        if futuro is not None:
+            # Já está sendo lida em segundo plano: aproveita a mesma leitura
+            pastas, arquivos, mtime_lido = futuro.result()
+            if mtime_lido == mtime:
+                return pastas, arquivos
+        return self._ler(caminho)[:2]
+
+    def _ler(self, caminho):
+        # O mtime é lido antes: uma mudança durante a leitura invalida a listagem
+        mtime = os.stat(caminho).st_mtime_ns
+        pastas, arquivos = [], []
+        for e in varrer(caminho, seguir_links=True):
+            if e.eh_dir:
+                pastas.append(e.nome)
+            elif e.eh_arquivo:
+                arquivos.append(e.nome)
+        pastas.sort()
+        arquivos.sort()
+        with self._trava:
+            self._itens[caminho] = (mtime, pastas, arquivos)
+            self._itens.move_to_end(caminho)
+            while len(self._itens) > self.max_pastas:
+                self._itens.popitem(last=False)
+        return pastas, arquivos, mtime
+
+    def _ler_antecipado(self, caminho):
+        try:
+            return self._ler(caminho)
+        finally:
+            with self._trava:
+                self._em_andamento.pop(caminho, None)
+
+    def pre_carregar(self, caminhos):
+        """Lê em segundo plano as pastas que ainda não estão no cache."""
+        with self._trava:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            for caminho in caminhos:
+                if caminho in self._itens or caminho in self._em_andamento:
+                    continue
+                self._em_andamento[caminho] = self._executor.submit(self._ler_antecipado, caminho)
+
+    def fechar(self):
+        """Descarta as leituras antecipadas que ainda não começaram."""
+        with self._trava:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_listagens = CacheListagens()
+
 
 def listar_pastas(caminho):
     """Retorna lista de subpastas (nomes) dentro do caminho, ignorando arquivos."""
     try:
-        itens = sorted(os.listdir(caminho))
+        # Tipo vem do scandir: nenhum stat extra por item
+        pastas, _ = _listagens.listar(caminho)
     except PermissionError:
         print("🔒 Sem permissão para acessar essa pasta.")
         return []
@@ -11,14 +117,13 @@ def listar_pastas(caminho):
         print(f"❌ Erro ao acessar a pasta: {e}")
         return []
 
-    pastas = [item for item in itens if os.path.isdir(os.path.join(caminho, item))]
     return pastas
 
 
 def contar_arquivos(caminho):
     """Conta arquivos (não-pastas) dentro do caminho informado."""
     try:
-        itens = os.listdir(caminho)
+        _, arquivos = _listagens.listar(caminho)
     except PermissionError:
         print("🔒 Sem permissão para acessar essa pasta.")
         return None
@@ -26,55 +131,226 @@ def contar_arquivos(caminho):
         print(f"❌ Erro ao acessar a pasta: {e}")
         return None
 
-    arquivos = [item for item in itens if os.path.isfile(os.path.join(caminho, item))]
     return arquivos
 
 
-def escolher_subpasta(caminho_atual):
+def _novo_total():
+    return {"arquivos": 0, "pastas": 0, "bytes": 0}
+
+
+def contar_arvore(caminho, workers=16, profundidade_resumo=1, com_bytes=True, excluir=None,
+                  estatisticas=None, eventos=None):
+    """
+    Conta arquivos, pastas e bytes de uma árvore inteira.
+
+    As pastas são lidas em paralelo (varredura.varrer_paralelo), então em
+    árvores grandes e armazenamento em rede o limite é o próprio disco.
+    Links não são seguidos e não entram nos bytes.
+
+    Args:
+        caminho: Pasta raiz
+        workers: Threads lendo pastas ao mesmo tempo
+        profundidade_resumo: Até que nível abaixo da raiz guardar subtotais
+                             (1 = cada subpasta direta; 0 = só o total)
+        com_bytes: Se False, não faz stat dos arquivos (só leitura das
+                   pastas, bem mais rápido em rede)
+        excluir: Globs de arquivos e pastas a pular
+        estatisticas: EstatisticasArquivos opcional, alimentado na mesma
+                      passada (por extensão, mês de modificação e tamanho;
+                      requer com_bytes)
+        eventos: Eventos que recebe o início, cada pasta lida (pasta_lida),
+                 as pastas sem acesso (erro) e o fim; o tempo de leitura das
+                 pastas vai para a fase "scandir" (ver eventos.py)
+
+    Returns:
+        Dicionário com total, subpastas ({caminho relativo: total da
+        subárvore}), erros (lista de mensagens) e segundos
+
+    Raises:
+        OSError: se a pasta raiz não puder ser aberta
+    """
+    if eventos is None:
+        eventos = Eventos()
+    inicio = time.perf_counter()
+    total = _novo_total()
+    subtotais = {}
+    erros = []
+    pastas = varrer_paralelo(caminho, workers=workers, excluir=excluir, com_stat=com_bytes,
+                             eventos=eventos)
+    eventos.emitir("inicio", ferramenta="contador", pasta=str(caminho), total=None,
+                   contar="pasta_lida", workers=workers, com_bytes=com_bytes)
+    for pasta in pastas:
+        propria = {
+            "arquivos": len(pasta.arquivos),
+            "pastas": pasta.subpastas,
+            "bytes": sum(e.stat.st_size for e in pasta.arquivos if not e.eh_link) if com_bytes else 0,
+        }
+        if estatisticas is not None and com_bytes:
+            for e in pasta.arquivos:
+                if not e.eh_link:
+                    estatisticas.adicionar(e.nome, e.stat.st_size, e.stat.st_mtime)
+        if pasta.erro is not None:
+            erros.append(f"{pasta.caminho}: {pasta.erro}")
+            eventos.emitir("erro", arquivo=pasta.caminho, mensagem=str(pasta.erro))
+        relativo = os.path.relpath(pasta.caminho, caminho) if pasta.profundidade else ""
+        # Cada pasta soma no total e em cada ancestral até profundidade_resumo
+        partes = relativo.split(os.sep) if relativo else []
+        destinos = [total]
+        for nivel in range(1, min(len(partes), profundidade_resumo) + 1):
+            chave = os.sep.join(partes[:nivel])
+            if chave not in subtotais:
+                subtotais[chave] = _novo_total()
+            destinos.append(subtotais[chave])
+        for destino in destinos:
+            for campo, valor in propria.items():
+                destino[campo] += valor
+        eventos.emitir("pasta_lida", pasta=relativo or ".", **propria)
+
+    segundos = time.perf_counter() - inicio
+    eventos.emitir("fim", ferramenta="contador", total=dict(total), erros=len(erros),
+                   segundos=round(segundos, 3))
+    return {
+        "total": total,
+        "subpastas": subtotais,
+        "erros": erros,
+        "segundos": segundos,
+    }
+
+
+class ProgressoContagem(Saida):
+    """
+    Linha de progresso da contagem (arquivos, pastas e bytes já lidos),
+    redesenhada no máximo a cada `intervalo` e apagada no fim
+    """
+
+    def __init__(self, arquivo=None, intervalo=0.5):
+        self.arquivo = arquivo or sys.stderr
+        self.intervalo = intervalo
+        self.total = _novo_total()
+        self.com_bytes = True
+        self._ultimo = 0.0
+        self._desenhada = False
+
+    def receber(self, tipo, dados):
+        if tipo == "inicio":
+            self.total = _novo_total()
+            self.com_bytes = dados.get("com_bytes", True)
+        elif tipo == "pasta_lida":
+            for campo in self.total:
+                self.total[campo] += dados[campo]
+            agora = time.perf_counter()
+            if agora - self._ultimo >= self.intervalo:
+                self._ultimo = agora
+                self._desenhar()
+        elif tipo == "fim" and self._desenhada:
+            print("\r" + " " * 70 + "\r", end="", file=self.arquivo, flush=True)
+            self._desenhada = False
+
+    def _desenhar(self):
+        tamanho = f", {formatar_bytes(self.total['bytes'])}" if self.com_bytes else ""
+        print(f"\r⏳ {self.total['arquivos']:,} arquivo(s), {self.total['pastas']:,} pasta(s)"
+              f"{tamanho}...", end="", file=self.arquivo, flush=True)
+        self._desenhada = True
+
+
+class PastasJSONL(Saida):
+    """--jsonl: uma linha JSON por pasta lida, à medida que são lidas"""
+
+    def receber(self, tipo, dados):
+        if tipo == "pasta_lida":
+            print(json.dumps(dados, ensure_ascii=False), flush=True)
+
+
+def _resumo_totais(totais):
+    return f"{totais['arquivos']:,} arquivo(s), {formatar_bytes(totais['bytes'])}"
+
+
+def escolher_subpasta(caminho_atual, totais=None):
     """
     Mostra as subpastas do caminho atual e deixa o usuário escolher uma,
     voltar, ou contar os arquivos da pasta atual.
+
+    Pastas com muitas subpastas são mostradas em páginas. totais é o
+    dicionário {caminho: resultado de contar_arvore} já calculado na
+    navegação; quando houver, os totais recursivos aparecem na tela.
     Retorna:
       - ('entrar', nome_da_pasta_escolhida)
       - ('contar', None)  -> usuário quer contar arquivos do caminho_atual
+      - ('totais', None)  -> usuário quer os totais recursivos do caminho_atual
       - ('voltar', None)  -> usuário quer subir um nível
       - ('sair', None)    -> usuário quer encerrar
     """
-    pastas = listar_pastas(caminho_atual)
-    arquivos = contar_arquivos(caminho_atual)
-    qtd_arquivos = len(arquivos) if arquivos is not None else 0
+    totais = totais or {}
+    pagina = 0
+    while True:
+        pastas = listar_pastas(caminho_atual)
+        arquivos = contar_arquivos(caminho_atual)
+        qtd_arquivos = len(arquivos) if arquivos is not None else 0
+        paginas = max(1, -(-len(pastas) // ITENS_POR_PAGINA))
+        pagina = min(pagina, paginas - 1)
+        inicio = pagina * ITENS_POR_PAGINA
+        visiveis = pastas[inicio:inicio + ITENS_POR_PAGINA]
+        # As primeiras subpastas visíveis são as mais prováveis de serem abertas
+        _listagens.pre_carregar(os.path.join(caminho_atual, p) for p in visiveis[:PRE_CARREGAR])
 
-    print("\n" + "─" * 60)
-    print(f"📂 Você está em: {caminho_atual}")
-    print(f"   ({qtd_arquivos} arquivo(s) direto nesta pasta, {len(pastas)} subpasta(s))")
-    print("─" * 60)
+        resultado = totais.get(caminho_atual)
+        print("\n" + "─" * 60)
+        print(f"📂 Você está em: {caminho_atual}")
+        print(f"   ({qtd_arquivos} arquivo(s) direto nesta pasta, {len(pastas)} subpasta(s))")
+        if resultado is not None:
+            print(f"   (recursivo: {_resumo_totais(resultado['total'])})")
+        print("─" * 60)
 
-    if not pastas:
-        print("   (Não há subpastas aqui — apenas arquivos, se houver)")
-    else:
-        for i, pasta in enumerate(pastas, 1):
-            print(f"   {i}. 📁 {pasta}")
+        if not pastas:
+            print("   (Não há subpastas aqui — apenas arquivos, se houver)")
+        else:
+            for i, pasta in enumerate(visiveis, inicio + 1):
+                sub = resultado["subpastas"].get(pasta) if resultado is not None else None
+                extra = f"  ({_resumo_totais(sub)})" if sub is not None else ""
+                print(f"   {i}. 📁 {pasta}{extra}")
+            if paginas > 1:
+                print(f"\n   Página {pagina + 1}/{paginas} — [N] próxima  [A] anterior")
 
-    print("\n   [C] Contar arquivos DESTA pasta (a que você está vendo agora)")
-    print("   [V] Voltar um nível")
-    print("   [S] Sair do programa")
+        print("\n   [C] Contar arquivos DESTA pasta (a que você está vendo agora)")
+        print("   [T] Totais recursivos desta pasta e das subpastas")
+        print("   [V] Voltar um nível")
+        print("   [S] Sair do programa")
 
-    escolha = input("\n➡️  Escolha um número, ou C / V / S: ").strip().upper()
+        escolha = input("\n➡️  Escolha um número, ou C / T / V / S: ").strip().upper()
 
-    if escolha == "S":
-        return ("sair", None)
-    if escolha == "V":
-        return ("voltar", None)
-    if escolha == "C":
-        return ("contar", None)
+        if escolha == "S":
+            return ("sair", None)
+        if escolha == "V":
+            return ("voltar", None)
+        if escolha == "C":
+            return ("contar", None)
+        if escolha == "T":
+            return ("totais", None)
+        if escolha == "N" and pagina + 1 < paginas:
+            pagina += 1
+            continue
+        if escolha == "A" and pagina > 0:
+            pagina -= 1
+            continue
 
-    if escolha.isdigit():
-        idx = int(escolha)
-        if 1 <= idx <= len(pastas):
-            return ("entrar", pastas[idx - 1])
+        if escolha.isdigit():
+            idx = int(escolha)
+            if 1 <= idx <= len(pastas):
+                return ("entrar", pastas[idx - 1])
 
-    print("❌ Opção inválida, tente novamente.")
-    return escolher_subpasta(caminho_atual)
+        print("❌ Opção inválida, tente novamente.")
+
+
+def _calcular_totais(caminho):
+    """Conta a árvore da pasta mostrando o progresso; None se não der."""
+    try:
+        resultado = contar_arvore(caminho, eventos=Eventos(ProgressoContagem(sys.stdout)))
+    except OSError as e:
+        print(f"❌ Erro ao acessar a pasta: {e}")
+        return None
+    if resultado["erros"]:
+        print(f"⚠️  {len(resultado['erros'])} pasta(s) sem acesso foram puladas.")
+    return resultado
 
 
 def navegar_e_contar():
@@ -94,10 +370,11 @@ def navegar_e_contar():
         return
 
     pilha_caminhos = [caminho_base]  # histórico para permitir "voltar"
+    totais = {}  # totais recursivos já calculados nesta navegação
 
     while True:
         caminho_atual = pilha_caminhos[-1]
-        acao, valor = escolher_subpasta(caminho_atual)
+        acao, valor = escolher_subpasta(caminho_atual, totais)
 
         if acao == "sair":
             print("\n👋 Encerrando o programa. Até mais!")
@@ -113,6 +390,11 @@ def navegar_e_contar():
             novo_caminho = os.path.join(caminho_atual, valor)
             pilha_caminhos.append(novo_caminho)
 
+        elif acao == "totais":
+            resultado = _calcular_totais(caminho_atual)
+            if resultado is not None:
+                totais[caminho_atual] = resultado
+
         elif acao == "contar":
             arquivos = contar_arquivos(caminho_atual)
             if arquivos is None:
@@ -142,10 +424,207 @@ def navegar_e_contar():
             # mantendo a posição atual na árvore de pastas
 
 
-if __name__ == "__main__":
+def contar_arvore_cli(args):
+    """Contagem recursiva sem interação (python contador.py PASTA)."""
+    saidas = []
+    if args.jsonl:
+        # Uma linha por pasta lida: dá para acompanhar/filtrar enquanto conta
+        saidas.append(PastasJSONL())
+    elif sys.stderr.isatty():
+        saidas.append(ProgressoContagem())
+    if args.eventos:
+        saidas.append(SaidaJSONL(args.eventos))
+    eventos = Eventos(*saidas)
+    try:
+        return _contar_arvore_cli(args, eventos)
+    finally:
+        eventos.fechar()
+
+
+def _contar_arvore_cli(args, eventos):
+    estatisticas = None
+    if args.estatisticas:
+        estatisticas = EstatisticasArquivos(formato=args.formato)
+    try:
+        resultado = contar_arvore(args.pasta, workers=args.workers,
+                                  profundidade_resumo=args.profundidade,
+                                  com_bytes=not args.sem_bytes, excluir=args.excluir,
+                                  estatisticas=estatisticas, eventos=eventos)
+    except OSError as e:
+        print(f"❌ Erro ao acessar a pasta: {e}")
+        return 1
+    if estatisticas is not None:
+        estatisticas.salvar(args.estatisticas)
+    if args.tempos:
+        resultado["tempos"] = eventos.exportar()
+
+    if args.json:
+        print(json.dumps(resultado, ensure_ascii=False, indent=2))
+        return 0
+    if args.jsonl:
+        final = {"pasta": "*", **resultado["total"], "erros": len(resultado["erros"]),
+                 "segundos": round(resultado["segundos"], 3)}
+        if args.tempos:
+            final["tempos"] = resultado["tempos"]
+        print(json.dumps(final, ensure_ascii=False))
+        return 0
+
+    total = resultado["total"]
+    print("\n" + "═" * 60)
+    print("📊 RESULTADO DA CONTAGEM")
+    print("═" * 60)
+    print(f"📂 Pasta contada : {args.pasta}")
+    print(f"📄 Arquivos      : {total['arquivos']:,}")
+    print(f"📁 Subpastas     : {total['pastas']:,}")
+    if not args.sem_bytes:
+        print(f"💾 Tamanho       : {formatar_bytes(total['bytes'])}")
+    segundos = resultado["segundos"]
+    taxa = f" ({(total['arquivos'] + total['pastas']) / segundos:,.0f} itens/s)" if segundos > 0 else ""
+    print(f"⏱️  Tempo         : {segundos:.1f}s{taxa}")
+    if resultado["erros"]:
+        print(f"⚠️  {len(resultado['erros'])} pasta(s) sem acesso, por exemplo: {resultado['erros'][0]}")
+    if resultado["subpastas"]:
+        print("─" * 60)
+        _mostrar_subtotais(resultado["subpastas"], com_bytes=not args.sem_bytes)
+    if estatisticas is not None:
+        estatisticas.mostrar()
+        print(f"\n📝 Estatísticas salvas em: {args.estatisticas}")
+    print("═" * 60)
+    if args.tempos:
+        eventos.mostrar_tempos()
+    return 0
+
+
+def _mostrar_subtotais(subpastas, com_bytes=True):
+    ordem = "bytes" if com_bytes else "arquivos"
+    for nome, sub in sorted(subpastas.items(), key=lambda kv: -kv[1][ordem]):
+        tamanho = f"  {formatar_bytes(sub['bytes']):>10}" if com_bytes else ""
+        print(f"   {sub['arquivos']:>12,} arq.{tamanho}  📁 {nome}")
+
+
+def indice_cli(args):
+    """
+    Contagem com índice persistente (--indice ARQ).
+
+    Com uma pasta, cria ou atualiza o índice relendo só as pastas que
+    mudaram e mostra as diferenças desde a execução anterior. Sem pasta,
+    só mostra o que o índice já tem, sem tocar na árvore.
+    """
+    inicio = time.perf_counter()
+    diferencas = None
+    try:
+        if args.pasta:
+            indice, diferencas = atualizar_indice(args.pasta, args.indice, workers=args.workers,
+                                                  completo=args.completo)
+        else:
+            indice = IndiceArvore(args.indice)
+    except (OSError, ValueError) as e:
+        print(f"❌ Erro: {e}")
+        return 1
+    segundos = time.perf_counter() - inicio
+
+    with indice:
+        subpastas = indice.totais_por_subpasta(args.profundidade) if args.profundidade else {}
+        resultado = {
+            "raiz": indice.raiz,
+            "total": {"arquivos": indice.n_arquivos, "pastas": indice.n_pastas - 1,
+                      "bytes": indice.bytes},
+            "subpastas": subpastas,
+            "diferencas": diferencas.resumo() if diferencas is not None else None,
+            "segundos": segundos,
+        }
+        criado = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(indice.criado_ns / 1e9))
+    if args.json or args.jsonl:
+        print(json.dumps(resultado, ensure_ascii=False, indent=None if args.jsonl else 2))
+        return 0
+
+    total = resultado["total"]
+    print("\n" + "═" * 60)
+    print("📊 RESULTADO DA CONTAGEM (índice)")
+    print("═" * 60)
+    print(f"📂 Pasta contada : {indice.raiz}")
+    print(f"🗂️  Índice        : {args.indice} ({criado})")
+    print(f"📄 Arquivos      : {total['arquivos']:,}")
+    print(f"📁 Subpastas     : {total['pastas']:,}")
+    print(f"💾 Tamanho       : {formatar_bytes(total['bytes'])}")
+    print(f"⏱️  Tempo         : {segundos:.1f}s")
+    if diferencas is not None:
+        pastas = diferencas.pastas
+        print("─" * 60)
+        print(f"🔄 Pastas relidas: {pastas['lidas']:,} | reaproveitadas: {pastas['reaproveitadas']:,}"
+              f" | novas: {pastas['novas']:,} | removidas: {pastas['removidas']:,}")
+        rotulos = {"adicionados": "➕ Adicionados", "removidos": "➖ Removidos",
+                   "crescidos": "📈 Cresceram", "alterados": "✏️  Alterados"}
+        for tipo, rotulo in rotulos.items():
+            qtd = diferencas.contagem[tipo]
+            print(f"{rotulo:<16}: {qtd:,} ({formatar_bytes(diferencas.bytes[tipo])})")
+            for exemplo in diferencas.exemplos[tipo][:5]:
+                print(f"      • {exemplo}")
+    elif args.pasta:
+        print("🆕 Índice criado; as diferenças aparecem a partir da próxima execução.")
+    if subpastas:
+        print("─" * 60)
+        _mostrar_subtotais(subpastas)
+    print("═" * 60)
+    return 0
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Conta arquivos de uma pasta. Sem argumentos, abre o modo navegação; "
+                    "com uma pasta, conta a árvore inteira em paralelo.")
+    parser.add_argument("pasta", nargs="?", help="Pasta a contar recursivamente")
+    parser.add_argument("--workers", "-w", type=int, default=16, metavar="N",
+                        help="Pastas lidas ao mesmo tempo (padrão: 16; aumente em rede)")
+    parser.add_argument("--profundidade", type=int, default=1, metavar="N",
+                        help="Níveis de subpastas com subtotal (padrão: 1; 0 = só o total)")
+    parser.add_argument("--sem-bytes", action="store_true",
+                        help="Não somar tamanhos (evita um stat por arquivo)")
+    parser.add_argument("--excluir", action="append", metavar="GLOB",
+                        help="Pular arquivos/pastas que casam com o glob (pode repetir)")
+    saida = parser.add_mutually_exclusive_group()
+    saida.add_argument("--json", action="store_true", help="Resultado final em JSON")
+    saida.add_argument("--jsonl", action="store_true",
+                       help="Uma linha JSON por pasta, à medida que são lidas, e o total no fim")
+    parser.add_argument("--estatisticas", metavar="ARQUIVO",
+                        help="Agregar por extensão, período e tamanho e salvar em ARQUIVO "
+                             "(.csv ou .json)")
+    parser.add_argument("--formato", default="%Y-%m",
+                        help="Período das estatísticas (strftime da data de modificação, "
+                             "padrão: %%Y-%%m)")
+    parser.add_argument("--eventos", metavar="ARQUIVO",
+                        help="Gravar os eventos (início, cada pasta lida, pastas sem acesso, fim) "
+                             "em ARQUIVO, em JSON Lines")
+    parser.add_argument("--tempos", action="store_true",
+                        help="Mostrar ao final os tempos de leitura das pastas (scandir); "
+                             "com --json/--jsonl, vão no resultado")
+    parser.add_argument("--indice", metavar="ARQUIVO",
+                        help="Guardar um índice da árvore e, nas próximas vezes, reler só as "
+                             "pastas alteradas e mostrar as diferenças (sem pasta: só lê o índice)")
+    parser.add_argument("--completo", action="store_true",
+                        help="Com --indice, reler todas as pastas (pega arquivos que cresceram "
+                             "em pastas sem outras mudanças)")
+    args = parser.parse_args()
+    if args.estatisticas and args.sem_bytes:
+        # Sem o stat não há tamanho nem data: as estatísticas sairiam vazias
+        parser.error("--estatisticas precisa dos tamanhos e datas; não combina com --sem-bytes")
+
+    if args.indice:
+        sys.exit(indice_cli(args))
+    if args.pasta:
+        sys.exit(contar_arvore_cli(args))
+
     try:
         navegar_e_contar()
     except KeyboardInterrupt:
         print("\n\n👋 Programa interrompido pelo usuário.")
+    finally:
+        _listagens.fechar()
 
     input("\nPressione ENTER para sair...")
+
+
+if __name__ == "__main__":
+    main()
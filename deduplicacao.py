@@ -0,0 +1,163 @@
+"""
+Detecção de arquivos duplicados por conteúdo
+
+Estratégia em três etapas, cada uma só para quem passou pela anterior:
+    1. Tamanho igual (já vem do stat, custo zero)
+    2. Hash parcial dos primeiros bytes
+    3. Hash completo, lido em blocos de tamanho fixo
+
+Assim a maioria dos arquivos nunca é lida, e os que são lidos usam memória
+constante independentemente do tamanho.
+
+Exemplo de uso:
+    from deduplicacao import encontrar_duplicatas
+    grupos = encontrar_duplicatas([(caminho, tamanho), ...])
+    for original, *copias in grupos:
+        print(original, "tem", len(copias), "cópia(s)")
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+TAMANHO_PARCIAL = 64 * 1024      # bytes lidos no hash parcial
+TAMANHO_BLOCO = 1024 * 1024      # bloco de leitura do hash completo
+
+
+class EstatisticasHash:
+    """Contadores de leitura para medir a vazão do hashing"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self.arquivos = 0
+        self.bytes_lidos = 0
+        self.segundos = 0.0
+
+    def registrar(self, bytes_lidos: int, segundos: float):
+        with self._trava:
+            self.arquivos += 1
+            self.bytes_lidos += bytes_lidos
+            self.segundos += segundos
+
+    @property
+    def mb_por_segundo(self) -> float:
+        if self.segundos <= 0:
+            return 0.0
+        return self.bytes_lidos / self.segundos / (1024 * 1024)
+
+
+def calcular_hash(caminho: str,
+                  limite: Optional[int] = None,
+                  estatisticas: Optional[EstatisticasHash] = None) -> str:
+    """
+    Calcula o BLAKE2b do arquivo, lendo em blocos de tamanho fixo
+
+    Args:
+        caminho: Arquivo a ser lido
+        limite: Lê só os primeiros `limite` bytes (hash parcial)
+        estatisticas: Acumulador opcional de bytes lidos e tempo
+
+    Returns:
+        Hash hexadecimal
+    """
+    inicio = time.perf_counter()
+    h = hashlib.blake2b(digest_size=20)
+    restante = limite
+    buffer = bytearray(min(TAMANHO_BLOCO, limite) if limite else TAMANHO_BLOCO)
+    visao = memoryview(buffer)
+    lidos = 0
+    with open(caminho, "rb", buffering=0) as f:
+        while restante is None or restante > 0:
+            n = f.readinto(visao if restante is None else visao[:min(len(visao), restante)])
+            if not n:
+                break
+            h.update(visao[:n])
+            lidos += n
+            if restante is not None:
+                restante -= n
+    if estatisticas is not None:
+        estatisticas.registrar(lidos, time.perf_counter() - inicio)
+    return h.hexdigest()
+
+
+def _hash_ou_none(caminho: str,
+                  limite: Optional[int],
+                  estatisticas: Optional[EstatisticasHash],
+                  cache=None) -> Optional[str]:
+    """
+    calcular_hash que devolve None se o arquivo não puder ser lido
+
+    Com um CacheMetadados, o hash de arquivos inalterados vem do cache
+    (custo de um stat em vez da leitura do conteúdo).
+    """
+    campo = "hash" if limite is None else f"hash_parcial_{limite}"
+    try:
+        if cache is None:
+            return calcular_hash(caminho, limite, estatisticas)
+        stat = os.stat(caminho)
+        valor = cache.obter(stat, campo)
+        if valor is None:
+            valor = calcular_hash(caminho, limite, estatisticas)
+            cache.gravar(stat, campo, valor)
+        return valor
+    except OSError:
+        return None
+
+
+def _agrupar(chaves: Iterable[Tuple[str, object]]) -> List[List[str]]:
+    """Agrupa caminhos pela chave, devolvendo só grupos com 2 ou mais"""
+    grupos: Dict[object, List[str]] = {}
+    for caminho, chave in chaves:
+        # Arquivo ilegível nunca é considerado duplicata
+        if chave is None or (isinstance(chave, tuple) and None in chave):
+            continue
+        grupos.setdefault(chave, []).append(caminho)
+    return [g for g in grupos.values() if len(g) > 1]
+
+
+def encontrar_duplicatas(arquivos: Iterable[Tuple[str, int]],
+                         workers: int = 1,
+                         estatisticas: Optional[EstatisticasHash] = None,
+                         cache=None) -> List[List[str]]:
+    """
+    Encontra grupos de arquivos com conteúdo idêntico
+
+    Args:
+        arquivos: Pares (caminho, tamanho)
+        workers: Threads para calcular hashes em paralelo
+        estatisticas: Acumulador opcional de vazão do hashing
+        cache: CacheMetadados opcional para reaproveitar hashes
+
+    Returns:
+        Lista de grupos; em cada grupo (ordenado por caminho) o primeiro
+        elemento é o que deve ser mantido e os demais são duplicatas
+    """
+    # Etapa 1: tamanho (arquivos vazios são todos "iguais", mas ignorados)
+    por_tamanho: Dict[int, List[str]] = {}
+    for caminho, tamanho in arquivos:
+        if tamanho > 0:
+            por_tamanho.setdefault(tamanho, []).append(caminho)
+    candidatos = [(c, t) for t, g in por_tamanho.items() if len(g) > 1 for c in g]
+    if not candidatos:
+        return []
+    del por_tamanho
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # Etapa 2: hash parcial (o tamanho entra na chave)
+        parciais = executor.map(
+            lambda ct: _hash_ou_none(ct[0], TAMANHO_PARCIAL, estatisticas, cache), candidatos)
+        grupos = _agrupar(((c, (t, p)) for (c, t), p in zip(candidatos, parciais)))
+
+        # Etapa 3: hash completo, só se o arquivo é maior que a parte lida
+        tamanhos = dict(candidatos)
+        resultado = []
+        for grupo in grupos:
+            if tamanhos[grupo[0]] <= TAMANHO_PARCIAL:
+                resultado.append(sorted(grupo))
+                continue
+            completos = executor.map(lambda c: _hash_ou_none(c, None, estatisticas, cache), grupo)
+            resultado.extend(sorted(g) for g in _agrupar(zip(grupo, completos)))
+    return resultado
@@ -0,0 +1,336 @@
+"""
+Diário de movimentações do organizador
+
+Registra em disco, só acrescentando linhas, o plano de uma execução e
+cada movimentação concluída (com o nome final, que pode ter ganho _1,
+_2... por colisão). Com ele uma execução interrompida continua de onde
+parou sem varrer a pasta de novo, e uma organização inteira pode ser
+desfeita repetindo as movimentações ao contrário.
+
+As linhas são gravadas em grupo: um fsync a cada `lote` registros ou
+`intervalo` segundos, dividido por todos os workers. Em uma queda, só
+as últimas movimentações podem ter ficado sem registro; a retomada as
+reconcilia olhando apenas as pastas de destino dos itens pendentes.
+
+Formato (JSONL):
+    1ª linha: {"diario": 1, "inicio_ns": ..., "backup": ..., <cabeçalho do plano>}
+    plano:    [origem, destino, tamanho, timestamp(, duplicata_de)]
+    {"plano": n}                          fim do plano (gravado antes de mover)
+    {"m": origem, "d": final, "a": ação}  movimentação concluída
+                                          (ação: "mover", "vincular" ou "pular")
+    {"p": pasta}                          pasta de destino criada
+    {"u": origem}                         movimentação desfeita
+
+Exemplo de uso:
+    org = Organizador()
+    org.executar_plano(plano, diario=DiarioMovimentos("org.diario"))
+    ...
+    org.retomar_diario("org.diario")   # depois de uma interrupção
+    org.desfazer_diario("org.diario")  # volta tudo para o lugar
+"""
+
+import errno
+import filecmp
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+VERSAO = 1
+
+
+def _mesmo_conteudo(origem: str, st_origem: os.stat_result,
+                    caminho: str, st: os.stat_result) -> bool:
+    """Se caminho é o próprio arquivo de origem (hardlink) ou uma cópia idêntica"""
+    if os.path.samestat(st_origem, st):
+        return True
+    return st_origem.st_size == st.st_size and filecmp.cmp(origem, caminho, shallow=False)
+
+
+def _nome_base(nome: str) -> Optional[str]:
+    """Nome original de um nome com sufixo de colisão (foto_2.jpg -> foto.jpg)"""
+    caminho = Path(nome)
+    raiz, separador, numero = caminho.stem.rpartition("_")
+    if separador and raiz and numero.isdigit():
+        return raiz + caminho.suffix
+    return None
+
+
+class DiarioMovimentos:
+    """Diário de uma execução do organizador (ver o formato no módulo)"""
+
+    def __init__(self, caminho: str, lote: int = 512, intervalo: float = 1.0):
+        """
+        Args:
+            caminho: Arquivo do diário; se já existir, é lido (retomada/desfazer)
+            lote: Registros acumulados antes de um fsync
+            intervalo: Segundos máximos entre fsyncs com registros pendentes
+        """
+        self.caminho = os.path.abspath(os.path.expanduser(caminho))
+        self.lote = lote
+        self.intervalo = intervalo
+        self.cabecalho: Optional[Dict[str, Any]] = None
+        self.itens: List[list] = []
+        self.plano_completo = False
+        # Origem -> (caminho final, ação), na ordem em que foram concluídas
+        self.concluidos: Dict[str, Tuple[str, str]] = {}
+        self.pastas: List[str] = []
+        self.desfeitos: set = set()
+        self._trava = threading.Lock()
+        self._pendentes: List[str] = []
+        self._ultimo_fsync = time.monotonic()
+        self._arquivo = None
+        if os.path.exists(self.caminho):
+            self._ler()
+
+    def _ler(self):
+        with open(self.caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    continue  # última linha cortada por uma queda
+                if isinstance(registro, list):
+                    self.itens.append(registro)
+                elif "m" in registro:
+                    self.concluidos[registro["m"]] = (registro["d"], registro["a"])
+                elif "p" in registro:
+                    self.pastas.append(registro["p"])
+                elif "u" in registro:
+                    self.desfeitos.add(registro["u"])
+                elif "plano" in registro:
+                    self.plano_completo = registro["plano"] == len(self.itens)
+                elif "diario" in registro:
+                    self.cabecalho = registro
+
+    @property
+    def iniciado(self) -> bool:
+        """Se o plano já está gravado por inteiro (há o que retomar ou desfazer)"""
+        return self.cabecalho is not None and self.plano_completo
+
+    def iniciar(self, cabecalho: Dict[str, Any], itens: Iterable[list],
+                backup: Optional[str] = None):
+        """
+        Grava o cabeçalho e o plano inteiro, com fsync, antes de qualquer movimentação
+
+        Um diário cujo plano ficou pela metade (queda antes de mover
+        qualquer arquivo) é sobrescrito.
+        """
+        self.cabecalho = {"diario": VERSAO, "inicio_ns": time.time_ns(), "backup": backup,
+                          **cabecalho}
+        self.itens = list(itens)
+        pasta = os.path.dirname(self.caminho)
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+        self._arquivo = open(self.caminho, "w", encoding="utf-8")
+        self._arquivo.write(json.dumps(self.cabecalho, ensure_ascii=False) + "\n")
+        for registro in self.itens:
+            self._arquivo.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self._arquivo.write(json.dumps({"plano": len(self.itens)}) + "\n")
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self.plano_completo = True
+
+    def _abrir(self):
+        if self._arquivo is None:
+            self._arquivo = open(self.caminho, "a", encoding="utf-8")
+            # Linha cortada por uma queda: a próxima começa numa linha nova
+            if self._arquivo.tell() > 0:
+                with open(self.caminho, "rb") as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        self._arquivo.write("\n")
+
+    def _registrar(self, registro: Dict[str, Any]):
+        linha = json.dumps(registro, ensure_ascii=False) + "\n"
+        with self._trava:
+            self._pendentes.append(linha)
+            if (len(self._pendentes) >= self.lote
+                    or time.monotonic() - self._ultimo_fsync >= self.intervalo):
+                self._gravar()
+
+    def _gravar(self):
+        """Grava e sincroniza os registros pendentes (chamar com a trava)"""
+        if not self._pendentes:
+            return
+        self._abrir()
+        self._arquivo.write("".join(self._pendentes))
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+        self._pendentes.clear()
+        self._ultimo_fsync = time.monotonic()
+
+    def registrar_movimento(self, origem: str, final: str, acao: str):
+        """Movimentação concluída (seguro para uso em threads)"""
+        self._registrar({"m": origem, "d": final, "a": acao})
+        with self._trava:
+            self.concluidos[origem] = (final, acao)
+
+    def registrar_pasta(self, pasta: str):
+        """Pasta de destino criada nesta execução (removida ao desfazer, se vazia)"""
+        self._registrar({"p": pasta})
+        with self._trava:
+            self.pastas.append(pasta)
+
+    def confirmar(self):
+        """Garante em disco tudo o que foi registrado até agora"""
+        with self._trava:
+            self._gravar()
+
+    def fechar(self):
+        self.confirmar()
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+    def pendentes(self) -> List[list]:
+        """Itens do plano ainda não concluídos"""
+        return [r for r in self.itens if r[0] not in self.concluidos]
+
+    def reconciliar(self) -> Dict[str, int]:
+        """
+        Acerta o diário com o disco depois de uma queda, antes de retomar
+
+        Estados possíveis de um item pendente depois de uma queda:
+
+        - movido sem registro: a origem sumiu e o arquivo está no destino
+          (nome ou variante _N, mesmo tamanho, alterado depois do início da
+          execução); a movimentação é registrada;
+        - colocado sem remover a origem (link + unlink, ou cópia entre
+          dispositivos interrompida antes da remoção): o destino é o mesmo
+          arquivo ou tem o mesmo conteúdo; a origem é removida e a
+          movimentação registrada. Os itens cuja origem sumiu escolhem
+          antes, e uma cópia só de mesmo conteúdo (não o mesmo arquivo)
+          não vale se algum deles ficou sem destino: poderia ser dele;
+        - não movido: nada a fazer (um temporário .organizando que tenha
+          sobrado é removido pela própria execução ao ler a pasta).
+
+        Só as pastas de destino dos itens pendentes são lidas.
+
+        Returns:
+            {"pendentes", "recuperados", "perdidos"}
+        """
+        inicio_ns = self.cabecalho.get("inicio_ns", 0)
+        finais = {final for final, _ in self.concluidos.values()}
+        por_pasta: Dict[str, Dict[str, List[list]]] = {}
+        pendentes = self.pendentes()
+        for registro in pendentes:
+            pasta, nome = os.path.split(registro[1])
+            por_pasta.setdefault(pasta, {}).setdefault(nome, []).append(registro)
+
+        resumo = {"pendentes": len(pendentes), "recuperados": 0, "perdidos": 0}
+        usados = set()
+        for pasta, nomes in por_pasta.items():
+            # Candidatos por nome original: arquivos criados/movidos nesta execução
+            candidatos: Dict[str, List[Tuple[str, os.stat_result]]] = {}
+            try:
+                with os.scandir(pasta) as it:
+                    for dir_entry in it:
+                        for nome in (dir_entry.name, _nome_base(dir_entry.name)):
+                            if nome in nomes and dir_entry.path not in finais:
+                                st = dir_entry.stat(follow_symlinks=False)
+                                if st.st_ctime_ns >= inicio_ns:
+                                    candidatos.setdefault(nome, []).append((dir_entry.path, st))
+            except FileNotFoundError:
+                pass
+            for nome, registros in nomes.items():
+                livres = [c for c in candidatos.get(nome, []) if c[0] not in usados]
+                presentes = []
+                faltando = 0
+                # Primeiro as origens que sumiram: o arquivo só pode estar no destino
+                for registro in registros:
+                    try:
+                        presentes.append((registro, os.lstat(registro[0])))
+                        continue
+                    except FileNotFoundError:
+                        pass
+                    movido = next((c for c in livres if c[1].st_size == registro[2]), None)
+                    if movido is None:
+                        faltando += 1
+                        resumo["perdidos"] += 1
+                        continue
+                    livres.remove(movido)
+                    self._recuperar(registro, movido, usados, resumo)
+                # Depois as que ainda existem: a origem só é removida se o
+                # destino for o próprio arquivo (hardlink) ou se nenhuma origem
+                # sumida com o mesmo nome puder ser a dona da cópia idêntica
+                for registro, st_origem in presentes:
+                    origem = registro[0]
+                    movido = next((c for c in livres
+                                   if os.path.samestat(st_origem, c[1])
+                                   or (not faltando and _mesmo_conteudo(origem, st_origem, *c))),
+                                  None)
+                    if movido is None:
+                        continue
+                    try:
+                        os.remove(origem)
+                    except OSError:
+                        continue  # fica pendente e é movido de novo (como _N)
+                    livres.remove(movido)
+                    self._recuperar(registro, movido, usados, resumo)
+        self.confirmar()
+        return resumo
+
+    def _recuperar(self, registro: list, movido: Tuple[str, os.stat_result],
+                   usados: set, resumo: Dict[str, int]):
+        """Registra uma movimentação encontrada no disco pela reconciliação"""
+        usados.add(movido[0])
+        acao = "vincular" if len(registro) > 4 and movido[1].st_nlink > 1 else "mover"
+        self.registrar_movimento(registro[0], movido[0], acao)
+        resumo["recuperados"] += 1
+
+    def desfazer(self, eventos=None) -> Dict[str, int]:
+        """
+        Devolve cada arquivo à origem, da última movimentação para a primeira
+
+        Cada volta é registrada no diário, então um desfazer interrompido
+        também pode ser repetido. Pastas criadas pela execução são
+        removidas se ficarem vazias; backups não são tocados. Uma duplicata
+        vinculada volta como hardlink do arquivo mantido (mesmo conteúdo).
+
+        Args:
+            eventos: Eventos opcional (arquivo_movido com acao="desfazer" e erro)
+
+        Returns:
+            {"restaurados", "erros", "pastas_removidas"}
+        """
+        resumo = {"restaurados": 0, "erros": 0, "pastas_removidas": 0}
+        raiz = self.cabecalho["pasta"]
+        for origem, (final, acao) in reversed(list(self.concluidos.items())):
+            if origem in self.desfeitos:
+                continue
+            try:
+                if acao != "pular":
+                    if os.path.lexists(origem):
+                        raise FileExistsError(errno.EEXIST, "a origem já existe", origem)
+                    os.makedirs(os.path.dirname(origem), exist_ok=True)
+                    try:
+                        os.rename(final, origem)
+                    except OSError as e:
+                        if e.errno != errno.EXDEV:
+                            raise
+                        shutil.move(final, origem)
+                    resumo["restaurados"] += 1
+                    if eventos is not None:
+                        eventos.emitir("arquivo_movido", arquivo=final, destino=origem,
+                                       acao="desfazer")
+                self._registrar({"u": origem})
+                self.desfeitos.add(origem)
+            except OSError as e:
+                resumo["erros"] += 1
+                if eventos is not None:
+                    eventos.emitir("erro", arquivo=final, mensagem=str(e))
+        for pasta in reversed(self.pastas):
+            # Sobe até a raiz removendo as pastas que ficaram vazias
+            while pasta.startswith(raiz + os.sep):
+                try:
+                    os.rmdir(pasta)
+                except OSError:
+                    break
+                resumo["pastas_removidas"] += 1
+                pasta = os.path.dirname(pasta)
+        self.confirmar()
+        return resumo
@@ -0,0 +1,148 @@
+"""
+Estatísticas agregadas de conjuntos de arquivos
+
+Acumula, numa única passada, a quantidade de arquivos e o total de bytes
+por extensão, por período (as mesmas pastas de data que o organizador
+criaria) e por faixa de tamanho. A memória usada depende do número de
+grupos, não do número de arquivos, então serve para árvores inteiras e
+para prever o efeito de uma organização sem listar arquivo por arquivo.
+
+Exemplo de uso:
+    from estatisticas import EstatisticasArquivos
+    est = EstatisticasArquivos(formato="%Y-%m")
+    for entrada in varrer_arvore("~/Fotos"):
+        est.adicionar(entrada.nome, entrada.stat.st_size, entrada.stat.st_mtime)
+    est.salvar("fotos.csv")   # ou .json
+"""
+
+import bisect
+import csv
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+DIMENSOES = ("extensao", "periodo", "tamanho")
+SEM_EXTENSAO = "(sem extensão)"
+
+# Faixas de tamanho: limite superior (exclusivo) e rótulo
+_LIMITES_TAMANHO = [1, 4 << 10, 64 << 10, 1 << 20, 16 << 20, 256 << 20, 1 << 30, 4 << 30]
+_ROTULOS_TAMANHO = ["0 B", "< 4 KB", "4-64 KB", "64 KB-1 MB", "1-16 MB",
+                    "16-256 MB", "256 MB-1 GB", "1-4 GB", ">= 4 GB"]
+
+
+def formatar_bytes(n: float) -> str:
+    """Tamanho legível (ex.: 1.5 GB)."""
+    for unidade in ("B", "KB", "MB", "GB", "TB"):
+        if n < 1024 or unidade == "TB":
+            return f"{n:.0f} {unidade}" if unidade == "B" else f"{n:.1f} {unidade}"
+        n /= 1024
+
+
+def faixa_tamanho(tamanho: int) -> str:
+    """Rótulo da faixa de tamanho do arquivo"""
+    return _ROTULOS_TAMANHO[bisect.bisect_right(_LIMITES_TAMANHO, tamanho)]
+
+
+class EstatisticasArquivos:
+    """Acumulador de contagem e bytes por extensão, período e faixa de tamanho"""
+
+    def __init__(self, formato: str = "%Y-%m"):
+        """
+        Args:
+            formato: strftime do período (o mesmo --formato do organizador)
+        """
+        self.formato = formato
+        self.arquivos = 0
+        self.bytes = 0
+        # dimensão -> {chave: [arquivos, bytes]}
+        self._grupos: Dict[str, Dict[str, List[int]]] = {d: {} for d in DIMENSOES}
+
+    def adicionar(self, nome: str, tamanho: int,
+                  timestamp: Optional[float] = None,
+                  periodo: Optional[str] = None):
+        """
+        Conta um arquivo
+
+        Args:
+            nome: Nome do arquivo (a extensão vem daqui)
+            tamanho: Tamanho em bytes
+            timestamp: Data do arquivo; convertida com o formato
+            periodo: Período já calculado (dispensa o timestamp)
+        """
+        if periodo is None and timestamp is not None:
+            periodo = datetime.fromtimestamp(timestamp).strftime(self.formato)
+        extensao = os.path.splitext(nome)[1].lower() or SEM_EXTENSAO
+        self.arquivos += 1
+        self.bytes += tamanho
+        for dimensao, chave in (("extensao", extensao),
+                                ("periodo", periodo),
+                                ("tamanho", faixa_tamanho(tamanho))):
+            if chave is None:
+                continue
+            grupo = self._grupos[dimensao].get(chave)
+            if grupo is None:
+                self._grupos[dimensao][chave] = [1, tamanho]
+            else:
+                grupo[0] += 1
+                grupo[1] += tamanho
+
+    def linhas(self, dimensao: str) -> List[Tuple[str, int, int]]:
+        """
+        (chave, arquivos, bytes) de uma dimensão
+
+        Extensões vêm da que ocupa mais bytes para a que ocupa menos;
+        períodos em ordem cronológica; faixas de tamanho da menor à maior.
+        """
+        grupos = self._grupos[dimensao]
+        if dimensao == "extensao":
+            chaves = sorted(grupos, key=lambda c: (-grupos[c][1], c))
+        elif dimensao == "tamanho":
+            chaves = [r for r in _ROTULOS_TAMANHO if r in grupos]
+        else:
+            chaves = sorted(grupos)
+        return [(c, grupos[c][0], grupos[c][1]) for c in chaves]
+
+    def para_dict(self) -> Dict[str, object]:
+        """Estatísticas em formato serializável em JSON"""
+        resultado: Dict[str, object] = {
+            "formato": self.formato,
+            "total": {"arquivos": self.arquivos, "bytes": self.bytes},
+        }
+        for dimensao in DIMENSOES:
+            resultado[dimensao] = [{"chave": c, "arquivos": n, "bytes": b}
+                                   for c, n, b in self.linhas(dimensao)]
+        return resultado
+
+    def salvar(self, caminho: str):
+        """Grava em CSV (dimensao, chave, arquivos, bytes) ou JSON, pela extensão"""
+        caminho = os.path.expanduser(caminho)
+        if caminho.lower().endswith(".csv"):
+            with open(caminho, "w", encoding="utf-8", newline="") as f:
+                escritor = csv.writer(f)
+                escritor.writerow(["dimensao", "chave", "arquivos", "bytes"])
+                escritor.writerow(["total", "", self.arquivos, self.bytes])
+                for dimensao in DIMENSOES:
+                    for linha in self.linhas(dimensao):
+                        escritor.writerow([dimensao, *linha])
+        else:
+            with open(caminho, "w", encoding="utf-8") as f:
+                json.dump(self.para_dict(), f, ensure_ascii=False, indent=2)
+
+    def mostrar(self, limite: int = 10):
+        """Mostra as três dimensões no terminal (até `limite` linhas cada)"""
+        titulos = {"extensao": "🧩 Por extensão",
+                   "periodo": f"📅 Por período ({self.formato})",
+                   "tamanho": "📏 Por tamanho"}
+        for dimensao in DIMENSOES:
+            linhas = self.linhas(dimensao)
+            if not linhas:
+                continue
+            print(f"\n{titulos[dimensao]}:")
+            for chave, arquivos, nbytes in linhas[:limite]:
+                print(f"   {chave:<16} {arquivos:>10,} arq. {formatar_bytes(nbytes):>10}")
+            if len(linhas) > limite:
+                restantes = linhas[limite:]
+                print(f"   {'(outros ' + str(len(restantes)) + ')':<16} "
+                      f"{sum(n for _, n, _ in restantes):>10,} arq. "
+                      f"{formatar_bytes(sum(b for _, _, b in restantes)):>10}")
@@ -0,0 +1,372 @@
+"""
+Eventos de progresso e tempos por fase
+
+As ferramentas não imprimem o progresso diretamente: emitem eventos para
+um objeto Eventos, que os repassa às saídas escolhidas. A saída com
+emojis de sempre é só uma delas; há também a silenciosa, uma barra de
+progresso com atualização limitada e JSON Lines para alimentar métricas.
+
+Tipos de evento (campo "tipo" na saída JSONL):
+    inicio              ferramenta, pasta, total (se conhecido) e demais detalhes
+    arquivo_planejado   arquivo, destino (pasta de data)
+    arquivo_movido      arquivo, destino, acao ("mover", "vincular" ou "pular")
+    duplicata           arquivo, original
+    duplicata_alterada  arquivo, original (mudou desde o plano: movido, não vinculado)
+    chunk_reconhecido   arquivo, inicio, fim (segundos), ok, caracteres
+    arquivo_concluido   arquivo, ok, segundos (transcrição)
+    pasta_lida          pasta (relativa), arquivos, pastas, bytes (contagem só dela)
+    erro                arquivo, mensagem
+    fim                 resumo com as estatísticas da operação
+
+Além dos eventos, cada fase cara (scandir, stat, mkdir, copy, move,
+decode, recognize) tem um histograma de tempos, mostrado com --tempos.
+
+Exemplo de uso:
+    from eventos import Eventos, BarraProgresso, SaidaJSONL
+    eventos = Eventos(BarraProgresso(), SaidaJSONL("eventos.jsonl"))
+    org = Organizador(eventos=eventos)
+    ...
+    eventos.mostrar_tempos()
+    eventos.fechar()
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+FASES = ("scandir", "stat", "mkdir", "copy", "move", "decode", "recognize")
+
+# Faixas do histograma: potências de 2 em microssegundos (1 µs a ~9 min)
+_FAIXAS = 30
+
+
+class Histograma:
+    """Tempos de uma fase, agrupados em faixas de potência de 2"""
+
+    __slots__ = ("n", "total", "minimo", "maximo", "faixas")
+
+    def __init__(self):
+        self.n = 0
+        self.total = 0.0
+        self.minimo = float("inf")
+        self.maximo = 0.0
+        self.faixas = [0] * _FAIXAS
+
+    def registrar(self, segundos: float):
+        self.n += 1
+        self.total += segundos
+        self.minimo = min(self.minimo, segundos)
+        self.maximo = max(self.maximo, segundos)
+        self.faixas[min(int(segundos * 1e6).bit_length(), _FAIXAS - 1)] += 1
+
+    def somar(self, outro: "Histograma"):
+        self.n += outro.n
+        self.total += outro.total
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.faixas = [a + b for a, b in zip(self.faixas, outro.faixas)]
+
+    def percentil(self, p: float) -> float:
+        """Limite superior (segundos) da faixa que contém o percentil p (0-100)"""
+        alvo = self.n * p / 100
+        acumulado = 0
+        for i, quantidade in enumerate(self.faixas):
+            acumulado += quantidade
+            if quantidade and acumulado >= alvo:
+                return min((1 << i) / 1e6, self.maximo)
+        return self.maximo
+
+    def para_dict(self) -> Dict[str, object]:
+        return {"n": self.n, "total": self.total,
+                "minimo": self.minimo if self.n else 0.0, "maximo": self.maximo,
+                "faixas": self.faixas}
+
+    @classmethod
+    def de_dict(cls, dados: Dict[str, object]) -> "Histograma":
+        h = cls()
+        h.n, h.total, h.maximo = dados["n"], dados["total"], dados["maximo"]
+        h.minimo = dados["minimo"] if h.n else float("inf")
+        h.faixas = list(dados["faixas"])
+        return h
+
+
+class Saida:
+    """Destino de eventos; a implementação base ignora tudo (modo silencioso)"""
+
+    def receber(self, tipo: str, dados: Dict[str, object]):
+        pass
+
+    def fechar(self):
+        pass
+
+
+SaidaSilenciosa = Saida
+
+
+class SaidaEmoji(Saida):
+    """A saída tradicional no terminal: uma linha com emoji por arquivo"""
+
+    def __init__(self):
+        self._pasta = ""
+
+    def receber(self, tipo, dados):
+        if tipo == "inicio":
+            if dados.get("ferramenta") != "organizador":
+                return
+            self._pasta = dados["pasta"]
+            print(f"\nℹ️ Processando: {dados['pasta']}")
+            print(f"ℹ️ Modo: {'Simulação' if dados['modo'] == 'simulacao' else 'Execução'}")
+            if dados.get("workers", 1) > 1:
+                print(f"ℹ️ Workers: {dados['workers']}")
+            print("-" * 50)
+            if dados.get("backup"):
+                print(f"ℹ️ Backup em: {dados['backup']}")
+        elif tipo == "arquivo_planejado":
+            print(f"👀 {self._relativo(dados['arquivo'])} → {self._relativo(dados['destino'])}/")
+        elif tipo == "arquivo_movido":
+            nome = os.path.basename(dados["arquivo"])
+            if dados["acao"] == "pular":
+                print(f"⏭️ {nome} (duplicata, mantido no lugar)")
+            else:
+                emoji = "🔗" if dados["acao"] == "vincular" else "🚀"
+                pasta = os.path.basename(os.path.dirname(dados["destino"]))
+                print(f"{emoji} {nome} → {pasta}/")
+        elif tipo == "duplicata":
+            print(f"🔁 {self._relativo(dados['arquivo'])} = {self._relativo(dados['original'])}")
+        elif tipo == "duplicata_alterada":
+            print(f"⚠️ {self._relativo(dados['arquivo'])} mudou desde o plano: "
+                  f"movido, não vinculado a {self._relativo(dados['original'])}")
+        elif tipo == "erro":
+            nome = os.path.basename(dados["arquivo"])
+            print(f"❌ Erro com {nome}: {str(dados['mensagem'])[:50]}...")
+
+    def _relativo(self, caminho: str) -> str:
+        return os.path.relpath(caminho, self._pasta) if self._pasta else caminho
+
+
+class BarraProgresso(Saida):
+    """
+    Uma única linha de progresso, redesenhada no máximo a cada `intervalo`
+
+    Conta arquivos planejados/movidos/concluídos e chunks reconhecidos
+    (ou só o tipo indicado em "contar" no evento de início); erros
+    continuam aparecendo, um por linha, acima da barra.
+    """
+
+    _CONTADOS = ("arquivo_planejado", "arquivo_movido", "arquivo_concluido",
+                 "chunk_reconhecido")
+
+    def __init__(self, intervalo: float = 0.2, arquivo=None):
+        self.intervalo = intervalo
+        self.arquivo = arquivo or sys.stderr
+        self.total: Optional[int] = None
+        self.contar: Optional[str] = None
+        self.feitos = 0
+        self.erros = 0
+        self._inicio = time.perf_counter()
+        self._ultimo = 0.0
+        self._largura = 0
+
+    def receber(self, tipo, dados):
+        if tipo == "inicio":
+            self.total = dados.get("total")
+            self.contar = dados.get("contar")
+            self.feitos = 0
+            self._inicio = time.perf_counter()
+        elif tipo == self.contar or (self.contar is None and tipo in self._CONTADOS):
+            self.feitos += 1
+        elif tipo == "erro":
+            self.erros += 1
+            self._limpar()
+            print(f"❌ {dados['arquivo']}: {str(dados['mensagem'])[:80]}", file=self.arquivo)
+        agora = time.perf_counter()
+        if tipo == "fim":
+            self._desenhar(agora)
+            print(file=self.arquivo, flush=True)
+            self._largura = 0
+        elif agora - self._ultimo >= self.intervalo:
+            self._desenhar(agora)
+
+    def _desenhar(self, agora):
+        self._ultimo = agora
+        decorrido = agora - self._inicio
+        taxa = self.feitos / decorrido if decorrido > 0 else 0.0
+        if self.total:
+            fracao = min(1.0, self.feitos / self.total)
+            cheio = int(fracao * 20)
+            linha = (f"⏳ [{'█' * cheio}{'·' * (20 - cheio)}] {self.feitos:,}/{self.total:,} "
+                     f"({fracao:.0%}) {taxa:,.0f}/s")
+        else:
+            linha = f"⏳ {self.feitos:,} item(ns) {taxa:,.0f}/s"
+        if self.erros:
+            linha += f" | {self.erros} erro(s)"
+        print("\r" + linha.ljust(self._largura), end="", file=self.arquivo, flush=True)
+        self._largura = len(linha)
+
+    def _limpar(self):
+        if self._largura:
+            print("\r" + " " * self._largura + "\r", end="", file=self.arquivo)
+            self._largura = 0
+
+
+class SaidaJSONL(Saida):
+    """Um objeto JSON por linha para cada evento, com o instante em que ocorreu"""
+
+    def __init__(self, destino):
+        """
+        Args:
+            destino: Caminho do arquivo ou objeto com write()
+        """
+        self._proprio = isinstance(destino, str)
+        self._arquivo = open(destino, "a", encoding="utf-8") if self._proprio else destino
+
+    def receber(self, tipo, dados):
+        registro = {"tipo": tipo, "t": round(time.time(), 6), **dados}
+        self._arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+
+    def fechar(self):
+        if self._proprio:
+            self._arquivo.close()
+        else:
+            self._arquivo.flush()
+
+
+class ColetorEventos(Saida):
+    """Guarda os eventos em memória (ex.: num processo do pool, para repassar depois)"""
+
+    def __init__(self):
+        self.eventos: List[List[object]] = []
+
+    def receber(self, tipo, dados):
+        self.eventos.append([tipo, dict(dados)])
+
+
+class Eventos:
+    """
+    Distribui eventos para as saídas e acumula os tempos por fase
+
+    Seguro para uso por várias threads, sem que uma espere pela E/S da
+    outra: o evento entra numa fila e quem conseguir a trava das saídas
+    entrega a fila inteira, em ordem; quem não conseguir só enfileira e
+    segue. Os tempos vão para histogramas da própria thread, somados em
+    exportar().
+    """
+
+    def __init__(self, *saidas: Saida):
+        self.saidas = list(saidas)
+        # Tempos recebidos de fora (somar_tempos); os medidos ficam por thread
+        self.tempos: Dict[str, Histograma] = {}
+        self._fila: deque = deque()
+        self._trava_saidas = threading.Lock()
+        self._trava_tempos = threading.Lock()
+        self._local = threading.local()
+        self._tempos_threads: List[Dict[str, Histograma]] = []
+
+    def emitir(self, tipo: str, **dados):
+        if not self.saidas:
+            return
+        self._fila.append((tipo, dados))
+        # Checa de novo depois de soltar a trava: um evento enfileirado
+        # enquanto ela era liberada não fica esquecido na fila
+        while self._fila and self._trava_saidas.acquire(blocking=False):
+            try:
+                while self._fila:
+                    tipo_fila, dados_fila = self._fila.popleft()
+                    for saida in self.saidas:
+                        saida.receber(tipo_fila, dados_fila)
+            finally:
+                self._trava_saidas.release()
+
+    def registrar_tempo(self, fase: str, segundos: float):
+        tempos = getattr(self._local, "tempos", None)
+        if tempos is None:
+            tempos = self._local.tempos = {}
+            with self._trava_tempos:
+                self._tempos_threads.append(tempos)
+        histograma = tempos.get(fase)
+        if histograma is None:
+            histograma = tempos[fase] = Histograma()
+        histograma.registrar(segundos)
+
+    @contextmanager
+    def medir(self, fase: str):
+        """with eventos.medir("move"): ... registra quanto o bloco demorou"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar_tempo(fase, time.perf_counter() - inicio)
+
+    def exportar(self) -> Dict[str, object]:
+        """
+        Tempos em formato serializável (para juntar com somar_tempos)
+
+        Com workers ainda medindo, o resultado é aproximado.
+        """
+        with self._trava_tempos:
+            total: Dict[str, Histograma] = {}
+            for tempos in [self.tempos, *self._tempos_threads]:
+                for fase, histograma in list(tempos.items()):
+                    total.setdefault(fase, Histograma()).somar(histograma)
+        return {fase: h.para_dict() for fase, h in total.items()}
+
+    def somar_tempos(self, tempos: Dict[str, object]):
+        """Junta tempos exportados por outro Eventos (ex.: de um processo filho)"""
+        with self._trava_tempos:
+            for fase, dados in tempos.items():
+                histograma = Histograma.de_dict(dados)
+                if fase in self.tempos:
+                    self.tempos[fase].somar(histograma)
+                else:
+                    self.tempos[fase] = histograma
+
+    def repassar(self, eventos: List[List[object]]):
+        """Emite de novo eventos guardados por um ColetorEventos"""
+        for tipo, dados in eventos:
+            self.emitir(tipo, **dados)
+
+    def mostrar_tempos(self):
+        """Tabela de tempos por fase (n, total, média, p50, p99, máximo)"""
+        tempos = self.exportar()
+        if not tempos:
+            return
+        print("\n⏱️ Tempos por fase:")
+        print(f"   {'fase':<10} {'n':>9} {'total':>9} {'média':>9} {'p50':>9} {'p99':>9} {'máx':>9}")
+        ordem = [f for f in FASES if f in tempos] + sorted(f for f in tempos if f not in FASES)
+        for fase in ordem:
+            h = Histograma.de_dict(tempos[fase])
+            print(f"   {fase:<10} {h.n:>9,} {_ms(h.total):>9} {_ms(h.total / h.n):>9} "
+                  f"{_ms(h.percentil(50)):>9} {_ms(h.percentil(99)):>9} {_ms(h.maximo):>9}")
+
+    def fechar(self):
+        for saida in self.saidas:
+            saida.fechar()
+
+
+def _ms(segundos: float) -> str:
+    if segundos >= 1:
+        return f"{segundos:.2f}s"
+    return f"{segundos * 1000:.2f}ms"
+
+
+def criar_eventos(saida: str = "emoji", arquivo_eventos: Optional[str] = None) -> Eventos:
+    """
+    Eventos configurados a partir das opções de linha de comando
+
+    Args:
+        saida: "emoji", "progresso" ou "silenciosa"
+        arquivo_eventos: Se informado, também grava JSON Lines nele
+    """
+    saidas: List[Saida] = []
+    if saida == "emoji":
+        saidas.append(SaidaEmoji())
+    elif saida == "progresso":
+        saidas.append(BarraProgresso())
+    if arquivo_eventos:
+        saidas.append(SaidaJSONL(arquivo_eventos))
+    return Eventos(*saidas)
@@ -0,0 +1,406 @@
+"""
+Índice persistente de uma árvore de pastas, com atualização incremental
+
+Guarda em um único arquivo binário, pensado para ser aberto com mmap,
+cada pasta da árvore (caminho, mtime, bytes, arquivos) e cada arquivo
+(nome, tamanho, mtime). Numa nova execução só são relidas as pastas cujo
+mtime mudou; das demais, os registros antigos são copiados como estão.
+A comparação entre as duas versões dá os arquivos adicionados, removidos,
+que cresceram e que foram alterados desde o índice anterior.
+
+Limitação: o mtime de uma pasta só muda quando algo é criado, removido
+ou renomeado nela. Um arquivo que cresce ou é alterado no lugar só é
+percebido se a pasta dele for relida por outro motivo (ou com
+completo=True, que relê tudo).
+
+Formato (little-endian):
+    cabeçalho  CABECALHO (totais prontos, sem ler o resto do arquivo)
+    arquivos   ARQUIVO por arquivo; os de uma pasta ficam contíguos
+    nomes      nomes dos arquivos (um bloco por pasta) e caminhos das pastas
+    pastas     PASTA por pasta, ordenadas por caminho (a raiz é a primeira)
+
+Exemplo de uso:
+    from indice_arvore import atualizar_indice
+    indice, diferencas = atualizar_indice("/mnt/nas", "/var/tmp/nas.idx")
+    print(indice.n_arquivos, diferencas.resumo())
+    indice.fechar()
+"""
+
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from varredura import percorrer_paralelo
+
+MAGICO = b"IDXARV01"
+
+# mágico, nº de pastas, nº de arquivos, bytes, criado em (ns),
+# início das seções de arquivos, nomes e pastas, início e tamanho da raiz
+CABECALHO = struct.Struct("<8sQQQqQQQQI4x")
+# mtime_ns, bytes dos arquivos, primeiro arquivo, início do bloco de nomes,
+# início do caminho, nº de arquivos, pasta-mãe, tamanho do caminho e do bloco
+PASTA = struct.Struct("<qQQQQIIII")
+# tamanho, mtime_ns, início do nome (relativo ao bloco da pasta), tamanho do nome
+ARQUIVO = struct.Struct("<QqII")
+
+SEM_PAI = 0xFFFFFFFF
+AMOSTRAS = 20  # caminhos guardados por tipo de diferença, para o relatório
+
+
+def _codificar(texto: str) -> bytes:
+    return os.fsencode(texto)
+
+
+def _decodificar(dados) -> str:
+    return os.fsdecode(bytes(dados))
+
+
+class IndiceArvore:
+    """Leitura de um índice gravado, via mmap (abrir não lê o arquivo todo)"""
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._arquivo = open(caminho, "rb")
+        try:
+            self._mm = mmap.mmap(self._arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # arquivo vazio
+            self._arquivo.close()
+            raise ValueError(f"Índice inválido: {caminho}")
+        (magico, self.n_pastas, self.n_arquivos, self.bytes, self.criado_ns,
+         self._off_arquivos, self._off_nomes, self._off_pastas,
+         off_raiz, tam_raiz) = CABECALHO.unpack_from(self._mm, 0)
+        if magico != MAGICO:
+            self.fechar()
+            raise ValueError(f"Índice inválido: {caminho}")
+        self.raiz = _decodificar(self._nome(off_raiz, tam_raiz))
+        self._por_caminho: Optional[Dict[str, int]] = None
+
+    def _nome(self, inicio: int, tamanho: int) -> memoryview:
+        inicio += self._off_nomes
+        return memoryview(self._mm)[inicio:inicio + tamanho]
+
+    def pasta(self, i: int) -> Tuple[int, ...]:
+        """Registro PASTA bruto da i-ésima pasta"""
+        return PASTA.unpack_from(self._mm, self._off_pastas + i * PASTA.size)
+
+    def caminho_pasta(self, i: int) -> str:
+        """Caminho relativo à raiz ('' para a própria raiz)"""
+        registro = self.pasta(i)
+        return _decodificar(self._nome(registro[4], registro[7]))
+
+    def arquivos(self, i: int) -> Iterator[Tuple[str, int, int]]:
+        """(nome, tamanho, mtime_ns) de cada arquivo da i-ésima pasta"""
+        _, _, primeiro, nomes_off, _, n, _, _, nomes_len = self.pasta(i)
+        nomes = bytes(self._nome(nomes_off, nomes_len))
+        inicio = self._off_arquivos + primeiro * ARQUIVO.size
+        for tamanho, mtime_ns, off, tam in ARQUIVO.iter_unpack(
+                self._mm[inicio:inicio + n * ARQUIVO.size]):
+            yield os.fsdecode(nomes[off:off + tam]), tamanho, mtime_ns
+
+    def blocos_brutos(self, i: int) -> Tuple[bytes, bytes]:
+        """Registros ARQUIVO e bloco de nomes da pasta, prontos para copiar"""
+        _, _, primeiro, nomes_off, _, n, _, _, nomes_len = self.pasta(i)
+        inicio = self._off_arquivos + primeiro * ARQUIVO.size
+        return (self._mm[inicio:inicio + n * ARQUIVO.size],
+                bytes(self._nome(nomes_off, nomes_len)))
+
+    def indice_por_caminho(self) -> Dict[str, int]:
+        """{caminho relativo: número da pasta}, montado na primeira chamada"""
+        if self._por_caminho is None:
+            self._por_caminho = {self.caminho_pasta(i): i for i in range(self.n_pastas)}
+        return self._por_caminho
+
+    def filhas(self) -> Dict[int, List[int]]:
+        """{pasta: [subpastas]} a partir do campo pasta-mãe"""
+        resultado: Dict[int, List[int]] = {}
+        inicio = self._off_pastas
+        for i, registro in enumerate(PASTA.iter_unpack(
+                self._mm[inicio:inicio + self.n_pastas * PASTA.size])):
+            if registro[6] != SEM_PAI:
+                resultado.setdefault(registro[6], []).append(i)
+        return resultado
+
+    def totais_por_subpasta(self, profundidade: int = 1) -> Dict[str, Dict[str, int]]:
+        """Arquivos, pastas e bytes de cada subárvore até a profundidade dada"""
+        totais: Dict[str, Dict[str, int]] = {}
+        for i in range(self.n_pastas):
+            registro = self.pasta(i)
+            partes = self.caminho_pasta(i).split(os.sep) if registro[6] != SEM_PAI else []
+            for nivel in range(1, min(len(partes), profundidade) + 1):
+                total = totais.setdefault(os.sep.join(partes[:nivel]),
+                                          {"arquivos": 0, "pastas": 0, "bytes": 0})
+                total["arquivos"] += registro[5]
+                total["bytes"] += registro[1]
+                total["pastas"] += nivel < len(partes)
+        return totais
+
+    def fechar(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        self._arquivo.close()
+
+    def __enter__(self) -> "IndiceArvore":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+class _GravadorIndice:
+    """
+    Monta um índice novo em um arquivo temporário
+
+    Os registros de arquivos vão direto para o disco à medida que as pastas
+    chegam; só os dados das pastas ficam em memória até o fim.
+    """
+
+    def __init__(self, destino: str, raiz: str):
+        self.destino = destino
+        self.raiz = raiz
+        pasta = os.path.dirname(os.path.abspath(destino))
+        self._saida = tempfile.NamedTemporaryFile(dir=pasta, prefix=".indice-", delete=False)
+        self._nomes = tempfile.TemporaryFile(dir=pasta)
+        self._saida.write(b"\0" * CABECALHO.size)
+        self._pos_nomes = 0
+        self.n_arquivos = 0
+        self.bytes = 0
+        # caminho relativo -> (mtime_ns, bytes, primeiro, nomes_off, n, nomes_len)
+        self._pastas: Dict[str, Tuple[int, int, int, int, int, int]] = {}
+
+    def adicionar(self, relativo: str, mtime_ns: int, arquivos: List[Tuple[str, int, int, bool]]):
+        """Grava uma pasta lida agora: (nome, tamanho, mtime_ns, eh_link) por arquivo"""
+        registros = bytearray()
+        nomes = bytearray()
+        total = 0
+        for nome, tamanho, mtime, eh_link in arquivos:
+            codificado = _codificar(nome)
+            registros += ARQUIVO.pack(tamanho, mtime, len(nomes), len(codificado))
+            nomes += codificado
+            if not eh_link:
+                total += tamanho
+        self._adicionar_bruto(relativo, mtime_ns, total, len(arquivos), bytes(registros), bytes(nomes))
+
+    def copiar(self, relativo: str, indice: IndiceArvore, i: int):
+        """Reaproveita a pasta i de um índice anterior, sem decodificar os arquivos"""
+        mtime_ns, total, _, _, _, n, _, _, _ = indice.pasta(i)
+        registros, nomes = indice.blocos_brutos(i)
+        self._adicionar_bruto(relativo, mtime_ns, total, n, registros, nomes)
+
+    def _adicionar_bruto(self, relativo, mtime_ns, total, n, registros, nomes):
+        self._saida.write(registros)
+        self._nomes.write(nomes)
+        self._pastas[relativo] = (mtime_ns, total, self.n_arquivos, self._pos_nomes, n, len(nomes))
+        self._pos_nomes += len(nomes)
+        self.n_arquivos += n
+        self.bytes += total
+
+    def concluir(self) -> IndiceArvore:
+        """Escreve nomes, pastas e cabeçalho e troca o índice antigo pelo novo"""
+        saida = self._saida
+        try:
+            off_nomes = saida.tell()
+            self._nomes.seek(0)
+            while True:
+                bloco = self._nomes.read(1024 * 1024)
+                if not bloco:
+                    break
+                saida.write(bloco)
+            self._nomes.close()
+
+            # Caminhos das pastas no fim da seção de nomes; ordenar por
+            # caminho garante que a pasta-mãe vem antes das filhas
+            caminhos = sorted(self._pastas)
+            numeros = {c: i for i, c in enumerate(caminhos)}
+            posicoes = []
+            pos = self._pos_nomes
+            for caminho in caminhos:
+                codificado = _codificar(caminho)
+                saida.write(codificado)
+                posicoes.append((pos, len(codificado)))
+                pos += len(codificado)
+            raiz = _codificar(self.raiz)
+            saida.write(raiz)
+            off_raiz = pos
+
+            off_pastas = saida.tell()
+            for caminho, (caminho_off, caminho_len) in zip(caminhos, posicoes):
+                mtime_ns, total, primeiro, nomes_off, n, nomes_len = self._pastas[caminho]
+                pai = numeros.get(os.path.dirname(caminho), SEM_PAI) if caminho else SEM_PAI
+                saida.write(PASTA.pack(mtime_ns, total, primeiro, nomes_off, caminho_off,
+                                       n, pai, caminho_len, nomes_len))
+
+            saida.seek(0)
+            saida.write(CABECALHO.pack(MAGICO, len(caminhos), self.n_arquivos, self.bytes,
+                                       time.time_ns(), CABECALHO.size, off_nomes, off_pastas,
+                                       off_raiz, len(raiz)))
+            saida.flush()
+            os.fsync(saida.fileno())
+            saida.close()
+            os.replace(saida.name, self.destino)
+        except BaseException:
+            self.descartar()
+            raise
+        return IndiceArvore(self.destino)
+
+    def descartar(self):
+        self._nomes.close()
+        self._saida.close()
+        try:
+            os.remove(self._saida.name)
+        except OSError:
+            pass
+
+
+class Diferencas:
+    """O que mudou na árvore desde o índice anterior"""
+
+    TIPOS = ("adicionados", "removidos", "crescidos", "alterados")
+
+    def __init__(self):
+        self.contagem = {tipo: 0 for tipo in self.TIPOS}
+        self.bytes = {tipo: 0 for tipo in self.TIPOS}
+        self.exemplos: Dict[str, List[str]] = {tipo: [] for tipo in self.TIPOS}
+        self.pastas = {"lidas": 0, "reaproveitadas": 0, "novas": 0, "removidas": 0, "erros": 0}
+
+    def registrar(self, tipo: str, caminho: str, nbytes: int):
+        self.contagem[tipo] += 1
+        self.bytes[tipo] += nbytes
+        if len(self.exemplos[tipo]) < AMOSTRAS:
+            self.exemplos[tipo].append(caminho)
+
+    def resumo(self) -> Dict[str, object]:
+        return {"arquivos": dict(self.contagem), "bytes": dict(self.bytes),
+                "pastas": dict(self.pastas), "exemplos": self.exemplos}
+
+
+def _remover_subarvore(anterior: IndiceArvore, i: int, filhas: Dict[int, List[int]],
+                       diferencas: Diferencas):
+    """Conta como removidos todos os arquivos de uma pasta que sumiu"""
+    pilha = [i]
+    while pilha:
+        atual = pilha.pop()
+        diferencas.pastas["removidas"] += 1
+        relativo = anterior.caminho_pasta(atual)
+        for nome, tamanho, _ in anterior.arquivos(atual):
+            diferencas.registrar("removidos", os.path.join(relativo, nome), tamanho)
+        pilha.extend(filhas.get(atual, ()))
+
+
+def atualizar_indice(raiz: str,
+                     caminho_indice: str,
+                     workers: int = 16,
+                     completo: bool = False) -> Tuple[IndiceArvore, Optional[Diferencas]]:
+    """
+    Cria ou atualiza o índice da árvore e calcula as diferenças
+
+    Args:
+        raiz: Pasta raiz da árvore
+        caminho_indice: Arquivo do índice (substituído de forma atômica)
+        workers: Threads lendo pastas ao mesmo tempo
+        completo: Relê todas as pastas, mesmo as de mtime inalterado
+
+    Returns:
+        (índice novo, aberto; Diferencas ou None se não havia índice
+        anterior da mesma raiz)
+
+    Raises:
+        OSError: se a raiz não puder ser lida
+    """
+    raiz = os.path.abspath(os.path.expanduser(raiz))
+    os.scandir(raiz).close()
+
+    anterior = None
+    if os.path.exists(caminho_indice):
+        try:
+            anterior = IndiceArvore(caminho_indice)
+        except (OSError, ValueError, struct.error):
+            anterior = None
+        if anterior is not None and anterior.raiz != raiz:
+            anterior.fechar()
+            anterior = None
+    por_caminho = anterior.indice_por_caminho() if anterior is not None else {}
+    filhas = anterior.filhas() if anterior is not None else {}
+    diferencas = Diferencas() if anterior is not None else None
+
+    def ler(caminho: str, profundidade: int):
+        relativo = os.path.relpath(caminho, raiz) if profundidade else ""
+        # mtime lido antes da listagem: uma mudança no meio fica para a próxima
+        mtime_ns = os.stat(caminho, follow_symlinks=False).st_mtime_ns
+        i = por_caminho.get(relativo)
+        if i is not None and not completo and anterior.pasta(i)[0] == mtime_ns:
+            subpastas = [os.path.join(raiz, anterior.caminho_pasta(f)) for f in filhas.get(i, ())]
+            return ("reaproveitada", relativo, mtime_ns, i, None, None), subpastas
+        arquivos, subpastas = [], []
+        with os.scandir(caminho) as it:
+            for dir_entry in it:
+                if dir_entry.is_dir(follow_symlinks=False):
+                    subpastas.append(dir_entry.path)
+                else:
+                    st = dir_entry.stat(follow_symlinks=False)
+                    arquivos.append((dir_entry.name, st.st_size, st.st_mtime_ns,
+                                     dir_entry.is_symlink()))
+        return ("lida", relativo, mtime_ns, i, arquivos, subpastas), subpastas
+
+    def ler_seguro(caminho: str, profundidade: int):
+        try:
+            return ler(caminho, profundidade)
+        except OSError:
+            if not profundidade:
+                raise
+            relativo = os.path.relpath(caminho, raiz)
+            return ("erro", relativo, 0, por_caminho.get(relativo), None, None), []
+
+    gravador = _GravadorIndice(caminho_indice, raiz)
+    try:
+        for tipo, relativo, mtime_ns, i, arquivos, subpastas in percorrer_paralelo(
+                raiz, ler_seguro, workers):
+            if tipo == "reaproveitada":
+                gravador.copiar(relativo, anterior, i)
+                if diferencas is not None:
+                    diferencas.pastas["reaproveitadas"] += 1
+                continue
+            if tipo == "erro":
+                # Pasta ilegível agora: mantém o que se sabia dela
+                if i is not None:
+                    gravador.copiar(relativo, anterior, i)
+                if diferencas is not None:
+                    diferencas.pastas["erros"] += 1
+                continue
+
+            gravador.adicionar(relativo, mtime_ns, arquivos)
+            if diferencas is None:
+                continue
+            diferencas.pastas["lidas"] += 1
+            if i is None:
+                diferencas.pastas["novas"] += 1
+                for nome, tamanho, _, _ in arquivos:
+                    diferencas.registrar("adicionados", os.path.join(relativo, nome), tamanho)
+                continue
+            antigos = {nome: (tamanho, mtime) for nome, tamanho, mtime in anterior.arquivos(i)}
+            for nome, tamanho, mtime, _ in arquivos:
+                caminho = os.path.join(relativo, nome)
+                antigo = antigos.pop(nome, None)
+                if antigo is None:
+                    diferencas.registrar("adicionados", caminho, tamanho)
+                elif tamanho > antigo[0]:
+                    diferencas.registrar("crescidos", caminho, tamanho - antigo[0])
+                elif (tamanho, mtime) != antigo:
+                    diferencas.registrar("alterados", caminho, tamanho)
+            for nome, (tamanho, _) in antigos.items():
+                diferencas.registrar("removidos", os.path.join(relativo, nome), tamanho)
+            # Subpastas que existiam e sumiram
+            atuais = {os.path.basename(s) for s in subpastas}
+            for f in filhas.get(i, ()):
+                if os.path.basename(anterior.caminho_pasta(f)) not in atuais:
+                    _remover_subarvore(anterior, f, filhas, diferencas)
+    except BaseException:
+        gravador.descartar()
+        raise
+    finally:
+        if anterior is not None:
+            anterior.fechar()
+    return gravador.concluir(), diferencas
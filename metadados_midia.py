@@ -0,0 +1,454 @@
+"""
+Data de captura lida dos metadados de fotos, vídeos e áudios
+
+Depois de cópias e downloads, as datas do sistema de arquivos quase
+sempre refletem a cópia, não a foto ou a gravação. Este módulo lê a data
+guardada no próprio arquivo:
+
+    exif   JPEG, TIFF e RAW baseados em TIFF (DateTimeOriginal) e HEIC/HEIF
+    video  MP4, MOV, M4V e 3GP (creation_time do átomo mvhd)
+    audio  MP3 (ID3v2), FLAC e Ogg/Opus (comentário DATE), WAV (bext/ICRD)
+           e M4A (mvhd)
+    midia  qualquer um dos anteriores, conforme o tipo do arquivo
+
+O tipo é reconhecido pelo conteúdo (assinatura dos primeiros bytes), não
+pela extensão. Só o cabeçalho é lido: segmentos, átomos, blocos e frames
+que não interessam são pulados com seek, então um vídeo de vários GB
+custa algumas leituras pequenas. Os resultados ficam num cache em
+memória por (caminho, tamanho, mtime).
+
+Exemplo de uso:
+    from metadados_midia import data_midia
+    ts = data_midia("IMG_0001.HEIC")          # timestamp ou None
+    ts = data_midia("VID_0001.mp4", "video")
+"""
+
+import functools
+import io
+import os
+import re
+import struct
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+CRITERIOS_MIDIA = ("exif", "video", "audio", "midia")
+
+# Segundos entre 1904-01-01 (época do QuickTime/MP4) e 1970-01-01
+_EPOCA_MP4 = 2082844800
+
+# Limites de leitura: nada aqui lê mais do que isso de uma vez
+_MAX_SEGMENTO = 256 * 1024
+_MAX_CABECALHO_OGG = 64 * 1024
+
+_DATA = re.compile(r"(\d{4})(?:[-:](\d{2})(?:[-:](\d{2})"
+                   r"(?:[T ](\d{2}):(\d{2})(?::(\d{2}))?)?)?)?")
+
+# Marcas de ftyp de arquivos HEIF (fotos) e de áudio MP4
+_MARCAS_HEIF = {b"heic", b"heix", b"heim", b"heis", b"hevc", b"hevx", b"mif1", b"msf1", b"avif"}
+_MARCAS_AUDIO = {b"M4A ", b"M4B ", b"M4P "}
+
+
+def _interpretar_data(texto: str) -> Optional[float]:
+    """Timestamp (hora local) de "2021:05:03 10:00:00", "2021-05-03T10:00", "2021"..."""
+    achado = _DATA.match(texto.strip())
+    if not achado:
+        return None
+    partes = [int(p) if p else None for p in achado.groups()]
+    ano, mes, dia, hora, minuto, segundo = partes
+    try:
+        return datetime(ano, mes or 1, dia or 1, hora or 0, minuto or 0, segundo or 0).timestamp()
+    except (ValueError, OverflowError, OSError):
+        return None  # ex.: EXIF "0000:00:00 00:00:00"
+
+
+# ---------------------------------------------------------------------------
+# EXIF (TIFF, JPEG, HEIF)
+# ---------------------------------------------------------------------------
+
+def _ler_ifd(f: BinaryIO, base: int, deslocamento: int, ordem: str) -> Dict[int, object]:
+    """Entradas de um IFD com tipo ASCII (texto) ou LONG (ponteiros)"""
+    f.seek(base + deslocamento)
+    quantidade = struct.unpack(ordem + "H", f.read(2))[0]
+    entradas = f.read(12 * min(quantidade, 512))
+    tags: Dict[int, object] = {}
+    for i in range(len(entradas) // 12):
+        tag, tipo, contagem, valor = struct.unpack_from(ordem + "HHI4s", entradas, 12 * i)
+        if tipo == 4 and contagem == 1:
+            tags[tag] = struct.unpack(ordem + "I", valor)[0]
+        elif tipo == 2:
+            tags[tag] = (valor, contagem)
+    return tags
+
+
+def _texto_ifd(f: BinaryIO, base: int, ordem: str, valor) -> str:
+    dados, contagem = valor
+    if contagem > 4:
+        f.seek(base + struct.unpack(ordem + "I", dados)[0])
+        dados = f.read(min(contagem, 64))
+    return dados[:contagem].split(b"\0", 1)[0].decode("ascii", "replace")
+
+
+def _data_tiff(f: BinaryIO, base: int = 0) -> Optional[float]:
+    """DateTimeOriginal (ou DateTimeDigitized/DateTime) de uma estrutura TIFF em base"""
+    f.seek(base)
+    cabecalho = f.read(8)
+    if cabecalho[:4] == b"II*\0":
+        ordem = "<"
+    elif cabecalho[:4] == b"MM\0*":
+        ordem = ">"
+    else:
+        return None
+    ifd0 = _ler_ifd(f, base, struct.unpack(ordem + "I", cabecalho[4:])[0], ordem)
+    candidatos = []
+    if 0x8769 in ifd0:  # ponteiro para o IFD Exif
+        exif = _ler_ifd(f, base, ifd0[0x8769], ordem)
+        candidatos += [exif.get(0x9003), exif.get(0x9004)]
+    candidatos.append(ifd0.get(0x0132))
+    for valor in candidatos:
+        if isinstance(valor, tuple):
+            timestamp = _interpretar_data(_texto_ifd(f, base, ordem, valor))
+            if timestamp is not None:
+                return timestamp
+    return None
+
+
+def _data_jpeg(f: BinaryIO) -> Optional[float]:
+    """Percorre os segmentos até o APP1 Exif (normalmente o primeiro)"""
+    f.seek(2)
+    while True:
+        marcador = f.read(4)
+        if len(marcador) < 4 or marcador[0] != 0xFF:
+            return None
+        tipo, tamanho = marcador[1], struct.unpack(">H", marcador[2:])[0]
+        if tipo in (0xDA, 0xD9):  # início da imagem comprimida / fim
+            return None
+        if tipo == 0xE1 and tamanho > 8:
+            segmento = f.read(min(tamanho - 2, _MAX_SEGMENTO))
+            if segmento.startswith(b"Exif\0\0"):
+                return _data_tiff(io.BytesIO(segmento), 6)
+            continue
+        f.seek(tamanho - 2, os.SEEK_CUR)
+
+
+def _caixas(f: BinaryIO, inicio: int, fim: int) -> Iterator[Tuple[bytes, int, int]]:
+    """Caixas ISO BMFF (MP4/MOV/HEIF) entre inicio e fim: (tipo, início dos dados, fim)"""
+    posicao = inicio
+    while posicao + 8 <= fim:
+        f.seek(posicao)
+        tamanho, tipo = struct.unpack(">I4s", f.read(8))
+        cabecalho = 8
+        if tamanho == 1:
+            tamanho = struct.unpack(">Q", f.read(8))[0]
+            cabecalho = 16
+        elif tamanho == 0:
+            tamanho = fim - posicao
+        if tamanho < cabecalho:
+            return
+        yield tipo, posicao + cabecalho, min(posicao + tamanho, fim)
+        posicao += tamanho
+
+
+def _filha(f: BinaryIO, inicio: int, fim: int, procurado: bytes) -> Optional[Tuple[int, int]]:
+    for tipo, dados, final in _caixas(f, inicio, fim):
+        if tipo == procurado:
+            return dados, final
+    return None
+
+
+def _inteiro(dados: bytes, posicao: int, tamanho: int) -> int:
+    return int.from_bytes(dados[posicao:posicao + tamanho], "big") if tamanho else 0
+
+
+def _data_heif(f: BinaryIO, tamanho_arquivo: int) -> Optional[float]:
+    """Item Exif de um HEIF: meta → iinf (qual item é Exif) → iloc (onde está)"""
+    meta = _filha(f, 0, tamanho_arquivo, b"meta")
+    if meta is None:
+        return None
+    inicio_meta = meta[0] + 4  # FullBox: versão e flags
+    iinf = _filha(f, inicio_meta, meta[1], b"iinf")
+    iloc = _filha(f, inicio_meta, meta[1], b"iloc")
+    if iinf is None or iloc is None:
+        return None
+
+    f.seek(iinf[0])
+    versao = f.read(4)[0]
+    primeiro = iinf[0] + 4 + (2 if versao == 0 else 4)
+    item_exif = None
+    for tipo, dados, final in _caixas(f, primeiro, iinf[1]):
+        if tipo != b"infe":
+            continue
+        f.seek(dados)
+        infe = f.read(min(final - dados, 64))
+        if infe[0] < 2:
+            continue
+        largura = 2 if infe[0] == 2 else 4
+        if infe[4 + largura + 2:4 + largura + 6] == b"Exif":
+            item_exif = _inteiro(infe, 4, largura)
+            break
+    if item_exif is None:
+        return None
+
+    f.seek(iloc[0])
+    dados = f.read(min(iloc[1] - iloc[0], _MAX_SEGMENTO))
+    versao = dados[0]
+    t_deslocamento, t_tamanho = dados[4] >> 4, dados[4] & 15
+    t_base, t_indice = dados[5] >> 4, (dados[5] & 15) if versao in (1, 2) else 0
+    largura_id = 2 if versao < 2 else 4
+    quantidade = _inteiro(dados, 6, largura_id)
+    posicao = 6 + largura_id
+    for _ in range(quantidade):
+        if posicao >= len(dados):
+            return None  # iloc truncado
+        item = _inteiro(dados, posicao, largura_id)
+        posicao += largura_id
+        if versao in (1, 2):
+            posicao += 2  # construction_method
+        posicao += 2  # data_reference_index
+        base = _inteiro(dados, posicao, t_base)
+        posicao += t_base
+        extensoes = _inteiro(dados, posicao, 2)
+        posicao += 2
+        # Só o deslocamento da primeira extensão interessa; as demais são puladas
+        deslocamento = _inteiro(dados, posicao + t_indice, t_deslocamento) if extensoes else None
+        posicao += extensoes * (t_indice + t_deslocamento + t_tamanho)
+        if item == item_exif and deslocamento is not None:
+            # Dados do item: deslocamento (4 bytes) até o cabeçalho TIFF
+            f.seek(base + deslocamento)
+            pulo = struct.unpack(">I", f.read(4))[0]
+            return _data_tiff(f, base + deslocamento + 4 + pulo)
+    return None
+
+
+# ---------------------------------------------------------------------------
+# MP4 / MOV (vídeo e M4A)
+# ---------------------------------------------------------------------------
+
+def _data_mp4(f: BinaryIO, tamanho_arquivo: int) -> Optional[float]:
+    """creation_time do mvhd; o mdat (às vezes GBs antes do moov) é pulado com seek"""
+    moov = _filha(f, 0, tamanho_arquivo, b"moov")
+    if moov is None:
+        return None
+    mvhd = _filha(f, moov[0], moov[1], b"mvhd")
+    if mvhd is None:
+        return None
+    f.seek(mvhd[0])
+    dados = f.read(12)
+    if dados[0] == 1:
+        segundos = struct.unpack(">Q", dados[4:12])[0]
+    else:
+        segundos = struct.unpack(">I", dados[4:8])[0]
+    if segundos <= _EPOCA_MP4:
+        return None  # não preenchido (0) ou inválido
+    return datetime.fromtimestamp(segundos - _EPOCA_MP4, timezone.utc).timestamp()
+
+
+# ---------------------------------------------------------------------------
+# Áudio
+# ---------------------------------------------------------------------------
+
+def _sincronizado(dados: bytes) -> int:
+    """Inteiro "synchsafe" do ID3v2 (7 bits por byte)"""
+    valor = 0
+    for byte in dados:
+        valor = (valor << 7) | (byte & 0x7F)
+    return valor
+
+
+def _texto_id3(dados: bytes) -> str:
+    codificacao, texto = dados[:1], dados[1:]
+    nome = {b"\0": "latin-1", b"\1": "utf-16", b"\2": "utf-16-be"}.get(codificacao, "utf-8")
+    return texto.decode(nome, "replace").strip("\0").strip()
+
+
+def _data_id3(f: BinaryIO) -> Optional[float]:
+    """TDRC/TDOR (ID3v2.4) ou TYER+TDAT (v2.3/TYE+TDA na v2.2), pulando os demais frames"""
+    f.seek(0)
+    cabecalho = f.read(10)
+    versao, flags = cabecalho[3], cabecalho[5]
+    fim = 10 + _sincronizado(cabecalho[6:10])
+    posicao = 10
+    if flags & 0x40 and versao >= 3:  # cabeçalho estendido
+        tamanho = f.read(4)
+        posicao += _sincronizado(tamanho) if versao == 4 else 4 + struct.unpack(">I", tamanho)[0]
+    largura_id, largura_cab = (3, 6) if versao == 2 else (4, 10)
+    frames = {}
+    while posicao + largura_cab <= fim:
+        f.seek(posicao)
+        cab = f.read(largura_cab)
+        identificador = cab[:largura_id]
+        if not identificador.strip(b"\0"):
+            break  # preenchimento
+        if versao == 2:
+            tamanho = int.from_bytes(cab[3:6], "big")
+        elif versao == 4:
+            tamanho = _sincronizado(cab[4:8])
+        else:
+            tamanho = struct.unpack(">I", cab[4:8])[0]
+        if identificador in (b"TDRC", b"TDOR", b"TYER", b"TDAT", b"TORY", b"TYE", b"TDA"):
+            frames[identificador] = _texto_id3(f.read(min(tamanho, 256)))
+        posicao += largura_cab + tamanho
+    for chave in (b"TDRC", b"TDOR"):
+        if chave in frames:
+            timestamp = _interpretar_data(frames[chave])
+            if timestamp is not None:
+                return timestamp
+    ano = frames.get(b"TYER") or frames.get(b"TYE") or frames.get(b"TORY")
+    if ano:
+        ddmm = frames.get(b"TDAT") or frames.get(b"TDA") or ""
+        if len(ddmm) == 4 and ddmm.isdigit():
+            return _interpretar_data(f"{ano[:4]}-{ddmm[2:]}-{ddmm[:2]}")
+        return _interpretar_data(ano)
+    return None
+
+
+def _data_vorbis(dados: bytes) -> Optional[float]:
+    """DATE/ORIGINALDATE de um bloco de comentários Vorbis (FLAC, Ogg, Opus)"""
+    tamanho = struct.unpack_from("<I", dados, 0)[0]
+    posicao = 4 + tamanho
+    quantidade = struct.unpack_from("<I", dados, posicao)[0]
+    posicao += 4
+    campos = {}
+    for _ in range(quantidade):
+        if posicao + 4 > len(dados):
+            break
+        tamanho = struct.unpack_from("<I", dados, posicao)[0]
+        chave, _, valor = dados[posicao + 4:posicao + 4 + tamanho].partition(b"=")
+        campos[chave.upper()] = valor.decode("utf-8", "replace")
+        posicao += 4 + tamanho
+    for chave in (b"DATE", b"ORIGINALDATE", b"YEAR"):
+        if chave in campos:
+            timestamp = _interpretar_data(campos[chave])
+            if timestamp is not None:
+                return timestamp
+    return None
+
+
+def _data_flac(f: BinaryIO) -> Optional[float]:
+    """Percorre os blocos de metadados até o VORBIS_COMMENT (a capa é pulada)"""
+    f.seek(4)
+    while True:
+        cab = f.read(4)
+        if len(cab) < 4:
+            return None
+        ultimo, tipo, tamanho = cab[0] & 0x80, cab[0] & 0x7F, int.from_bytes(cab[1:], "big")
+        if tipo == 4:
+            return _data_vorbis(f.read(min(tamanho, _MAX_SEGMENTO)))
+        if ultimo:
+            return None
+        f.seek(tamanho, os.SEEK_CUR)
+
+
+def _data_ogg(f: BinaryIO) -> Optional[float]:
+    """Cabeçalho de comentários do Vorbis/Opus, no início do fluxo"""
+    f.seek(0)
+    dados = f.read(_MAX_CABECALHO_OGG)
+    for assinatura in (b"\x03vorbis", b"OpusTags"):
+        posicao = dados.find(assinatura)
+        if posicao >= 0:
+            return _data_vorbis(dados[posicao + len(assinatura):])
+    return None
+
+
+def _data_wav(f: BinaryIO, tamanho_arquivo: int) -> Optional[float]:
+    """OriginationDate/Time do bext (BWF) ou ICRD do LIST/INFO; o data é pulado"""
+    posicao = 12
+    icrd = None
+    while posicao + 8 <= tamanho_arquivo:
+        f.seek(posicao)
+        tipo, tamanho = struct.unpack("<4sI", f.read(8))
+        if tipo == b"bext" and tamanho >= 338:
+            f.seek(posicao + 8 + 320)
+            texto = f.read(18).decode("ascii", "replace")
+            timestamp = _interpretar_data(f"{texto[:10]} {texto[10:]}")
+            if timestamp is not None:
+                return timestamp
+        elif tipo == b"LIST":
+            lista = f.read(min(tamanho, _MAX_SEGMENTO))
+            if lista[:4] == b"INFO":
+                achado = lista.find(b"ICRD")
+                if achado >= 0:
+                    comprimento = struct.unpack_from("<I", lista, achado + 4)[0]
+                    icrd = lista[achado + 8:achado + 8 + comprimento].split(b"\0", 1)[0]
+        posicao += 8 + tamanho + (tamanho & 1)
+    return _interpretar_data(icrd.decode("ascii", "replace")) if icrd else None
+
+
+# ---------------------------------------------------------------------------
+# Entrada pública
+# ---------------------------------------------------------------------------
+
+def _tipo(cabecalho: bytes) -> Optional[str]:
+    """Tipo do arquivo pela assinatura: "jpeg", "tiff", "heif", "mp4", "m4a", "id3"..."""
+    if cabecalho[:3] == b"\xff\xd8\xff":
+        return "jpeg"
+    if cabecalho[:4] in (b"II*\0", b"MM\0*"):
+        return "tiff"
+    if cabecalho[4:8] == b"ftyp":
+        marca = cabecalho[8:12]
+        if marca in _MARCAS_HEIF:
+            return "heif"
+        return "m4a" if marca in _MARCAS_AUDIO else "mp4"
+    if cabecalho[4:8] in (b"moov", b"mdat", b"wide", b"free", b"skip"):
+        return "mp4"  # QuickTime antigo, sem ftyp
+    if cabecalho[:3] == b"ID3":
+        return "id3"
+    if cabecalho[:4] == b"fLaC":
+        return "flac"
+    if cabecalho[:4] == b"OggS":
+        return "ogg"
+    if cabecalho[:4] == b"RIFF" and cabecalho[8:12] == b"WAVE":
+        return "wav"
+    return None
+
+
+_CATEGORIAS = {"jpeg": "exif", "tiff": "exif", "heif": "exif", "mp4": "video",
+               "m4a": "audio", "id3": "audio", "flac": "audio", "ogg": "audio", "wav": "audio"}
+
+
+def data_midia(caminho, criterio: str = "midia",
+               stat: Optional[os.stat_result] = None) -> Optional[float]:
+    """
+    Data de captura/gravação guardada no arquivo
+
+    Args:
+        caminho: Arquivo a ler
+        criterio: "exif", "video", "audio" ou "midia" (qualquer um)
+        stat: stat já obtido do arquivo (evita um stat extra para o cache)
+
+    Returns:
+        Timestamp, ou None se o arquivo não for do tipo pedido, não tiver
+        a data ou não puder ser lido
+    """
+    caminho = os.fspath(caminho)
+    if stat is None:
+        try:
+            stat = os.stat(caminho)
+        except OSError:
+            return None
+    return _data_em_cache(caminho, stat.st_size, stat.st_mtime_ns, criterio)
+
+
+@functools.lru_cache(maxsize=4096)
+def _data_em_cache(caminho: str, tamanho: int, mtime_ns: int, criterio: str) -> Optional[float]:
+    try:
+        with open(caminho, "rb") as f:
+            tipo = _tipo(f.read(12))
+            if tipo is None or (criterio != "midia" and _CATEGORIAS[tipo] != criterio):
+                return None
+            if tipo == "jpeg":
+                return _data_jpeg(f)
+            if tipo == "tiff":
+                return _data_tiff(f)
+            if tipo == "heif":
+                return _data_heif(f, tamanho)
+            if tipo in ("mp4", "m4a"):
+                return _data_mp4(f, tamanho)
+            if tipo == "id3":
+                return _data_id3(f)
+            if tipo == "flac":
+                return _data_flac(f)
+            if tipo == "ogg":
+                return _data_ogg(f)
+            return _data_wav(f, tamanho)
+    except (OSError, ValueError, OverflowError, IndexError, struct.error):
+        return None  # arquivo truncado, corrompido ou ilegível
@@ -0,0 +1,51 @@
+"""
+Testes da contagem recursiva e dos eventos que ela emite
+"""
+
+import io
+
+from contador import ProgressoContagem, contar_arvore
+from eventos import ColetorEventos, Eventos
+
+ARQUIVOS = {
+    "a/1.txt": b"x",
+    "a/b/2.txt": b"yy",
+    "c/3.txt": b"zzz",
+}
+
+
+def _criar(raiz, arquivos):
+    for relativo, conteudo in arquivos.items():
+        caminho = raiz / relativo
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(conteudo)
+
+
+def test_eventos_da_contagem_somam_o_total(tmp_path):
+    _criar(tmp_path, ARQUIVOS)
+    coletor = ColetorEventos()
+    eventos = Eventos(coletor)
+
+    resultado = contar_arvore(str(tmp_path), workers=2, eventos=eventos)
+
+    assert resultado["total"] == {"arquivos": 3, "pastas": 3, "bytes": 6}
+    tipos = [tipo for tipo, _ in coletor.eventos]
+    assert tipos[0] == "inicio" and tipos[-1] == "fim"
+    lidas = {dados["pasta"]: dados for tipo, dados in coletor.eventos if tipo == "pasta_lida"}
+    assert sorted(lidas) == [".", "a", "a/b", "c"]
+    for campo in ("arquivos", "pastas", "bytes"):
+        assert sum(d[campo] for d in lidas.values()) == resultado["total"][campo]
+    assert coletor.eventos[-1][1]["total"] == resultado["total"]
+    # Cada pasta lida entra na fase scandir
+    assert eventos.exportar()["scandir"]["n"] == 4
+
+
+def test_progresso_da_contagem_mostra_os_totais_e_se_apaga(tmp_path):
+    _criar(tmp_path, ARQUIVOS)
+    saida = io.StringIO()
+
+    contar_arvore(str(tmp_path), eventos=Eventos(ProgressoContagem(saida, intervalo=0)))
+
+    texto = saida.getvalue()
+    assert "⏳ 3 arquivo(s), 3 pasta(s), 6 B..." in texto
+    assert texto.endswith("\r" + " " * 70 + "\r")
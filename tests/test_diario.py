@@ -0,0 +1,245 @@
+"""
+Testes do diário de movimentações: retomada depois de uma queda e desfazer
+
+Cada queda é simulada executando o plano inteiro e depois cortando o
+diário (as últimas movimentações ficam sem registro e a última linha
+fica pela metade) e, quando preciso, mexendo no disco para reproduzir o
+estado em que a execução parou.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from diario import DiarioMovimentos
+from eventos import Eventos
+from Organizador_LLM import SUFIXO_TEMPORARIO, Organizador
+
+# Todos os arquivos caem na mesma pasta de data
+DATA = time.mktime((2020, 1, 15, 12, 0, 0, 0, 0, -1))
+PASTA_DATA = "2020-01"
+
+ARQUIVOS = {
+    "a/foto.jpg": b"A" * 10,
+    "b/foto.jpg": b"B" * 20,
+    "c/nota.txt": b"nota",
+}
+
+
+def _criar(raiz: Path, arquivos):
+    for relativo, conteudo in arquivos.items():
+        caminho = raiz / relativo
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(conteudo)
+        os.utime(caminho, (DATA, DATA))
+
+
+def _layout(raiz: Path):
+    """{caminho relativo: conteúdo} de todos os arquivos sob raiz"""
+    return {
+        str(p.relative_to(raiz)): p.read_bytes()
+        for p in sorted(raiz.rglob("*"))
+        if p.is_file()
+    }
+
+
+def _organizar(raiz: Path, caminho_diario: Path, deduplicar=None) -> DiarioMovimentos:
+    org = Organizador(eventos=Eventos())
+    plano = org.planejar(str(raiz), mostrar=False, recursivo=True, deduplicar=deduplicar)
+    diario = DiarioMovimentos(str(caminho_diario))
+    try:
+        stats = org.executar_plano(plano, diario=diario)
+    finally:
+        diario.fechar()
+    assert stats["erros"] == 0
+    return diario
+
+
+def _cortar_diario(caminho: Path, manter: int):
+    """Simula a queda: só as `manter` primeiras movimentações ficam registradas"""
+    linhas = caminho.read_text(encoding="utf-8").splitlines(keepends=True)
+    fim = next(i for i, linha in enumerate(linhas) if '"plano"' in linha) + 1
+    for fim in range(fim, len(linhas)):
+        if "m" in json.loads(linhas[fim]):
+            if manter == 0:
+                break
+            manter -= 1
+    else:
+        fim = len(linhas)
+    # A linha seguinte ficou pela metade
+    cortado = linhas[fim][: len(linhas[fim]) // 2] if fim < len(linhas) else ""
+    caminho.write_text("".join(linhas[:fim]) + cortado, encoding="utf-8")
+
+
+def _pid_encerrado() -> int:
+    processo = subprocess.Popen([sys.executable, "-c", "pass"])
+    processo.wait()
+    return processo.pid
+
+
+def _retomar(caminho_diario: Path):
+    return Organizador(eventos=Eventos()).retomar_diario(str(caminho_diario))
+
+
+def _desfazer(caminho_diario: Path):
+    return Organizador(eventos=Eventos()).desfazer_diario(str(caminho_diario))
+
+
+def test_retomada_com_ultima_linha_cortada_recupera_movimentos_sem_registro(tmp_path):
+    raiz = tmp_path / "fotos"
+    _criar(raiz, ARQUIVOS)
+    caminho_diario = tmp_path / "org.diario"
+    _organizar(raiz, caminho_diario)
+    organizado = _layout(raiz)
+    _cortar_diario(caminho_diario, manter=0)
+
+    stats = _retomar(caminho_diario)
+
+    assert stats["recuperados"] == 3
+    assert stats["perdidos"] == 0
+    assert stats["arquivos_processados"] == 0
+    assert _layout(raiz) == organizado
+    # O diário continua legível depois da linha cortada
+    diario = DiarioMovimentos(str(caminho_diario))
+    assert diario.iniciado and not diario.pendentes()
+
+
+def test_variante_com_sufixo_volta_para_a_origem_certa(tmp_path):
+    raiz = tmp_path / "fotos"
+    _criar(raiz, ARQUIVOS)
+    caminho_diario = tmp_path / "org.diario"
+    _organizar(raiz, caminho_diario)
+    destino = raiz / PASTA_DATA
+    assert sorted(p.name for p in destino.iterdir()) == ["foto.jpg", "foto_1.jpg", "nota.txt"]
+    _cortar_diario(caminho_diario, manter=1)
+
+    stats = _retomar(caminho_diario)
+    assert stats["recuperados"] == 2
+    assert stats["perdidos"] == 0
+
+    # foto_1.jpg foi casada pelo nome original e pelo tamanho
+    concluidos = DiarioMovimentos(str(caminho_diario)).concluidos
+    for relativo, conteudo in ARQUIVOS.items():
+        final, acao = concluidos[str(raiz / relativo)]
+        assert acao == "mover"
+        assert Path(final).read_bytes() == conteudo
+
+    resumo = _desfazer(caminho_diario)
+    assert resumo == {"restaurados": 3, "erros": 0, "pastas_removidas": 1}
+    assert _layout(raiz) == ARQUIVOS
+
+
+def test_origem_ainda_presente_e_temporario_abandonado(tmp_path):
+    raiz = tmp_path / "fotos"
+    _criar(raiz, ARQUIVOS)
+    caminho_diario = tmp_path / "org.diario"
+    diario = _organizar(raiz, caminho_diario)
+    finais = {origem: Path(final) for origem, (final, _) in diario.concluidos.items()}
+    _cortar_diario(caminho_diario, manter=0)
+
+    a, b, c = (str(raiz / relativo) for relativo in ARQUIVOS)
+    # link + unlink interrompido antes do unlink: origem e destino são o mesmo arquivo
+    os.link(finais[a], a)
+    # Cópia entre dispositivos interrompida antes de remover a origem
+    Path(b).write_bytes(ARQUIVOS["b/foto.jpg"])
+    # Não chegou a ser movido; sobrou o temporário da cópia
+    os.rename(finais[c], c)
+    temporario = finais[c].parent / f".nota.txt.{_pid_encerrado()}{SUFIXO_TEMPORARIO}"
+    temporario.write_bytes(b"no")
+
+    stats = _retomar(caminho_diario)
+
+    assert stats["recuperados"] == 2
+    assert stats["perdidos"] == 0
+    assert stats["arquivos_movidos"] == 1
+    assert stats["erros"] == 0
+    assert _layout(raiz) == {
+        f"{PASTA_DATA}/{Path(final).name}": ARQUIVOS[str(Path(origem).relative_to(raiz))]
+        for origem, final in finais.items()
+    }
+    assert not temporario.exists()
+
+
+@pytest.mark.parametrize("devolvido", ["a/foto.jpg", "b/foto.jpg"])
+def test_origem_presente_nao_toma_a_copia_identica_de_outro_item(tmp_path, devolvido):
+    """Duas origens de mesmo nome e conteúdo: a não movida não pode ser apagada"""
+    raiz = tmp_path / "fotos"
+    arquivos = {"a/foto.jpg": b"igual", "b/foto.jpg": b"igual"}
+    _criar(raiz, arquivos)
+    caminho_diario = tmp_path / "org.diario"
+    diario = _organizar(raiz, caminho_diario)
+    _cortar_diario(caminho_diario, manter=0)
+    # Só o outro arquivo chegou a ser movido (sem registro)
+    os.rename(diario.concluidos[str(raiz / devolvido)][0], raiz / devolvido)
+
+    stats = _retomar(caminho_diario)
+
+    assert stats["recuperados"] == 1
+    assert stats["perdidos"] == 0
+    assert stats["arquivos_movidos"] == 1
+    assert _layout(raiz) == {f"{PASTA_DATA}/foto.jpg": b"igual",
+                             f"{PASTA_DATA}/foto_1.jpg": b"igual"}
+    resumo = _desfazer(caminho_diario)
+    assert resumo["restaurados"] == 2 and resumo["erros"] == 0
+    assert _layout(raiz) == arquivos
+
+
+def test_arquivo_sumido_conta_como_perdido(tmp_path):
+    raiz = tmp_path / "fotos"
+    _criar(raiz, ARQUIVOS)
+    caminho_diario = tmp_path / "org.diario"
+    diario = _organizar(raiz, caminho_diario)
+    final_nota = Path(diario.concluidos[str(raiz / "c/nota.txt")][0])
+    _cortar_diario(caminho_diario, manter=0)
+    final_nota.unlink()
+
+    stats = _retomar(caminho_diario)
+
+    assert stats["recuperados"] == 2
+    assert stats["perdidos"] == 1
+    assert stats["erros"] == 1  # o item perdido continua pendente e falha ao mover
+    assert "c/nota.txt" not in _layout(raiz)
+
+
+def test_desfazer_duplicatas_vinculadas(tmp_path):
+    raiz = tmp_path / "fotos"
+    arquivos = {"a/x.bin": b"igual" * 100, "b/y.bin": b"igual" * 100, "c/z.bin": b"outro"}
+    _criar(raiz, arquivos)
+    caminho_diario = tmp_path / "org.diario"
+    diario = _organizar(raiz, caminho_diario, deduplicar="hardlink")
+
+    x, y = (diario.concluidos[str(raiz / r)] for r in ("a/x.bin", "b/y.bin"))
+    assert (x[1], y[1]) == ("mover", "vincular")
+    assert os.path.samefile(x[0], y[0])
+
+    resumo = _desfazer(caminho_diario)
+
+    assert resumo == {"restaurados": 3, "erros": 0, "pastas_removidas": 1}
+    assert _layout(raiz) == arquivos
+    assert not (raiz / PASTA_DATA).exists()
+
+
+def test_vinculo_sem_registro_e_recuperado_e_desfeito(tmp_path):
+    raiz = tmp_path / "fotos"
+    arquivos = {"a/x.bin": b"igual" * 100, "b/y.bin": b"igual" * 100, "c/z.bin": b"outro"}
+    _criar(raiz, arquivos)
+    caminho_diario = tmp_path / "org.diario"
+    _organizar(raiz, caminho_diario, deduplicar="hardlink")
+    # O vínculo da duplicata é a última movimentação registrada
+    movimentos = [r for r in map(json.loads, caminho_diario.read_text(encoding="utf-8").splitlines())
+                  if isinstance(r, dict) and "m" in r]
+    assert movimentos[-1]["a"] == "vincular"
+    _cortar_diario(caminho_diario, manter=len(movimentos) - 1)
+
+    stats = _retomar(caminho_diario)
+
+    assert stats["recuperados"] == 1
+    assert DiarioMovimentos(str(caminho_diario)).concluidos[str(raiz / "b/y.bin")][1] == "vincular"
+    resumo = _desfazer(caminho_diario)
+    assert resumo["restaurados"] == 3 and resumo["erros"] == 0
+    assert _layout(raiz) == arquivos
@@ -0,0 +1,285 @@
+"""
+Testes dos leitores de data de metadados_midia
+
+Os arquivos são montados com struct, só com as estruturas que os
+leitores percorrem. Arquivos truncados, corrompidos ou com tamanhos
+absurdos devem dar None, nunca uma exceção.
+"""
+
+import random
+import struct
+import time
+from datetime import datetime, timezone
+
+import pytest
+
+from metadados_midia import data_midia
+
+_EPOCA_MP4 = 2082844800
+
+
+# ---------------------------------------------------------------------------
+# Montagem dos arquivos
+# ---------------------------------------------------------------------------
+
+def _tiff(data: str, ordem: str = "<", data_ifd0: str = "1999:01:01 00:00:00") -> bytes:
+    """TIFF com DateTime no IFD0 e DateTimeOriginal no IFD Exif"""
+    marca = b"II" if ordem == "<" else b"MM"
+    cabecalho = marca + struct.pack(ordem + "HI", 42, 8)
+    exif = 8 + 2 + 12 * 2 + 4
+    texto_exif = exif + 2 + 12 + 4
+    texto_ifd0 = texto_exif + 20
+    ifd0 = (struct.pack(ordem + "H", 2)
+            + struct.pack(ordem + "HHII", 0x0132, 2, 20, texto_ifd0)
+            + struct.pack(ordem + "HHII", 0x8769, 4, 1, exif) + b"\0" * 4)
+    ifd_exif = struct.pack(ordem + "H", 1) + struct.pack(ordem + "HHII", 0x9003, 2, 20, texto_exif)
+    return (cabecalho + ifd0 + ifd_exif + b"\0" * 4
+            + data.encode() + b"\0" + data_ifd0.encode() + b"\0")
+
+
+def _jpeg(tiff: bytes) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\0" + b"\0" * 9
+    app1 = b"\xff\xe1" + struct.pack(">H", len(tiff) + 8) + b"Exif\0\0" + tiff
+    return b"\xff\xd8" + app0 + app1 + b"\xff\xda\0\2"
+
+
+def _caixa(tipo: bytes, dados: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(dados)) + tipo + dados
+
+
+def _mvhd(segundos: int, versao: int = 0) -> bytes:
+    if versao == 1:
+        return _caixa(b"mvhd", b"\1\0\0\0" + struct.pack(">QQ", segundos, segundos) + b"\0" * 96)
+    return _caixa(b"mvhd", b"\0\0\0\0" + struct.pack(">II", segundos, segundos) + b"\0" * 88)
+
+
+def _mp4(segundos: int, marca: bytes = b"isom", versao: int = 0) -> bytes:
+    """ftyp, mdat com tamanho de 64 bits antes do moov (como nas câmeras)"""
+    mdat = struct.pack(">I", 1) + b"mdat" + struct.pack(">Q", 16 + 1000) + b"\0" * 1000
+    return (_caixa(b"ftyp", marca + b"\0\0\0\0isom") + mdat
+            + _caixa(b"moov", _mvhd(segundos, versao)))
+
+
+def _heif(tiff: bytes) -> bytes:
+    """ftyp, meta (iinf com um item Exif, iloc apontando para ele) e mdat"""
+    exif = struct.pack(">I", 6) + b"Exif\0\0" + tiff
+
+    def infe(item, tipo):
+        return _caixa(b"infe", b"\2\0\0\0" + struct.pack(">HH", item, 0) + tipo + b"\0")
+
+    iinf = _caixa(b"iinf", b"\0\0\0\0" + struct.pack(">H", 2) + infe(1, b"hvc1") + infe(2, b"Exif"))
+
+    def meta(deslocamento):
+        iloc = _caixa(b"iloc", b"\0\0\0\0" + bytes([0x44, 0x00]) + struct.pack(">H", 2)
+                      + struct.pack(">HHHII", 1, 0, 1, 0, 0)
+                      + struct.pack(">HHHII", 2, 0, 1, deslocamento, len(exif)))
+        return _caixa(b"meta", b"\0\0\0\0" + _caixa(b"hdlr", b"\0" * 24) + iinf + iloc)
+
+    ftyp = _caixa(b"ftyp", b"heic\0\0\0\0mif1heic")
+    deslocamento = len(ftyp) + len(meta(0)) + 8
+    return ftyp + meta(deslocamento) + _caixa(b"mdat", exif)
+
+
+def _synchsafe(n: int) -> bytes:
+    return bytes([(n >> 21) & 127, (n >> 14) & 127, (n >> 7) & 127, n & 127])
+
+
+def _id3v23(ano: bytes, ddmm: bytes) -> bytes:
+    def frame(identificador, texto):
+        return identificador + struct.pack(">I", len(texto) + 1) + b"\0\0" + b"\0" + texto
+
+    corpo = frame(b"TIT2", b"x" * 500) + frame(b"TYER", ano) + frame(b"TDAT", ddmm)
+    preenchimento = b"\0" * 100
+    return (b"ID3\3\0\0" + _synchsafe(len(corpo) + len(preenchimento)) + corpo + preenchimento
+            + b"\xff\xfb" * 100)
+
+
+def _id3v24(data: bytes) -> bytes:
+    corpo = b"TDRC" + _synchsafe(len(data) + 1) + b"\0\0" + b"\3" + data
+    return b"ID3\4\0\0" + _synchsafe(len(corpo)) + corpo
+
+
+def _vorbis(comentarios) -> bytes:
+    dados = struct.pack("<I", 3) + b"ref" + struct.pack("<I", len(comentarios))
+    for comentario in comentarios:
+        dados += struct.pack("<I", len(comentario)) + comentario
+    return dados
+
+
+def _flac(comentarios) -> bytes:
+    """STREAMINFO, capa (pulada com seek) e VORBIS_COMMENT por último"""
+    streaminfo = bytes([0]) + (34).to_bytes(3, "big") + b"\0" * 34
+    capa = b"\0" * 5000
+    imagem = bytes([6]) + len(capa).to_bytes(3, "big") + capa
+    vorbis = _vorbis(comentarios)
+    return b"fLaC" + streaminfo + imagem + bytes([0x84]) + len(vorbis).to_bytes(3, "big") + vorbis
+
+
+def _ogg(comentarios) -> bytes:
+    return (b"OggS" + b"\0" * 50 + b"OpusHead" + b"\0" * 11
+            + b"OggS" + b"\0" * 23 + b"OpusTags" + _vorbis(comentarios))
+
+
+def _wav(bext: bool = True) -> bytes:
+    """fmt, LIST/INFO com ICRD, data de tamanho ímpar e (opcional) bext"""
+    info = b"INFO" + b"ICRD" + struct.pack("<I", 11) + b"2011-01-01\0\0"
+    corpo = (b"fmt " + struct.pack("<I", 16) + b"\0" * 16
+             + b"LIST" + struct.pack("<I", len(info)) + info
+             + b"data" + struct.pack("<I", 11) + b"\0" * 11 + b"\0")
+    if bext:
+        dados_bext = b"\0" * 320 + b"2012-11-10" + b"09:08:07" + b"\0" * 264
+        corpo += b"bext" + struct.pack("<I", len(dados_bext)) + dados_bext
+    return b"RIFF" + struct.pack("<I", 4 + len(corpo)) + b"WAVE" + corpo
+
+
+def _local(*campos) -> float:
+    return datetime(*campos).timestamp()
+
+
+def _utc(segundos: int) -> float:
+    return datetime.fromtimestamp(segundos, timezone.utc).timestamp()
+
+
+VALIDOS = {
+    "jpeg": (_jpeg(_tiff("2019:07:14 15:30:00")), _local(2019, 7, 14, 15, 30)),
+    "tiff_be": (_tiff("2018:02:03 04:05:06", ">"), _local(2018, 2, 3, 4, 5, 6)),
+    "heif": (_heif(_tiff("2010:05:05 05:05:05", ">")), _local(2010, 5, 5, 5, 5, 5)),
+    "mp4": (_mp4(_EPOCA_MP4 + 1600000000), _utc(1600000000)),
+    "mp4_v1": (_mp4(_EPOCA_MP4 + 1700000000, versao=1), _utc(1700000000)),
+    "m4a": (_mp4(_EPOCA_MP4 + 1600000000, b"M4A "), _utc(1600000000)),
+    "id3v23": (_id3v23(b"2015", b"2512"), _local(2015, 12, 25)),
+    "id3v24": (_id3v24(b"2016-03-04T05:06:07"), _local(2016, 3, 4, 5, 6, 7)),
+    "flac": (_flac([b"TITLE=x", b"date=2014-06-07"]), _local(2014, 6, 7)),
+    "ogg": (_ogg([b"DATE=2013"]), _local(2013, 1, 1)),
+    "wav_bext": (_wav(), _local(2012, 11, 10, 9, 8, 7)),
+    "wav_icrd": (_wav(bext=False), _local(2011, 1, 1)),
+}
+
+
+def _ler(tmp_path, dados: bytes, criterio: str = "midia", nome: str = "arquivo"):
+    caminho = tmp_path / nome
+    caminho.write_bytes(dados)
+    return data_midia(caminho, criterio)
+
+
+# ---------------------------------------------------------------------------
+# Arquivos válidos
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("tipo", sorted(VALIDOS))
+def test_le_a_data_de_cada_formato(tmp_path, tipo):
+    dados, esperado = VALIDOS[tipo]
+    assert _ler(tmp_path, dados) == esperado
+
+
+@pytest.mark.parametrize("tipo, criterio, achado", [
+    ("jpeg", "exif", True), ("jpeg", "video", False), ("jpeg", "audio", False),
+    ("heif", "exif", True), ("mp4", "video", True), ("mp4", "audio", False),
+    ("m4a", "audio", True), ("m4a", "video", False), ("flac", "audio", True),
+    ("wav_bext", "exif", False),
+])
+def test_criterio_filtra_pelo_tipo(tmp_path, tipo, criterio, achado):
+    dados, esperado = VALIDOS[tipo]
+    assert _ler(tmp_path, dados, criterio) == (esperado if achado else None)
+
+
+def test_mdat_grande_antes_do_moov_e_pulado(tmp_path):
+    caminho = tmp_path / "video.mp4"
+    with open(caminho, "wb") as f:
+        f.write(_caixa(b"ftyp", b"isom\0\0\0\0isom"))
+        f.write(struct.pack(">I", 1) + b"mdat" + struct.pack(">Q", 16 + 2 ** 32))
+        f.seek(2 ** 32, 1)  # esparso: não ocupa o disco
+        f.write(_caixa(b"moov", _mvhd(_EPOCA_MP4 + 1600000000)))
+    inicio = time.perf_counter()
+    assert data_midia(caminho, "video") == _utc(1600000000)
+    assert time.perf_counter() - inicio < 1
+
+
+def test_texto_sem_assinatura_conhecida(tmp_path):
+    assert _ler(tmp_path, b"nada de midia aqui") is None
+    assert data_midia(tmp_path / "nao_existe.jpg") is None
+
+
+# ---------------------------------------------------------------------------
+# Arquivos truncados e corrompidos
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("tipo", sorted(VALIDOS))
+def test_truncado_em_qualquer_ponto_nao_levanta(tmp_path, tipo):
+    dados, esperado = VALIDOS[tipo]
+    passo = max(1, len(dados) // 97)
+    for corte in range(0, len(dados), passo):
+        # Um corte no meio do texto da data pode dar uma data parcial ("2019")
+        resultado = _ler(tmp_path, dados[:corte], nome=f"{tipo}_{corte}")
+        assert resultado is None or isinstance(resultado, float), corte
+
+
+@pytest.mark.parametrize("tipo", sorted(VALIDOS))
+def test_lixo_depois_da_assinatura_nao_levanta(tmp_path, tipo):
+    dados = VALIDOS[tipo][0]
+    sorteio = random.Random(tipo)
+    for i in range(100):
+        lixo = bytes(sorteio.getrandbits(8) for _ in range(sorteio.randrange(1, 300)))
+        inicio = dados[:sorteio.randrange(4, 40)]
+        resultado = _ler(tmp_path, inicio + lixo, nome=f"{tipo}_{i}")
+        assert resultado is None or isinstance(resultado, float)
+
+
+@pytest.mark.parametrize("tipo, corte", [
+    ("jpeg", 30),       # no meio do APP1, antes do cabeçalho TIFF
+    ("tiff_be", 12),    # IFD0 incompleto
+    ("heif", 60),       # meta cortado
+    ("mp4", 40),        # dentro do mdat, antes do moov
+    ("id3v23", 20),     # no meio do primeiro frame
+    ("flac", 100),      # dentro da capa
+    ("ogg", 70),        # antes do OpusTags
+    ("wav_bext", 30),   # dentro do fmt
+])
+def test_truncado_antes_da_data_da_none(tmp_path, tipo, corte):
+    assert _ler(tmp_path, VALIDOS[tipo][0][:corte]) is None
+
+
+@pytest.mark.parametrize("dados", [
+    # JPEG: segmento de tamanho 0 e APP1 Exif sem TIFF
+    b"\xff\xd8\xff\xe0\x00\x00\xff\xe0\x00\x00",
+    b"\xff\xd8\xff\xe1\x00\x0eExif\0\0XXXXXX",
+    # TIFF: IFD fora do arquivo e quantidade de entradas absurda
+    b"II*\0" + struct.pack("<I", 2 ** 31),
+    b"MM\0*" + struct.pack(">IH", 8, 0xFFFF) + b"\0" * 20,
+    # EXIF com data zerada
+    _jpeg(_tiff("0000:00:00 00:00:00", data_ifd0="0000:00:00 00:00:00")),
+    # MP4: caixa menor que o cabeçalho, tamanho de 64 bits gigante, mvhd zerado
+    _caixa(b"ftyp", b"isom") + struct.pack(">I", 4) + b"moov",
+    _caixa(b"ftyp", b"isom") + struct.pack(">I", 1) + b"moov" + struct.pack(">Q", 2 ** 63),
+    _caixa(b"ftyp", b"isom") + _caixa(b"moov", _mvhd(0)),
+    _caixa(b"ftyp", b"isom") + _caixa(b"moov", _mvhd(2 ** 64 - 1, versao=1)),
+    # ID3: frames e cabeçalho estendido com tamanhos além do arquivo
+    b"ID3\3\0\0" + _synchsafe(2 ** 27) + b"TYER" + struct.pack(">I", 2 ** 31) + b"\0\0\0",
+    b"ID3\4\0\x40" + _synchsafe(100) + b"\x7f\x7f\x7f\x7f",
+    b"ID3\2\0\0" + _synchsafe(30) + b"TYE\xff\xff\xff",
+    # FLAC: bloco além do fim e comentário com contagens absurdas
+    b"fLaC" + bytes([0x04]) + b"\xff\xff\xff",
+    b"fLaC" + bytes([0x84, 0, 0, 8]) + struct.pack("<II", 2 ** 31, 5),
+    # Ogg: OpusTags com tamanho de fornecedor gigante
+    b"OggS" + b"\0" * 30 + b"OpusTags" + struct.pack("<I", 2 ** 32 - 1),
+    # WAV: chunk com tamanho além do fim e LIST/INFO com ICRD cortado
+    b"RIFF\0\0\0\0WAVE" + b"junk" + struct.pack("<I", 2 ** 32 - 1),
+    b"RIFF\0\0\0\0WAVE" + b"LIST" + struct.pack("<I", 8) + b"INFOICRD",
+    # HEIF: meta sem iinf/iloc
+    _caixa(b"ftyp", b"heic") + _caixa(b"meta", b"\0\0\0\0"),
+])
+def test_estruturas_corrompidas_dao_none(tmp_path, dados):
+    assert _ler(tmp_path, dados) is None
+
+
+def test_iloc_sem_larguras_e_contagens_maximas_termina(tmp_path):
+    """Campos de largura 0 não avançam a leitura: as contagens não podem virar laço"""
+    ftyp = _caixa(b"ftyp", b"heic\0\0\0\0mif1heic")
+    infe = _caixa(b"infe", b"\2\0\0\0" + struct.pack(">HH", 9, 0) + b"Exif\0")
+    iinf = _caixa(b"iinf", b"\0\0\0\0" + struct.pack(">H", 1) + infe)
+    itens = struct.pack(">HHH", 1, 0, 0xFFFF) * 20000
+    iloc = _caixa(b"iloc", b"\0\0\0\0" + bytes([0x00, 0x00]) + struct.pack(">H", 0xFFFF) + itens)
+    meta = _caixa(b"meta", b"\0\0\0\0" + iinf + iloc)
+    inicio = time.perf_counter()
+    assert _ler(tmp_path, ftyp + meta) is None
+    assert time.perf_counter() - inicio < 1
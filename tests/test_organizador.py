@@ -0,0 +1,42 @@
+"""
+Testes da execução de planos do organizador
+"""
+
+import os
+import time
+from pathlib import Path
+
+from eventos import ColetorEventos, Eventos
+from Organizador_LLM import Organizador, Plano
+
+DATA = time.mktime((2020, 1, 15, 12, 0, 0, 0, 0, -1))
+
+
+def _criar(raiz: Path, arquivos):
+    for relativo, conteudo in arquivos.items():
+        caminho = raiz / relativo
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        caminho.write_bytes(conteudo)
+        os.utime(caminho, (DATA, DATA))
+
+
+def test_duplicata_alterada_depois_do_plano_e_movida_sem_vinculo(tmp_path):
+    raiz = tmp_path / "fotos"
+    _criar(raiz, {"a/x.bin": b"igual" * 100, "b/y.bin": b"igual" * 100})
+    org = Organizador(eventos=Eventos())
+    caminho_plano = tmp_path / "plano.jsonl"
+    org.planejar(str(raiz), mostrar=False, recursivo=True, deduplicar="hardlink").salvar(
+        str(caminho_plano))
+    # Editada entre --salvar-plano e --aplicar-plano, sem mudar o tamanho
+    (raiz / "b/y.bin").write_bytes(b"IGUAL" * 100)
+
+    coletor = ColetorEventos()
+    stats = Organizador(eventos=Eventos(coletor)).executar_plano(
+        Plano.carregar(str(caminho_plano)))
+
+    assert stats["erros"] == 0
+    assert (raiz / "2020-01/x.bin").read_bytes() == b"igual" * 100
+    assert (raiz / "2020-01/y.bin").read_bytes() == b"IGUAL" * 100
+    assert not os.path.samefile(raiz / "2020-01/x.bin", raiz / "2020-01/y.bin")
+    tipos = [tipo for tipo, _ in coletor.eventos]
+    assert "duplicata_alterada" in tipos
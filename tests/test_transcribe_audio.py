@@ -0,0 +1,128 @@
+"""
+Testes da leitura de WAV e da segmentação por pausas de transcribe_audio
+
+Usam o backend "teste" (sem rede) e WAVs gerados na hora.
+"""
+
+import math
+import struct
+import wave
+
+import pytest
+
+pytest.importorskip("speech_recognition")
+np = pytest.importorskip("numpy")
+
+import speech_recognition as sr  # noqa: E402
+
+import transcribe_audio  # noqa: E402
+from eventos import Eventos  # noqa: E402
+from transcribe_audio import _amostras_np, _segmentar_por_pausas  # noqa: E402
+
+TAXA = 16000
+
+
+def _pcm(segundos: float, largura: int) -> bytes:
+    """Rajadas de tom de 1 s separadas por 0,5 s de silêncio"""
+    maximo = (1 << (8 * largura - 1)) - 1
+    amostras = []
+    for i in range(int(TAXA * segundos)):
+        t = i / TAXA
+        valor = 0.5 * math.sin(2 * math.pi * 440 * t) if t % 1.5 < 1.0 else 0.0
+        amostras.append(int(valor * maximo))
+    if largura == 3:
+        return b"".join(struct.pack("<i", a)[:3] for a in amostras)
+    return struct.pack(f"<{len(amostras)}h", *amostras)
+
+
+def _gravar_wav(caminho, pcm: bytes, largura: int, canais: int = 1):
+    with wave.open(str(caminho), "wb") as w:
+        w.setnchannels(canais)
+        w.setsampwidth(largura)
+        w.setframerate(TAXA)
+        w.writeframes(pcm)
+
+
+def _transcrever(caminho):
+    return transcribe_audio._transcrever(str(caminho), "teste", None, 1, None, Eventos())
+
+
+def test_amostras_24_bits_com_sinal():
+    raw = b"".join(struct.pack("<i", v)[:3] for v in (0, 1, -1, (1 << 23) - 1, -(1 << 23)))
+    amostras = _amostras_np(raw, 3)
+    esperado = np.array([0, 1, -1, (1 << 23) - 1, -(1 << 23)], dtype=np.float32) / (1 << 23)
+    assert amostras.dtype == np.float32
+    np.testing.assert_allclose(amostras, esperado)
+
+
+def test_wav_24_bits_longo_e_transcrito(tmp_path):
+    caminho = tmp_path / "longo_24bits.wav"
+    duracao = transcribe_audio.DURACAO_CHUNK * 2 + 5
+    _gravar_wav(caminho, _pcm(duracao, 3), 3)
+    resultado = _transcrever(caminho)
+    assert resultado["completo"]
+    assert resultado["segundos"] == pytest.approx(duracao)
+    assert resultado["segmentos"][-1][1] == pytest.approx(duracao)
+
+
+def test_segmentos_de_24_bits_cobrem_o_audio_sem_cortar_amostras(tmp_path):
+    pcm = _pcm(transcribe_audio.DURACAO_CHUNK * 2 + 5, 3)
+    caminho = tmp_path / "a.wav"
+    _gravar_wav(caminho, pcm, 3)
+    blocos = transcribe_audio._abrir_audio(str(caminho), transcribe_audio.BLOCO_LEITURA)
+    segmentos = [s.get_raw_data() for s in _segmentar_por_pausas(blocos)]
+    assert len(segmentos) > 1
+    assert all(len(s) % 3 == 0 for s in segmentos)
+    assert b"".join(segmentos) == pcm
+
+
+def test_largura_sem_numpy_corta_em_janelas_fixas():
+    largura = 5
+    maximo = int(TAXA * transcribe_audio.DURACAO_CHUNK) * largura
+    dados = bytes(range(256)) * (maximo * 2 // 256 + 1)
+
+    def blocos():
+        for i in range(0, len(dados), 64000):
+            yield sr.AudioData(dados[i:i + 64000], TAXA, largura)
+
+    segmentos = [s.get_raw_data() for s in _segmentar_por_pausas(blocos())]
+    assert [len(s) for s in segmentos[:-1]] == [maximo] * (len(segmentos) - 1)
+    assert b"".join(segmentos) == dados
+
+
+def _intercalar(*canais: bytes, largura: int = 2) -> bytes:
+    quadros = zip(*(
+        [c[i:i + largura] for i in range(0, len(c), largura)] for c in canais))
+    return b"".join(b"".join(q) for q in quadros)
+
+
+@pytest.mark.parametrize("largura", [2, 3])
+def test_wav_estereo_sem_ffmpeg_e_transcrito(tmp_path, monkeypatch, largura):
+    monkeypatch.setattr(transcribe_audio, "_achar_ffmpeg", lambda: None)
+    caminho = tmp_path / "estereo.wav"
+    pcm = _pcm(20, largura)
+    _gravar_wav(caminho, _intercalar(pcm, pcm, largura=largura), largura, canais=2)
+    resultado = _transcrever(caminho)
+    assert resultado["completo"]
+    assert resultado["segundos"] == pytest.approx(20)
+    assert resultado["texto"]
+
+
+def test_mistura_dos_canais_em_mono():
+    esquerdo = struct.pack("<4h", 1000, -2000, 30000, 0)
+    direito = struct.pack("<4h", 3000, 2000, 30000, -32768)
+    raw, largura = transcribe_audio._para_mono(_intercalar(esquerdo, direito), 2, 2)
+    assert largura == 2
+    assert struct.unpack("<4h", raw) == (2000, 0, 30000, -16384)
+
+
+def test_mistura_sem_numpy_usa_audioop(monkeypatch):
+    if transcribe_audio.audioop is None:
+        pytest.skip("audioop indisponível nesta versão do Python")
+    monkeypatch.setattr(transcribe_audio, "np", None)
+    esquerdo = struct.pack("<2h", 1000, -2000)
+    direito = struct.pack("<2h", 3000, 2000)
+    assert transcribe_audio._mistura_possivel(2)
+    assert not transcribe_audio._mistura_possivel(6)
+    raw, largura = transcribe_audio._para_mono(_intercalar(esquerdo, direito), 2, 2)
+    assert (struct.unpack("<2h", raw), largura) == ((2000, 0), 2)
@@ -2,9 +2,36 @@ import os
 import shutil
 import sys
 import subprocess
-import tempfile
+import time
+import wave
+import contextlib
+import functools
+import io
+import threading
+import json
+import math
+import operator
+import warnings
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 import speech_recognition as sr
-from pydub import AudioSegment
+
+try:
+    import numpy as np
+except ImportError:  # sem NumPy: chunks de tamanho fixo e RMS em Python puro
+    np = None
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop
+except ImportError:  # Python 3.13+: sem NumPy, WAV estéreo passa pelo ffmpeg
+    audioop = None
+
+from cache_metadados import CAMINHO_PADRAO as CACHE_PADRAO, CacheMetadados
+from eventos import ColetorEventos, Eventos, criar_eventos
+from varredura import varrer
 
 FORMATOS_AUDIO = {".mp3", ".wav", ".m4a", ".mp4", ".ogg", ".flac"}
 
@@ -18,9 +45,44 @@ _CAMINHOS_FFMPEG_WIN = [
 ]
 
 # Duração máxima por chunk para o Google (segundos); áudios longos são divididos
+# nas pausas (com NumPy) ou em fatias fixas deste tamanho (sem NumPy)
 DURACAO_CHUNK = 50
 
+# Segmentação por pausas: tamanho dos quadros de energia, pausa mínima,
+# segmento mínimo antes de aceitar um corte e bloco lido do decodificador
+QUADRO_SEGUNDOS = 0.03
+PAUSA_MIN = 0.3
+SEGMENTO_MIN = 5
+BLOCO_LEITURA = 5
+
+# Energia RMS (fração do fundo de escala) abaixo da qual o chunk é silêncio
+# (0.01 ≈ -40 dBFS): esses chunks nem são enviados ao reconhecedor
+LIMIAR_SILENCIO = 0.01
+
+# Chunks com fala usados para decidir o idioma do arquivo
+TENTATIVAS_IDIOMA = 3
+
+# Transcrições retomáveis: sidecars ao lado do áudio (ou em --saida) e
+# manifesto dos arquivos concluídos na pasta
+SUFIXO_TXT = ".transcricao.txt"
+SUFIXO_JSON = ".transcricao.json"
+SUFIXO_PARCIAL = ".transcricao.parcial.jsonl"
+NOME_MANIFESTO = ".transcricao_manifesto.jsonl"
+
+# Tempo que o ffmpeg pode levar para entregar o áudio: uma folga fixa mais
+# uma fração da duração (0.5 = decodificar a pelo menos 2x o tempo real).
+# Só conta o tempo esperando o ffmpeg, não o gasto no reconhecimento.
+TEMPO_MIN_FFMPEG = 30
+FATOR_TEMPO_FFMPEG = 0.5
+# Bytes do stderr do ffmpeg guardados para a mensagem de erro
+LIMITE_ERRO_FFMPEG = 4096
 
+# Formato do PCM entregue pelo ffmpeg ao reconhecedor (16 kHz, mono, 16 bits)
+TAXA_AMOSTRAGEM = 16000
+LARGURA_AMOSTRA = 2
+
+
+@functools.lru_cache(maxsize=None)
 def _achar_ffmpeg():
     """Retorna o caminho do executável ffmpeg ou None se não encontrar."""
     exe = shutil.which("ffmpeg")
@@ -33,6 +95,71 @@ def _achar_ffmpeg():
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def _achar_ffprobe():
+    """ffprobe que acompanha o ffmpeg encontrado (ou None)."""
+    ffmpeg_exe = _achar_ffmpeg()
+    if not ffmpeg_exe:
+        return None
+    pasta, nome = os.path.split(ffmpeg_exe)
+    candidato = os.path.join(pasta, nome.replace("ffmpeg", "ffprobe"))
+    return candidato if os.path.isfile(candidato) else shutil.which("ffprobe")
+
+
+def _kwargs_subprocesso():
+    kw = {"stdout": subprocess.PIPE, "stderr": subprocess.PIPE}
+    if sys.platform == "win32":
+        kw["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+    return kw
+
+
+def _sondar(file_path):
+    """
+    Descobre uma vez como decodificar o arquivo.
+
+    Retorna um dicionário com wav_pcm (lido direto, sem ffmpeg), audio
+    (False se o arquivo não tem faixa de áudio) e duracao em segundos
+    (None se desconhecida). O resultado fica em memória enquanto o arquivo
+    não muda.
+    """
+    stat = os.stat(file_path)
+    return _sondar_em_cache(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=256)
+def _sondar_em_cache(caminho, tamanho, mtime_ns):
+    # tamanho e mtime_ns só entram na chave do cache
+    sondagem = {"wav_pcm": False, "audio": True, "duracao": None}
+    if caminho.lower().endswith(".wav"):
+        try:
+            with wave.open(caminho, "rb") as w:
+                sondagem["duracao"] = w.getnframes() / w.getframerate()
+                sondagem["wav_pcm"] = _mistura_possivel(w.getnchannels())
+            return sondagem
+        except (wave.Error, EOFError):
+            pass  # WAV comprimido/float: o ffprobe resolve
+
+    ffprobe_exe = _achar_ffprobe()
+    if not ffprobe_exe:
+        return sondagem  # sem ffprobe: o ffmpeg tenta do mesmo jeito
+    cmd = [
+        ffprobe_exe, "-v", "error", "-of", "json",
+        "-show_entries", "format=duration:stream=codec_type", caminho,
+    ]
+    try:
+        saida = subprocess.run(cmd, timeout=TEMPO_MIN_FFMPEG, **_kwargs_subprocesso()).stdout
+        info = json.loads(saida or b"{}")
+    except (OSError, subprocess.TimeoutExpired, ValueError):
+        return sondagem
+    if "streams" in info:
+        sondagem["audio"] = any(st.get("codec_type") == "audio" for st in info["streams"])
+    try:
+        sondagem["duracao"] = float(info["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return sondagem
+
+
 def _instrucoes_ffmpeg():
     print()
     print("  O ffmpeg não foi encontrado. Ele é necessário para converter este arquivo.")
@@ -42,155 +169,875 @@ def _instrucoes_ffmpeg():
     print()
 
 
-def _mp4_para_wav_ffmpeg(arquivo_entrada, arquivo_wav_saida):
-    """Converte MP4/M4A para WAV usando ffmpeg (fallback quando pydub falha)."""
+def _mistura_possivel(canais):
+    """Se um WAV PCM com `canais` canais pode ser lido sem ffmpeg."""
+    return canais == 1 or np is not None or (canais == 2 and audioop is not None)
+
+
+def _para_mono(raw, largura, canais):
+    """
+    Mistura os canais de PCM intercalado num só.
+
+    Retorna (raw, largura): com NumPy a mistura sai em 16 bits; com
+    audioop (só estéreo) mantém a largura original.
+    """
+    if canais == 1:
+        return raw, largura
+    if np is not None:
+        amostras = _amostras_np(raw, largura).reshape(-1, canais).mean(axis=1)
+        mono = np.clip(amostras * 32768.0, -32768, 32767).astype("<i2")
+        return mono.tobytes(), 2
+    return audioop.tomono(raw, largura, 0.5, 0.5), largura
+
+
+def _blocos_wav(file_path, duracao, inicio=0.0):
+    """Lê um WAV PCM em blocos de `duracao` segundos, misturando os canais em mono."""
+    with wave.open(file_path, "rb") as w:
+        taxa, largura, canais = w.getframerate(), w.getsampwidth(), w.getnchannels()
+        quadros = int(taxa * duracao)
+        if inicio > 0:
+            w.setpos(min(int(taxa * inicio), w.getnframes()))
+        while True:
+            raw = w.readframes(quadros)
+            if not raw:
+                break
+            raw_mono, largura_mono = _para_mono(raw, largura, canais)
+            yield sr.AudioData(raw_mono, taxa, largura_mono)
+
+
+def _blocos_ffmpeg(processo, duracao, duracao_total=None):
+    """
+    Lê o PCM que o ffmpeg escreve no stdout em blocos de `duracao` segundos.
+
+    O ffmpeg é encerrado se o tempo total esperando por ele passar de
+    TEMPO_MIN_FFMPEG + FATOR_TEMPO_FFMPEG * duração (a do arquivo ou, se
+    desconhecida, a já entregue), então vídeos longos não estouram um
+    limite fixo e um ffmpeg travado não prende a transcrição. O stderr é
+    drenado numa thread (guardando só o começo, para a mensagem de erro),
+    senão um ffmpeg falante enche o pipe e para de escrever no stdout.
+    """
+    tamanho = int(TAXA_AMOSTRAGEM * duracao) * LARGURA_AMOSTRA
+    lidos = 0
+    esperado = 0.0
+    estourou = threading.Event()
+
+    erro = bytearray()
+
+    def encerrar():
+        estourou.set()
+        processo.kill()
+
+    def drenar_erro():
+        for bloco in iter(lambda: processo.stderr.read(4096), b""):
+            if len(erro) < LIMITE_ERRO_FFMPEG:
+                erro.extend(bloco[:LIMITE_ERRO_FFMPEG - len(erro)])
+
+    leitor_erro = threading.Thread(target=drenar_erro, daemon=True)
+    leitor_erro.start()
+    try:
+        while True:
+            segundos_lidos = lidos / (TAXA_AMOSTRAGEM * LARGURA_AMOSTRA)
+            limite = TEMPO_MIN_FFMPEG + FATOR_TEMPO_FFMPEG * max(duracao_total or 0.0,
+                                                                 segundos_lidos + duracao)
+            vigia = threading.Timer(max(0.0, limite - esperado), encerrar)
+            vigia.daemon = True
+            inicio = time.perf_counter()
+            vigia.start()
+            try:
+                raw = processo.stdout.read(tamanho)
+            finally:
+                vigia.cancel()
+            esperado += time.perf_counter() - inicio
+            if estourou.is_set():
+                raise RuntimeError(f"FFmpeg: tempo esgotado após {esperado:.0f}s de decodificação")
+            if not raw:
+                break
+            lidos += len(raw)
+            yield sr.AudioData(raw, TAXA_AMOSTRAGEM, LARGURA_AMOSTRA)
+        codigo = processo.wait()
+        leitor_erro.join()
+        if codigo != 0 and lidos == 0:
+            raise RuntimeError("FFmpeg: " + erro.decode("utf-8", errors="replace")[:500])
+    finally:
+        # Encerra o ffmpeg se a leitura foi interrompida no meio
+        if processo.poll() is None:
+            processo.kill()
+            processo.wait()
+        leitor_erro.join()
+        processo.stdout.close()
+        processo.stderr.close()
+
+
+def _abrir_audio(file_path, duracao=DURACAO_CHUNK, inicio=0.0):
+    """
+    Decodifica o áudio em memória, sem gravar WAV intermediário.
+
+    O arquivo é sondado uma vez (_sondar) para escolher o decodificador:
+    WAV PCM é lido direto (os canais misturados em mono, como fazia o
+    sr.AudioFile); os demais formatos passam pelo ffmpeg, que
+    entrega PCM 16 kHz mono pelo stdout. Em ambos os casos só um bloco de
+    `duracao` segundos fica em memória por vez, então funciona também em
+    pastas somente leitura. `inicio` (segundos) pula o começo do áudio,
+    para retomar uma transcrição interrompida.
+
+    Retorna um gerador de sr.AudioData, ou None se não for possível decodificar.
+    """
+    file_ext = os.path.splitext(file_path)[1].lower()
+    if file_ext not in FORMATOS_AUDIO:
+        print(f"Formato de arquivo não suportado: {file_ext}")
+        return None
+
     ffmpeg_exe = _achar_ffmpeg()
+    sondagem = _sondar(file_path)
+    if sondagem["wav_pcm"]:
+        return _blocos_wav(file_path, duracao, inicio)
     if not ffmpeg_exe:
         _instrucoes_ffmpeg()
-        return False
+        return None
+    if not sondagem["audio"]:
+        print("O arquivo não tem faixa de áudio.")
+        return None
+    posicao = ["-ss", f"{inicio:.3f}"] if inicio > 0 else []
+    cmd = [
+        ffmpeg_exe, "-nostdin", "-loglevel", "error", *posicao, "-i", os.path.abspath(file_path),
+        "-vn", "-f", "s16le", "-acodec", "pcm_s16le",
+        "-ar", str(TAXA_AMOSTRAGEM), "-ac", "1", "pipe:1",
+    ]
     try:
-        cmd = [
-            ffmpeg_exe, "-y", "-i", os.path.abspath(arquivo_entrada),
-            "-vn", "-acodec", "pcm_s16le", "-ar", "16000", "-ac", "1",
-            os.path.abspath(arquivo_wav_saida)
-        ]
-        kw = {"capture_output": True, "timeout": 120}
-        if sys.platform == "win32":
-            kw["creationflags"] = getattr(subprocess, "CREATE_NO_WINDOW", 0)
-        r = subprocess.run(cmd, **kw)
-        if r.returncode != 0 or not os.path.isfile(arquivo_wav_saida):
-            if r.stderr:
-                print("  FFmpeg:", r.stderr.decode("utf-8", errors="replace")[:500])
-            if not os.path.isfile(arquivo_wav_saida):
-                _instrucoes_ffmpeg()
-            return False
-        return True
-    except (FileNotFoundError, subprocess.TimeoutExpired):
+        processo = subprocess.Popen(cmd, **_kwargs_subprocesso())
+    except OSError:
         _instrucoes_ffmpeg()
-        return False
+        return None
+    restante = sondagem["duracao"] - inicio if sondagem["duracao"] is not None else None
+    return _blocos_ffmpeg(processo, duracao, restante)
 
 
-def transcribe_audio(file_path):
-    # Verificar se o arquivo existe
-    if not os.path.isfile(file_path):
-        print(f"Arquivo não encontrado: {file_path}")
-        return False
+class BackendReconhecimento:
+    """
+    Interface de um mecanismo de reconhecimento de fala.
 
-    # Extrair a extensão do arquivo
-    file_ext = os.path.splitext(file_path)[1].lower()
+    reconhecer() recebe um sr.AudioData e devolve o texto; deve levantar
+    sr.UnknownValueError quando não há fala reconhecível e sr.RequestError
+    quando o serviço/modelo falha. Modelos pesados devem ser carregados no
+    __init__, que roda uma única vez por processo (ver _obter_backend).
+    """
 
-    # Carregar o arquivo de áudio e converter para WAV se necessário
-    wav_criado_por_nos = False  # para apagar no final só se nós criarmos
-    if file_ext in ['.mp3', '.mp4', '.m4a']:
-        wav_path = os.path.splitext(file_path)[0] + '.wav'
-        if file_ext == '.mp3':
-            try:
-                audio = AudioSegment.from_mp3(file_path)
-                audio.export(wav_path, format='wav')
-                wav_criado_por_nos = True
-            except Exception:
-                print("Erro ao converter MP3 com pydub.")
-                return False
-        elif file_ext in ('.mp4', '.m4a'):
-            try:
-                audio = AudioSegment.from_file(file_path, format='mp4')
-                audio.export(wav_path, format='wav')
-                wav_criado_por_nos = True
-            except (IndexError, Exception):
-                # Alguns MP4 (vídeo) quebram o pydub; usar ffmpeg
-                print("Convertendo para WAV com ffmpeg...")
-                fd, wav_path = tempfile.mkstemp(suffix='.wav')
-                os.close(fd)
-                if not _mp4_para_wav_ffmpeg(file_path, wav_path):
-                    if os.path.isfile(wav_path):
-                        try:
-                            os.remove(wav_path)
-                        except OSError:
-                            pass
-                    print("Não foi possível converter o arquivo.")
-                    return False
-                wav_criado_por_nos = True
-        else:
-            try:
-                audio = AudioSegment.from_file(file_path)
-                audio.export(wav_path, format='wav')
-                wav_criado_por_nos = True
-            except Exception:
-                print("Erro ao converter o arquivo com pydub.")
-                return False
-    elif file_ext == '.wav':
-        wav_path = file_path
-    else:
-        print(f"Formato de arquivo não suportado: {file_ext}")
-        return False
+    nome = ""
+    requer_internet = False
+    # Idiomas tentados em sequência quando não há fala reconhecida
+    idiomas = (None,)
+
+    def __init__(self, modelo=None):
+        self.modelo = modelo
+
+    def reconhecer(self, audio, idioma=None):
+        raise NotImplementedError
+
+
+class BackendGoogle(BackendReconhecimento):
+    """Google Web Speech (online, com limite de requisições)."""
+
+    nome = "google"
+    requer_internet = True
+    idiomas = ("pt-BR", "en-US")
+
+    def __init__(self, modelo=None):
+        super().__init__(modelo)
+        self.recognizer = sr.Recognizer()
+
+    def reconhecer(self, audio, idioma=None):
+        return self.recognizer.recognize_google(audio, language=idioma)
+
+
+class BackendVosk(BackendReconhecimento):
+    """
+    Vosk/Kaldi local (offline). O idioma é o do modelo baixado.
+
+    O modelo vem de `modelo` ou da variável de ambiente VOSK_MODELO
+    (ex.: pasta descompactada de vosk-model-small-pt-0.3).
+    """
+
+    nome = "vosk"
+
+    def __init__(self, modelo=None):
+        super().__init__(modelo or os.environ.get("VOSK_MODELO"))
+        try:
+            import vosk
+        except ImportError:
+            raise sr.RequestError("pacote 'vosk' não instalado (pip install vosk)")
+        if not self.modelo or not os.path.isdir(self.modelo):
+            raise sr.RequestError("modelo Vosk não encontrado; use --modelo ou VOSK_MODELO")
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._modelo_carregado = vosk.Model(self.modelo)
+
+    def reconhecer(self, audio, idioma=None):
+        raw = audio.get_raw_data(convert_rate=TAXA_AMOSTRAGEM, convert_width=LARGURA_AMOSTRA)
+        rec = self._vosk.KaldiRecognizer(self._modelo_carregado, TAXA_AMOSTRAGEM)
+        rec.AcceptWaveform(raw)
+        texto = json.loads(rec.FinalResult()).get("text", "")
+        if not texto.strip():
+            raise sr.UnknownValueError()
+        return texto
 
-    # Inicializar o reconhecedor e transcrever
-    recognizer = sr.Recognizer()
-    print("Transcrevendo áudio (requer internet)...")
 
+class BackendTeste(BackendReconhecimento):
+    """
+    Motor falso e determinístico, para testes e benchmarks sem rede.
+
+    Devolve a duração do trecho; trechos totalmente silenciosos contam
+    como "sem fala".
+    """
+
+    nome = "teste"
+
+    def reconhecer(self, audio, idioma=None):
+        raw = audio.get_raw_data()
+        if not raw.strip(b"\x00"):
+            raise sr.UnknownValueError()
+        segundos = len(raw) / (audio.sample_rate * audio.sample_width)
+        return f"[{segundos:.1f}s de fala]"
+
+
+BACKENDS = {
+    BackendGoogle.nome: BackendGoogle,
+    BackendVosk.nome: BackendVosk,
+    BackendTeste.nome: BackendTeste,
+}
+
+# Instâncias já carregadas neste processo, por (nome, modelo)
+_backends_carregados = {}
+
+
+def _obter_backend(nome="google", modelo=None):
+    """Devolve o backend do processo atual, carregando o modelo só na primeira vez."""
+    chave = (nome, modelo)
+    if chave not in _backends_carregados:
+        _backends_carregados[chave] = BACKENDS[nome](modelo)
+    return _backends_carregados[chave]
+
+
+def _iniciar_worker(nome, modelo):
+    """Inicializador do pool de processos: carrega o modelo uma vez por worker."""
+    try:
+        _obter_backend(nome, modelo)
+    except sr.RequestError:
+        pass  # o erro aparece (por arquivo) na primeira transcrição
+
+
+def _campo_cache(nome_backend):
+    """Campo do cache de transcrição; cada backend tem o seu."""
+    return f"transcricao_{nome_backend}"
+
+
+def _campo_segmentos(nome_backend):
+    """Campo do cache com os segmentos (inicio, fim, texto) da transcrição."""
+    return f"segmentos_{nome_backend}"
+
+
+def _caminho_saida(file_path, pasta_saida, sufixo):
+    """Caminho de um arquivo auxiliar (sidecar) do áudio."""
+    pasta = pasta_saida or os.path.dirname(os.path.abspath(file_path))
+    return os.path.join(pasta, os.path.basename(file_path) + sufixo)
+
+
+def _ler_checkpoint(caminho):
+    """Segmentos [inicio, fim, texto] já concluídos de uma transcrição interrompida."""
+    segmentos = []
     try:
-        with sr.AudioFile(wav_path) as source:
-            recognizer.adjust_for_ambient_noise(source, duration=0.5)
-            textos = []
-            while True:
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
                 try:
-                    chunk = recognizer.record(source, duration=DURACAO_CHUNK)
-                except OSError:
-                    break
-                raw = chunk.get_raw_data()
-                if not raw or len(raw) == 0:
-                    break
-                t = None
-                for lang in ("pt-BR", "en-US"):
-                    try:
-                        t = recognizer.recognize_google(chunk, language=lang)
-                        break
-                    except sr.UnknownValueError:
-                        continue
-                    except sr.RequestError as e:
-                        print(f"Erro na requisição ao serviço de reconhecimento: {e}")
-                        break
-                if t and t.strip():
-                    textos.append(t)
+                    segmentos.append(json.loads(linha))
+                except ValueError:
+                    break  # última linha cortada pela interrupção
+    except FileNotFoundError:
+        pass
+    return segmentos
 
-        print()
-        print("Transcrição:")
-        if textos:
-            print(" ".join(textos))
-        else:
-            print("(Nenhuma fala detectada. O áudio pode ser só música ou o reconhecimento não conseguiu entender.)")
+
+def _gravar_atomico(caminho, conteudo):
+    """Grava o arquivo inteiro de uma vez (nunca deixa um sidecar pela metade)."""
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        f.write(conteudo)
+    os.replace(temporario, caminho)
+
+
+def _gravar_sidecars(file_path, pasta_saida, resultado, backend):
+    """Grava <arquivo>.transcricao.txt/.json e remove o checkpoint parcial."""
+    dados = {
+        "arquivo": os.path.basename(file_path),
+        "backend": backend,
+        "duracao": round(resultado["segundos"], 3),
+        "segmentos": [
+            {"inicio": round(ini, 3), "fim": round(fim, 3), "texto": texto}
+            for ini, fim, texto in resultado["segmentos"] if texto
+        ],
+        "texto": resultado["texto"],
+    }
+    _gravar_atomico(_caminho_saida(file_path, pasta_saida, SUFIXO_JSON),
+                    json.dumps(dados, ensure_ascii=False, indent=2))
+    _gravar_atomico(_caminho_saida(file_path, pasta_saida, SUFIXO_TXT), resultado["texto"] + "\n")
+    try:
+        os.remove(_caminho_saida(file_path, pasta_saida, SUFIXO_PARCIAL))
+    except OSError:
+        pass
+
+
+class ManifestoTranscricao:
+    """
+    Registro dos arquivos já transcritos de uma pasta.
+
+    Arquivo JSONL só de acréscimo (uma linha por arquivo concluído, com
+    tamanho e mtime), para que uma nova execução pule o que já foi feito.
+    Um arquivo alterado depois da transcrição é transcrito de novo.
+    """
+
+    def __init__(self, pasta_saida):
+        self.caminho = os.path.join(pasta_saida, NOME_MANIFESTO)
+        self.concluidos = {}
+        for registro in _ler_checkpoint(self.caminho):
+            self.concluidos[registro["arquivo"]] = (registro["tamanho"], registro["mtime_ns"])
+
+    def concluido(self, entrada):
+        stat = entrada.stat
+        return self.concluidos.get(entrada.nome) == (stat.st_size, stat.st_mtime_ns)
+
+    def registrar(self, entrada):
+        stat = entrada.stat
+        registro = {"arquivo": entrada.nome, "tamanho": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.concluidos[entrada.nome] = (stat.st_size, stat.st_mtime_ns)
+
+
+def _resultado(ok, texto=None, segundos=0.0, completo=False, segmentos=()):
+    """Resultado da transcrição de um arquivo (picklável, para o pool de processos)."""
+    return {"ok": ok, "texto": texto, "segundos": segundos, "completo": completo,
+            "segmentos": list(segmentos)}
+
+
+def _resultado_do_cache(cache, stat, backend):
+    """Resultado completo montado do cache, ou None se o arquivo não estiver lá."""
+    texto = cache.obter(stat, _campo_cache(backend))
+    if texto is None:
+        return None
+    segundos = cache.obter(stat, "duracao") or 0.0
+    segmentos = cache.obter(stat, _campo_segmentos(backend))
+    if segmentos is None:
+        # Gravado antes de os segmentos irem para o cache: um só, o áudio todo
+        segmentos = [(0.0, segundos, texto)] if texto else []
+    return _resultado(True, texto, segundos, completo=True, segmentos=segmentos)
+
+
+def _mostrar_transcricao(texto, do_cache=False):
+    print()
+    print("Transcrição (cache):" if do_cache else "Transcrição:")
+    if texto:
+        print(texto)
+    else:
+        print("(Nenhuma fala detectada. O áudio pode ser só música ou o reconhecimento não conseguiu entender.)")
+
+
+_TIPOS_NUMPY = {1: "u1", 2: "<i2", 4: "<i4"}
+# Larguras de amostra que _amostras_np sabe ler (24 bits sem dtype próprio)
+_LARGURAS_NUMPY = (1, 2, 3, 4)
+
+
+def _amostras_np(raw, largura):
+    """PCM bruto como array float32 em -1..1 (NumPy)."""
+    if largura == 3:
+        # 24 bits: cada amostra vai para os 3 bytes altos de um int32, e o
+        # deslocamento aritmético de volta estende o sinal
+        trios = np.frombuffer(raw, dtype="u1", count=len(raw) // 3 * 3).reshape(-1, 3)
+        quartetos = np.zeros((len(trios), 4), dtype="u1")
+        quartetos[:, 1:] = trios
+        amostras = (quartetos.view("<i4").ravel() >> 8).astype(np.float32)
+        return amostras / float(1 << 23)
+    amostras = np.frombuffer(raw, dtype=_TIPOS_NUMPY[largura], count=len(raw) // largura)
+    amostras = amostras.astype(np.float32)
+    if largura == 1:
+        amostras -= 128.0  # WAV 8 bits é sem sinal
+    return amostras / float(1 << (8 * largura - 1))
+
+
+def _energias_quadros(amostras, taxa):
+    """RMS de cada quadro de QUADRO_SEGUNDOS, calculado de uma vez (vetorizado)."""
+    tamanho = max(1, int(taxa * QUADRO_SEGUNDOS))
+    n = len(amostras) // tamanho
+    quadros = amostras[:n * tamanho].reshape(n, tamanho)
+    return np.sqrt(np.mean(quadros * quadros, axis=1))
+
+
+def _ponto_de_corte(amostras, taxa):
+    """
+    Escolhe onde cortar uma janela de até DURACAO_CHUNK segundos.
+
+    Procura a última pausa (quadros abaixo do limiar por pelo menos
+    PAUSA_MIN segundos) depois de SEGMENTO_MIN segundos e corta no meio
+    dela. O limiar se adapta ao ruído de fundo da própria janela. Sem
+    pausa, corta no quadro mais silencioso.
+
+    Retorna o índice da amostra de corte.
+    """
+    energias = _energias_quadros(amostras, taxa)
+    tamanho = max(1, int(taxa * QUADRO_SEGUNDOS))
+    inicio = int(SEGMENTO_MIN / QUADRO_SEGUNDOS)
+    if len(energias) <= inicio + 1:
+        return len(amostras)
+    limiar = max(LIMIAR_SILENCIO, 2.0 * float(np.percentile(energias, 10)))
+    silencio = np.concatenate(([False], energias[inicio:] < limiar, [False]))
+    bordas = np.flatnonzero(np.diff(silencio.astype(np.int8)))
+    comecos, fins = bordas[0::2], bordas[1::2]
+    pausas = np.flatnonzero(fins - comecos >= int(PAUSA_MIN / QUADRO_SEGUNDOS))
+    if len(pausas):
+        k = pausas[-1]
+        quadro = inicio + (comecos[k] + fins[k]) // 2
+    else:
+        quadro = inicio + int(np.argmin(energias[inicio:]))
+    return max(1, quadro) * tamanho
+
+
+def _segmentar_por_pausas(blocos):
+    """
+    Reagrupa blocos curtos de PCM em segmentos que terminam em pausas.
+
+    Os segmentos têm no máximo DURACAO_CHUNK segundos, então a memória
+    continua limitada a uma janela, e as palavras não são cortadas ao meio.
+    """
+    pendente = bytearray()
+    taxa = largura = None
+    try:
+        for bloco in blocos:
+            taxa, largura = bloco.sample_rate, bloco.sample_width
+            pendente += bloco.get_raw_data()
+            maximo = int(taxa * DURACAO_CHUNK) * largura
+            while len(pendente) >= maximo:
+                if largura in _LARGURAS_NUMPY:
+                    amostras = _amostras_np(bytes(pendente[:maximo]), largura)
+                    corte = _ponto_de_corte(amostras, taxa) * largura
+                else:
+                    corte = maximo  # formato incomum: corta em janelas fixas
+                yield sr.AudioData(bytes(pendente[:corte]), taxa, largura)
+                del pendente[:corte]
+        if pendente:
+            yield sr.AudioData(bytes(pendente), taxa, largura)
+    finally:
+        blocos.close()
+
+
+def _energia_rms(chunk):
+    """Energia RMS do chunk, normalizada para 0..1 (1 = fundo de escala)."""
+    raw = chunk.get_raw_data()
+    largura = chunk.sample_width
+    if np is not None and largura in _LARGURAS_NUMPY and len(raw) >= largura:
+        amostras = _amostras_np(raw, largura)
+        return float(np.sqrt(np.mean(amostras * amostras)))
+    codigos = {1: "B", 2: "h", 4: "i"}
+    if largura not in codigos or len(raw) < largura:
+        return 1.0  # formato incomum: não arrisca descartar
+    amostras = array(codigos[largura])
+    amostras.frombytes(raw[:len(raw) - len(raw) % largura])
+    if largura == 1:
+        amostras = array("h", (a - 128 for a in amostras))  # WAV 8 bits é sem sinal
+    soma = sum(map(operator.mul, amostras, amostras))
+    return math.sqrt(soma / len(amostras)) / (1 << (8 * largura - 1))
+
+
+def _reconhecer_chunk(motor, chunk, idiomas, eventos):
+    """
+    Reconhece um chunk tentando os idiomas na ordem.
+
+    Retorna (texto ou None, completo, idioma reconhecido, chamadas feitas),
+    com completo=False em falha de rede.
+    """
+    chamadas = 0
+    for lang in idiomas:
+        chamadas += 1
+        try:
+            with eventos.medir("recognize"):
+                texto = motor.reconhecer(chunk, lang)
+            return texto, True, lang, chamadas
+        except sr.UnknownValueError:
+            continue
+        except sr.RequestError as e:
+            print(f"Erro na requisição ao serviço de reconhecimento: {e}")
+            return None, False, None, chamadas
+    return None, True, None, chamadas
+
+
+def _transcrever(file_path, backend="google", modelo=None, paralelo_chunks=1, checkpoint=None,
+                 eventos=None):
+    """
+    Decodifica e transcreve um arquivo, sem mostrar o texto.
+
+    Chunks sem energia de fala (abaixo de LIMIAR_SILENCIO) são pulados sem
+    chamar o reconhecedor. O idioma é decidido uma vez por arquivo, nos
+    primeiros chunks com fala, e depois só ele é usado.
+
+    Com paralelo_chunks > 1, os próximos chunks continuam sendo lidos e
+    enviados ao reconhecedor enquanto os anteriores estão em andamento (no
+    máximo paralelo_chunks ao mesmo tempo); os textos são remontados na
+    ordem original. Enquanto o idioma não é decidido, os chunks são
+    reconhecidos um a um.
+
+    Com checkpoint (caminho de um .jsonl), cada segmento concluído é
+    gravado ali na hora; se o arquivo já existir, a transcrição continua a
+    partir do fim do último segmento gravado.
+
+    Com eventos (ver eventos.py), cada chunk reconhecido e cada erro viram
+    eventos, e os tempos de decodificação e reconhecimento vão para os
+    histogramas das fases "decode" e "recognize".
+
+    Retorna um dicionário com ok, texto (None se o reconhecimento falhou),
+    segundos de áudio, completo (False se houve falha de rede/erro) e
+    segmentos ([inicio, fim, texto], em segundos).
+    """
+    if eventos is None:
+        eventos = Eventos()
+    try:
+        motor = _obter_backend(backend, modelo)
+    except sr.RequestError as e:
+        print(f"Backend '{backend}' indisponível: {e}")
+        eventos.emitir("erro", arquivo=file_path, mensagem=f"backend indisponível: {e}")
+        return _resultado(False)
+
+    segmentos = []
+    if checkpoint and os.path.exists(checkpoint):
+        # Checkpoint anterior a uma alteração do áudio não vale mais
+        if os.stat(checkpoint).st_mtime_ns >= os.stat(file_path).st_mtime_ns:
+            segmentos = _ler_checkpoint(checkpoint)
+    inicio = segmentos[-1][1] if segmentos else 0.0
+    if inicio > 0:
+        print(f"Retomando a partir de {inicio:.1f}s ({len(segmentos)} segmento(s) já prontos)")
+
+    if np is not None:
+        # Blocos curtos reagrupados em segmentos que terminam em pausas
+        blocos = _abrir_audio(file_path, BLOCO_LEITURA, inicio)
+        if blocos is not None:
+            blocos = _segmentar_por_pausas(blocos)
+    else:
+        blocos = _abrir_audio(file_path, DURACAO_CHUNK, inicio)
+    if blocos is None:
+        print("Não foi possível converter o arquivo.")
+        eventos.emitir("erro", arquivo=file_path, mensagem="não foi possível converter o arquivo")
+        return _resultado(False)
+
+    if motor.requer_internet:
+        print(f"Transcrevendo áudio com {motor.nome} (requer internet)...")
+    else:
+        print(f"Transcrevendo áudio com {motor.nome} (offline)...")
+
+    segundos = inicio
+    completo = True
+    texto = None
+    em_andamento = deque()
+    arquivo_checkpoint = None
+    if checkpoint:
+        # Regrava só as linhas válidas, descartando uma última linha cortada
+        arquivo_checkpoint = open(checkpoint, "w", encoding="utf-8")
+        arquivo_checkpoint.writelines(json.dumps(seg, ensure_ascii=False) + "\n" for seg in segmentos)
+        arquivo_checkpoint.flush()
+    # Idioma da fala: decidido nos primeiros chunks com fala, depois fixo
+    idiomas = tuple(motor.idiomas)
+    tentativas_idioma = 0
+    contagem = {"chunks": 0, "silenciosos": 0, "chamadas": 0}
+
+    def coletar(ini, fim, resultado):
+        nonlocal completo, idiomas, tentativas_idioma
+        t, ok, lang, chamadas = resultado
+        completo = completo and ok
+        eventos.emitir("chunk_reconhecido", arquivo=file_path, inicio=round(ini, 3),
+                       fim=round(fim, 3), ok=ok, caracteres=len(t.strip()) if t else 0)
+        if not ok:
+            eventos.emitir("erro", arquivo=file_path,
+                           mensagem=f"falha no reconhecimento do trecho {ini:.1f}-{fim:.1f}s")
+        # Depois de uma falha nada mais é gravado, para a retomada refazer
+        # a partir do trecho que falhou
+        if completo:
+            segmentos.append([ini, fim, t.strip() if t else ""])
+            if arquivo_checkpoint is not None:
+                arquivo_checkpoint.write(json.dumps(segmentos[-1], ensure_ascii=False) + "\n")
+                arquivo_checkpoint.flush()
+                os.fsync(arquivo_checkpoint.fileno())
+        contagem["chamadas"] += chamadas
+        if len(idiomas) > 1 and ok:
+            tentativas_idioma += 1
+            if lang is not None:
+                idiomas = (lang,)
+            elif tentativas_idioma >= TENTATIVAS_IDIOMA:
+                idiomas = idiomas[:1]
+
+    executor = ThreadPoolExecutor(max_workers=max(1, paralelo_chunks))
+    try:
+        while True:
+            with eventos.medir("decode"):
+                chunk = next(blocos, None)
+            if chunk is None:
+                break
+            raw = chunk.get_raw_data()
+            ini = segundos
+            segundos += len(raw) / (chunk.sample_rate * chunk.sample_width)
+            contagem["chunks"] += 1
+            if _energia_rms(chunk) < LIMIAR_SILENCIO:
+                contagem["silenciosos"] += 1
+                continue
+            if len(idiomas) > 1:
+                # Idioma ainda indefinido: reconhece em série para decidir
+                while em_andamento:
+                    coletar(*_resultado_em_voo(em_andamento.popleft()))
+                coletar(ini, segundos, _reconhecer_chunk(motor, chunk, idiomas, eventos))
+                continue
+            futuro = executor.submit(_reconhecer_chunk, motor, chunk, idiomas, eventos)
+            em_andamento.append((ini, segundos, futuro))
+            # Limite de chunks em voo: a memória fica em paralelo_chunks blocos
+            while len(em_andamento) >= max(1, paralelo_chunks):
+                coletar(*_resultado_em_voo(em_andamento.popleft()))
+        while em_andamento:
+            coletar(*_resultado_em_voo(em_andamento.popleft()))
+
+        texto = " ".join(t for _, _, t in segmentos if t)
+        print(f"Chunks: {contagem['chunks']} ({contagem['silenciosos']} em silêncio, pulados); "
+              f"chamadas ao reconhecedor: {contagem['chamadas']}")
     except Exception as e:
         print(f"Erro ao transcrever: {e}")
         import traceback
         traceback.print_exc()
+        eventos.emitir("erro", arquivo=file_path, mensagem=str(e))
+        completo = False
+    finally:
+        for _, _, futuro in em_andamento:
+            futuro.cancel()
+        executor.shutdown(wait=True)
+        blocos.close()
+        if arquivo_checkpoint is not None:
+            arquivo_checkpoint.close()
+
+    return _resultado(True, texto, segundos, completo, segmentos)
+
+
+def _resultado_em_voo(item):
+    """(inicio, fim, futuro) -> (inicio, fim, resultado), aguardando o futuro."""
+    ini, fim, futuro = item
+    return ini, fim, futuro.result()
+
+
+def transcribe_audio(file_path, cache=None, backend="google", modelo=None, paralelo_chunks=1,
+                     sidecar=False, pasta_saida=None, eventos=None):
+    """
+    Transcreve um arquivo de áudio e mostra o texto.
+
+    Com um CacheMetadados, arquivos que não mudaram desde a última
+    transcrição completa são mostrados direto do cache.
+
+    backend escolhe o motor de reconhecimento (ver BACKENDS) e modelo é o
+    caminho do modelo local, para backends offline. paralelo_chunks é o
+    número de chunks reconhecidos ao mesmo tempo.
+
+    Com sidecar=True o texto é gravado em <arquivo>.transcricao.txt/.json
+    (na pasta do áudio ou em pasta_saida) e o progresso fica num checkpoint,
+    para que uma transcrição interrompida continue de onde parou.
 
-    # Remover o arquivo WAV temporário, se tiver sido criado por nós
-    if wav_criado_por_nos and os.path.isfile(wav_path):
+    eventos recebe os eventos e tempos por fase (ver _transcrever).
+    """
+    # Verificar se o arquivo existe
+    if not os.path.isfile(file_path):
+        print(f"Arquivo não encontrado: {file_path}")
+        return False
+
+    if cache is not None:
+        stat_original = os.stat(file_path)
+        resultado = _resultado_do_cache(cache, stat_original, backend)
+        if resultado is not None:
+            _mostrar_transcricao(resultado["texto"], do_cache=True)
+            if sidecar:
+                _gravar_sidecars(file_path, pasta_saida, resultado, backend)
+            return True
+
+    checkpoint = _caminho_saida(file_path, pasta_saida, SUFIXO_PARCIAL) if sidecar else None
+    resultado = _transcrever(file_path, backend, modelo, paralelo_chunks, checkpoint, eventos)
+    _registrar_resultado(resultado, cache, stat_original if cache is not None else None, backend)
+    if sidecar and resultado["completo"]:
+        _gravar_sidecars(file_path, pasta_saida, resultado, backend)
+    return resultado["ok"]
+
+
+def _registrar_resultado(resultado, cache=None, stat_original=None, backend="google"):
+    """Mostra o texto e guarda no cache as transcrições sem falhas de rede."""
+    if resultado["texto"] is not None:
+        _mostrar_transcricao(resultado["texto"])
+    if cache is not None and resultado["completo"]:
+        cache.gravar(stat_original, _campo_cache(backend), resultado["texto"])
+        cache.gravar(stat_original, "duracao", resultado["segundos"])
+        cache.gravar(stat_original, _campo_segmentos(backend),
+                     [segmento for segmento in resultado["segmentos"] if segmento[2]])
+
+
+def _transcrever_isolado(caminho, backend, modelo, paralelo_chunks, checkpoint=None):
+    """
+    Executa _transcrever num processo do pool, capturando as mensagens.
+
+    Qualquer erro fica restrito a este arquivo e volta como resultado. Os
+    eventos e tempos por fase também voltam no resultado, para o processo
+    principal repassá-los às suas saídas.
+    """
+    saida = io.StringIO()
+    coletor = ColetorEventos()
+    eventos = Eventos(coletor)
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(saida), contextlib.redirect_stderr(saida):
         try:
-            os.remove(wav_path)
-        except OSError:
-            pass
-    return True
+            resultado = _transcrever(caminho, backend, modelo, paralelo_chunks, checkpoint, eventos)
+        except Exception as e:
+            print(f"Erro ao transcrever: {e}")
+            eventos.emitir("erro", arquivo=caminho, mensagem=str(e))
+            resultado = _resultado(False)
+    resultado["saida"] = saida.getvalue()
+    resultado["tempo"] = time.perf_counter() - inicio
+    resultado["eventos"] = coletor.eventos
+    resultado["tempos"] = eventos.exportar()
+    return resultado
+
 
+def transcrever_pasta(pasta, cache=None, jobs=1, em_ordem=False, backend="google", modelo=None,
+                      paralelo_chunks=1, sidecar=False, pasta_saida=None, eventos=None):
+    """
+    Transcreve todos os arquivos de áudio na pasta.
 
-def transcrever_pasta(pasta):
-    """Transcreve todos os arquivos de áudio na pasta."""
+    Com jobs > 1 os arquivos são distribuídos num pool de processos e os
+    resultados são mostrados à medida que ficam prontos (ou na ordem dos
+    arquivos, com em_ordem=True). Ao final mostra a vazão obtida.
+
+    O modelo do backend é carregado uma vez por processo, não por arquivo.
+
+    Com sidecar=True cada arquivo concluído ganha seus sidecars e entra no
+    manifesto da pasta de saída; uma nova execução pula esses arquivos e
+    retoma os interrompidos a partir do checkpoint.
+
+    eventos recebe início, chunks reconhecidos, arquivos concluídos, erros
+    e fim, além dos tempos por fase de todos os processos.
+    """
+    if eventos is None:
+        eventos = Eventos()
     if not os.path.isdir(pasta):
         print(f"Pasta não encontrada: {pasta}")
         return
-    arquivos = sorted(f for f in os.listdir(pasta) if os.path.isfile(os.path.join(pasta, f)))
-    audios = [f for f in arquivos if os.path.splitext(f)[1].lower() in FORMATOS_AUDIO]
-    if not audios:
+    entradas = sorted(
+        (e for e in varrer(pasta, seguir_links=True)
+         if e.eh_arquivo and os.path.splitext(e.nome)[1].lower() in FORMATOS_AUDIO),
+        key=lambda e: e.nome,
+    )
+    if not entradas:
         print(f"Nenhum arquivo de áudio encontrado na pasta: {pasta}")
         print("Formatos aceitos:", ", ".join(sorted(FORMATOS_AUDIO)))
         return
-    for i, nome in enumerate(audios, 1):
-        caminho = os.path.join(pasta, nome)
+
+    manifesto = None
+    if sidecar:
+        pasta_saida = pasta_saida or pasta
+        os.makedirs(pasta_saida, exist_ok=True)
+        manifesto = ManifestoTranscricao(pasta_saida)
+        feitos = [e for e in entradas if manifesto.concluido(e)]
+        if feitos:
+            print(f"Pulando {len(feitos)} arquivo(s) já transcrito(s) (manifesto em {pasta_saida})")
+            entradas = [e for e in entradas if not manifesto.concluido(e)]
+
+    total = len(entradas)
+    inicio = time.perf_counter()
+    contagem = {"ok": 0, "falhas": 0, "cache": 0, "segundos": 0.0}
+    eventos.emitir("inicio", ferramenta="transcricao", pasta=pasta, backend=backend,
+                   jobs=jobs, total=total, contar="arquivo_concluido")
+
+    def checkpoint(entrada):
+        return _caminho_saida(entrada.caminho, pasta_saida, SUFIXO_PARCIAL) if sidecar else None
+
+    def finalizar(entrada, resultado):
+        _registrar_resultado(resultado, cache, entrada.stat if cache is not None else None, backend)
+        contagem["ok" if resultado["ok"] else "falhas"] += 1
+        contagem["segundos"] += resultado["segundos"]
+        eventos.emitir("arquivo_concluido", arquivo=entrada.caminho, ok=resultado["ok"],
+                       completo=resultado["completo"], segundos=round(resultado["segundos"], 3))
+        gravar_saidas(entrada, resultado)
+
+    def gravar_saidas(entrada, resultado):
+        # Só o processo principal grava sidecars e manifesto
+        if manifesto is not None and resultado["completo"]:
+            _gravar_sidecars(entrada.caminho, pasta_saida, resultado, backend)
+            manifesto.registrar(entrada)
+
+    def cabecalho(i, nome):
         print()
-        print(f"--- [{i}/{len(audios)}] {nome} ---")
-        transcribe_audio(caminho)
+        print(f"--- [{i}/{total}] {nome} ---")
+
+    def concluir(i, entrada, resultado):
+        cabecalho(i, entrada.nome)
+        if resultado.get("saida"):
+            print(resultado["saida"], end="")
+        eventos.repassar(resultado.pop("eventos", ()))
+        eventos.somar_tempos(resultado.pop("tempos", {}))
+        finalizar(entrada, resultado)
+
+    # Arquivos inalterados já transcritos saem direto do cache, antes dos demais
+    pendentes = []
+    for i, entrada in enumerate(entradas, 1):
+        resultado = _resultado_do_cache(cache, entrada.stat, backend) if cache is not None else None
+        if resultado is None:
+            pendentes.append((i, entrada))
+        else:
+            cabecalho(i, entrada.nome)
+            _mostrar_transcricao(resultado["texto"], do_cache=True)
+            contagem["cache"] += 1
+            eventos.emitir("arquivo_concluido", arquivo=entrada.caminho, ok=True,
+                           completo=True, segundos=0.0, cache=True)
+            gravar_saidas(entrada, resultado)
+
+    if jobs <= 1:
+        for i, entrada in pendentes:
+            cabecalho(i, entrada.nome)
+            resultado = _transcrever(entrada.caminho, backend, modelo, paralelo_chunks,
+                                     checkpoint(entrada), eventos)
+            finalizar(entrada, resultado)
+    elif pendentes:
+        print(f"Transcrevendo {len(pendentes)} arquivo(s) com {jobs} processos...")
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_iniciar_worker,
+                                 initargs=(backend, modelo)) as executor:
+            futuros = {
+                executor.submit(_transcrever_isolado, e.caminho, backend, modelo, paralelo_chunks,
+                                checkpoint(e)): (i, e)
+                for i, e in pendentes
+            }
+            prontos = {}
+            proximo = 0
+            for futuro in as_completed(futuros):
+                i, entrada = futuros[futuro]
+                try:
+                    resultado = futuro.result()
+                except Exception as e:
+                    # Ex.: processo morto pelo sistema (BrokenProcessPool)
+                    resultado = _resultado(False)
+                    resultado["saida"] = f"Erro ao transcrever: {e}\n"
+                if not em_ordem:
+                    concluir(i, entrada, resultado)
+                    continue
+                # Em ordem: segura os resultados até chegar a vez de cada um
+                prontos[i] = (entrada, resultado)
+                while proximo < len(pendentes) and pendentes[proximo][0] in prontos:
+                    j = pendentes[proximo][0]
+                    concluir(j, *prontos.pop(j))
+                    proximo += 1
+
+    decorrido = time.perf_counter() - inicio
+    eventos.emitir("fim", ferramenta="transcricao", segundos=round(decorrido, 3),
+                   ok=contagem["ok"], falhas=contagem["falhas"], cache=contagem["cache"],
+                   segundos_audio=round(contagem["segundos"], 3))
     print()
     print("Concluído.")
+    print(f"  {contagem['ok']} ok, {contagem['falhas']} com falha, {contagem['cache']} do cache"
+          f" em {decorrido:.1f}s")
+    if decorrido > 0 and contagem["segundos"] > 0:
+        print(f"  {(contagem['ok'] + contagem['falhas']) / decorrido * 60:.1f} arquivos/min,"
+              f" {contagem['segundos'] / decorrido:.1f}x o tempo real do áudio")
 
 
 def _normalizar_alvo(alvo):
@@ -210,9 +1057,75 @@ def _normalizar_alvo(alvo):
     return alvo
 
 
-if __name__ == "__main__":
-    if len(sys.argv) >= 2:
-        alvo = sys.argv[1]
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Transcreve arquivos de áudio (ou uma pasta inteira)")
+    parser.add_argument("alvo", nargs="?", help="Arquivo ou pasta de áudio")
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=CACHE_PADRAO,
+        metavar="ARQUIVO",
+        help="Pular arquivos já transcritos que não mudaram (SQLite, padrão: %(const)s)",
+    )
+    parser.add_argument(
+        "--backend", "-b",
+        choices=sorted(BACKENDS),
+        default="google",
+        help="Motor de reconhecimento (padrão: google; vosk funciona offline)",
+    )
+    parser.add_argument(
+        "--modelo",
+        metavar="PASTA",
+        help="Modelo local para backends offline (ex.: pasta do modelo Vosk)",
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Transcrever N arquivos da pasta em paralelo (processos)",
+    )
+    parser.add_argument(
+        "--paralelo-chunks", "-p",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Reconhecer até N chunks de um mesmo arquivo ao mesmo tempo",
+    )
+    parser.add_argument(
+        "--em-ordem",
+        action="store_true",
+        help="Com --jobs, mostrar os resultados na ordem dos arquivos",
+    )
+    parser.add_argument(
+        "--sidecar",
+        action="store_true",
+        help="Gravar <arquivo>.transcricao.txt/.json e permitir retomar transcrições interrompidas",
+    )
+    parser.add_argument(
+        "--saida",
+        metavar="PASTA",
+        help="Pasta para os sidecars, checkpoints e manifesto (implica --sidecar; "
+             "útil em pastas somente leitura)",
+    )
+    parser.add_argument(
+        "--eventos",
+        metavar="ARQUIVO",
+        help="Gravar os eventos (início, chunks reconhecidos, arquivos concluídos, "
+             "erros, fim) em ARQUIVO, em JSON Lines",
+    )
+    parser.add_argument(
+        "--tempos",
+        action="store_true",
+        help="Mostrar ao final os tempos por fase (decode, recognize)",
+    )
+    args = parser.parse_args()
+    sidecar = args.sidecar or bool(args.saida)
+
+    if args.alvo:
+        alvo = args.alvo
     else:
         print("  --- Transcrição de áudio ---")
         print()
@@ -223,7 +1136,29 @@ if __name__ == "__main__":
 
     alvo = _normalizar_alvo(alvo)
 
-    if os.path.isdir(alvo):
-        transcrever_pasta(alvo)
-    else:
-        transcribe_audio(alvo)
+    cache = CacheMetadados(args.cache) if args.cache else None
+    # O texto transcrito continua indo para o terminal; os eventos só vão
+    # para o arquivo JSONL, se pedido
+    eventos = criar_eventos("silenciosa", args.eventos)
+    try:
+        if os.path.isdir(alvo):
+            transcrever_pasta(alvo, cache=cache, jobs=args.jobs, em_ordem=args.em_ordem,
+                              backend=args.backend, modelo=args.modelo,
+                              paralelo_chunks=args.paralelo_chunks,
+                              sidecar=sidecar, pasta_saida=args.saida, eventos=eventos)
+        else:
+            if args.saida:
+                os.makedirs(args.saida, exist_ok=True)
+            transcribe_audio(alvo, cache=cache, backend=args.backend, modelo=args.modelo,
+                             paralelo_chunks=args.paralelo_chunks,
+                             sidecar=sidecar, pasta_saida=args.saida, eventos=eventos)
+        if args.tempos:
+            eventos.mostrar_tempos()
+    finally:
+        eventos.fechar()
+        if cache is not None:
+            cache.fechar()
+
+
+if __name__ == "__main__":
+    main()
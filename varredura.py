@@ -0,0 +1,306 @@
+"""
+Camada de varredura de pastas compartilhada pelas ferramentas
+
+Baseada em os.scandir: o tipo de cada entrada (arquivo, pasta, link) vem
+do próprio diretório, sem syscall extra, e o stat só é feito quando alguém
+pede (e no máximo uma vez por entrada). A varredura é um gerador, então a
+memória usada não depende do tamanho da pasta.
+
+Exemplo de uso:
+    from varredura import varrer, varrer_arvore
+    for entrada in varrer("~/Downloads"):
+        if entrada.eh_arquivo:
+            print(entrada.nome, entrada.stat.st_size)
+
+    # Árvore inteira, só fotos, até 3 níveis
+    for entrada in varrer_arvore("~/Fotos", incluir=["*.jpg"], profundidade_max=3):
+        print(entrada.caminho)
+
+    # Árvore enorme em rede: várias pastas lidas ao mesmo tempo
+    for pasta in varrer_paralelo("/mnt/nas", workers=32):
+        print(pasta.caminho, len(pasta.arquivos))
+"""
+
+import os
+import queue
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class Entrada:
+    """Registro leve de um item encontrado na varredura"""
+
+    __slots__ = ("nome", "caminho", "eh_arquivo", "eh_dir", "eh_link",
+                 "_dir_entry", "_stat")
+
+    def __init__(self, dir_entry: os.DirEntry, seguir_links: bool = False):
+        self.nome = dir_entry.name
+        self.caminho = dir_entry.path
+        self.eh_link = dir_entry.is_symlink()
+        # Sem seguir links, um link nunca conta como arquivo ou pasta;
+        # seguindo, só os links custam um stat extra
+        self.eh_arquivo = dir_entry.is_file(follow_symlinks=seguir_links)
+        self.eh_dir = dir_entry.is_dir(follow_symlinks=seguir_links)
+        self._dir_entry = dir_entry
+        self._stat: Optional[os.stat_result] = None
+
+    @classmethod
+    def de_stat(cls, caminho: str, st: os.stat_result) -> "Entrada":
+        """Entrada de um caminho conhecido sem varredura (ex.: evento do sistema), a partir do lstat"""
+        entrada = cls.__new__(cls)
+        entrada.nome = os.path.basename(caminho)
+        entrada.caminho = caminho
+        entrada.eh_link = stat.S_ISLNK(st.st_mode)
+        entrada.eh_arquivo = stat.S_ISREG(st.st_mode)
+        entrada.eh_dir = stat.S_ISDIR(st.st_mode)
+        entrada._dir_entry = None
+        entrada._stat = st
+        return entrada
+
+    @property
+    def stat(self) -> os.stat_result:
+        """stat da entrada (sem seguir links), obtido uma única vez"""
+        if self._stat is None:
+            self._stat = self._dir_entry.stat(follow_symlinks=False)
+        return self._stat
+
+    @property
+    def tamanho(self) -> int:
+        return self.stat.st_size
+
+    def __fspath__(self) -> str:
+        return self.caminho
+
+    def __repr__(self) -> str:
+        return f"Entrada({self.caminho!r})"
+
+
+def varrer(caminho, seguir_links: bool = False) -> Iterator[Entrada]:
+    """
+    Percorre as entradas diretas de uma pasta
+
+    Args:
+        caminho: Pasta a ser varrida (str ou Path; '~' é expandido)
+        seguir_links: Se True, links para arquivos/pastas contam como tal
+
+    Yields:
+        Entrada para cada item da pasta, na ordem do sistema de arquivos
+
+    Raises:
+        OSError: se a pasta não puder ser aberta (PermissionError etc.)
+    """
+    with os.scandir(os.path.expanduser(os.fspath(caminho))) as it:
+        for dir_entry in it:
+            yield Entrada(dir_entry, seguir_links)
+
+
+def _casa(padroes: Sequence[str], nome: str, relativo: str) -> bool:
+    """Verifica se o nome ou o caminho relativo casa com algum glob"""
+    return any(fnmatch(nome, p) or fnmatch(relativo, p) for p in padroes)
+
+
+def varrer_arvore(caminho,
+                  profundidade_max: Optional[int] = None,
+                  incluir: Optional[Sequence[str]] = None,
+                  excluir: Optional[Sequence[str]] = None,
+                  ignorar_pasta: Optional[Callable[[Entrada], bool]] = None,
+                  seguir_links: bool = False) -> Iterator[Entrada]:
+    """
+    Percorre recursivamente uma árvore de pastas
+
+    A travessia é iterativa (pilha de iteradores scandir abertos, um por
+    nível), então a memória cresce com a profundidade da árvore e não com
+    o número de entradas. Pastas não são devolvidas, apenas percorridas.
+
+    Args:
+        caminho: Pasta raiz
+        profundidade_max: Níveis abaixo da raiz a percorrer (None = todos,
+                          0 = só a raiz)
+        incluir: Globs de arquivos a devolver (nome ou caminho relativo);
+                 None devolve todos
+        excluir: Globs de arquivos e pastas a pular
+        ignorar_pasta: Função que recebe a Entrada de uma pasta e devolve
+                       True para não descer nela
+        seguir_links: Se True, links para arquivos/pastas contam como tal
+                      (cuidado com ciclos)
+
+    Yields:
+        Entrada de cada item que não é pasta (arquivos, links etc.)
+
+    Raises:
+        OSError: se a pasta raiz não puder ser aberta; erros em subpastas
+                 são ignorados para não interromper a varredura
+    """
+    raiz = os.path.expanduser(os.fspath(caminho))
+    excluir = excluir or ()
+    pilha = [(os.scandir(raiz), 0)]
+    try:
+        while pilha:
+            it, profundidade = pilha[-1]
+            try:
+                dir_entry = next(it, None)
+            except OSError:
+                dir_entry = None
+            if dir_entry is None:
+                it.close()
+                pilha.pop()
+                continue
+
+            entrada = Entrada(dir_entry, seguir_links)
+            relativo = os.path.relpath(entrada.caminho, raiz)
+            if _casa(excluir, entrada.nome, relativo):
+                continue
+
+            if entrada.eh_dir:
+                if profundidade_max is not None and profundidade >= profundidade_max:
+                    continue
+                if ignorar_pasta is not None and ignorar_pasta(entrada):
+                    continue
+                try:
+                    pilha.append((os.scandir(entrada.caminho), profundidade + 1))
+                except OSError:
+                    continue
+            elif incluir is None or _casa(incluir, entrada.nome, relativo):
+                yield entrada
+    finally:
+        for it, _ in pilha:
+            it.close()
+
+
+class PastaVarrida:
+    """Resultado da leitura de uma pasta em varrer_paralelo"""
+
+    __slots__ = ("caminho", "profundidade", "arquivos", "subpastas", "erro")
+
+    def __init__(self, caminho: str, profundidade: int):
+        self.caminho = caminho
+        self.profundidade = profundidade
+        self.arquivos: List[Entrada] = []   # tudo que não é pasta
+        self.subpastas = 0                  # subpastas enfileiradas para leitura
+        self.erro: Optional[OSError] = None
+
+    def __repr__(self) -> str:
+        return f"PastaVarrida({self.caminho!r}, {len(self.arquivos)} arquivo(s))"
+
+
+def varrer_paralelo(caminho,
+                    workers: int = 16,
+                    profundidade_max: Optional[int] = None,
+                    excluir: Optional[Sequence[str]] = None,
+                    com_stat: bool = True,
+                    eventos=None) -> Iterator[PastaVarrida]:
+    """
+    Percorre uma árvore lendo várias pastas ao mesmo tempo
+
+    Cada pasta é uma tarefa de um pool de threads: quem termina de ler uma
+    pasta já enfileira as subpastas encontradas, e qualquer thread livre
+    pega a próxima. Assim o gargalo passa a ser o número de operações por
+    segundo do armazenamento (importante em compartilhamentos de rede), e
+    não uma única thread esperando cada scandir.
+
+    Links nunca são seguidos (não há risco de ciclos).
+
+    Args:
+        caminho: Pasta raiz
+        workers: Threads lendo pastas ao mesmo tempo
+        profundidade_max: Níveis abaixo da raiz a percorrer (None = todos)
+        excluir: Globs de arquivos e pastas a pular (nome ou caminho relativo)
+        com_stat: Se True, o stat de cada arquivo é feito na própria thread
+                  de leitura (Entrada.stat já vem pronto)
+        eventos: Eventos opcional; o tempo de leitura de cada pasta (com
+                 os stats, se pedidos) vai para a fase "scandir"
+
+    Yields:
+        PastaVarrida de cada pasta, na ordem em que a leitura termina
+        (a raiz primeiro); pastas ilegíveis vêm com erro preenchido
+
+    Raises:
+        OSError: se a pasta raiz não puder ser aberta
+    """
+    raiz = os.path.expanduser(os.fspath(caminho))
+    excluir = excluir or ()
+    os.scandir(raiz).close()  # erro na raiz sobe para quem chamou
+
+    def ler(caminho_pasta: str, profundidade: int):
+        inicio = time.perf_counter()
+        pasta = PastaVarrida(caminho_pasta, profundidade)
+        subpastas = []
+        try:
+            with os.scandir(caminho_pasta) as it:
+                for dir_entry in it:
+                    entrada = Entrada(dir_entry)
+                    if excluir and _casa(excluir, entrada.nome,
+                                         os.path.relpath(entrada.caminho, raiz)):
+                        continue
+                    if not entrada.eh_dir:
+                        if com_stat:
+                            entrada.stat
+                        pasta.arquivos.append(entrada)
+                    elif profundidade_max is None or profundidade < profundidade_max:
+                        subpastas.append(entrada.caminho)
+        except OSError as e:
+            pasta.erro = e
+        pasta.subpastas = len(subpastas)
+        if eventos is not None:
+            eventos.registrar_tempo("scandir", time.perf_counter() - inicio)
+        return pasta, subpastas
+
+    return percorrer_paralelo(raiz, ler, workers)
+
+
+def percorrer_paralelo(raiz: str,
+                       ler: Callable[[str, int], Tuple[T, Sequence[str]]],
+                       workers: int = 16) -> Iterator[T]:
+    """
+    Motor de varredura paralela: aplica ler a cada pasta da árvore
+
+    ler(caminho, profundidade) roda numa thread do pool e devolve
+    (resultado, subpastas): as subpastas devolvidas entram na fila e
+    qualquer thread livre pega a próxima. Os resultados são entregues ao
+    chamador (na thread dele) na ordem em que ficam prontos.
+
+    Se ler levantar uma exceção, ela é levantada de novo para o chamador.
+    """
+    prontas: "queue.Queue" = queue.Queue()
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    # Pastas enfileiradas e ainda não entregues; uma subpasta é contada
+    # antes de a pasta-mãe ser entregue, então zero significa fim da árvore
+    trava = threading.Lock()
+    pendentes = [1]
+
+    def tarefa(caminho_pasta: str, profundidade: int):
+        try:
+            resultado, subpastas = ler(caminho_pasta, profundidade)
+            for sub in subpastas:
+                with trava:
+                    pendentes[0] += 1
+                executor.submit(tarefa, sub, profundidade + 1)
+        except BaseException as e:  # nunca deixar o consumidor esperando
+            prontas.put((None, e))
+            return
+        prontas.put((resultado, None))
+
+    def gerar():
+        try:
+            executor.submit(tarefa, raiz, 0)
+            while True:
+                resultado, erro = prontas.get()
+                if erro is not None:
+                    raise erro
+                with trava:
+                    pendentes[0] -= 1
+                    fim = pendentes[0] == 0
+                yield resultado
+                if fim:
+                    break
+        finally:
+            # Interrompido no meio: descarta as pastas ainda não lidas
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    return gerar()
@@ -0,0 +1,319 @@
+"""
+Modo vigia: organiza continuamente uma pasta de entrada
+
+Em vez de rodar o organizador pelo cron e varrer a pasta inteira a cada
+execução, o vigia fica esperando eventos do sistema de arquivos e só
+olha os arquivos que mudaram. No Linux usa inotify (via ctypes, sem
+dependências); nos demais sistemas, ou com sondagem=True (necessário em
+compartilhamentos de rede, onde o inotify não vê alterações feitas por
+outras máquinas), confere o mtime da pasta a cada intervalo e só relista
+a pasta quando ele muda.
+
+Um arquivo só é organizado depois que o tamanho e o mtime ficam parados
+por `espera` segundos (ainda pode estar sendo copiado ou baixado).
+Arquivos prontos são organizados em lotes, com o mesmo planejar() e
+executar_plano() do modo normal. Parado, o vigia não gasta CPU nem I/O.
+
+Só os arquivos da própria pasta são vigiados: subpastas (incluindo as
+pastas de data geradas e backup_*) ficam de fora.
+
+Exemplo de uso:
+    from Organizador_LLM import Organizador
+    from vigia import VigiaPasta
+    vigia = VigiaPasta(Organizador(), "~/Entrada", formato="%Y-%m", espera=2)
+    vigia.executar()   # até Ctrl+C (ou até o Event `parar` ser marcado)
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import stat
+import struct
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from varredura import Entrada, varrer
+
+# Máscaras do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_MASCARA = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+            | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENTO = struct.Struct("iIII")
+
+# Arquivos temporários de navegadores e programas de cópia
+SUFIXOS_TEMPORARIOS = (".part", ".partial", ".crdownload", ".download", ".tmp", ".swp")
+
+Assinatura = Tuple[int, int]  # (tamanho, mtime_ns)
+
+
+class _FonteInotify:
+    """Eventos da pasta via inotify; ler() devolve os nomes que mudaram"""
+
+    def __init__(self, pasta: str):
+        nome_libc = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(nome_libc, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify indisponível")
+        # IN_NONBLOCK e IN_CLOEXEC têm os mesmos valores de O_NONBLOCK e O_CLOEXEC
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            erro = ctypes.get_errno()
+            raise OSError(erro, os.strerror(erro))
+        if libc.inotify_add_watch(self._fd, os.fsencode(pasta), _MASCARA) < 0:
+            erro = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(erro, os.strerror(erro), pasta)
+        self.descricao = "inotify"
+
+    def ler(self, timeout: Optional[float]) -> Optional[List[str]]:
+        """
+        Espera até timeout segundos (None = sem limite) por eventos
+
+        Returns:
+            Nomes (sem repetição) com alguma alteração, ou None se eventos
+            foram perdidos (fila do kernel cheia) e a pasta deve ser relida
+
+        Raises:
+            FileNotFoundError: se a pasta vigiada foi removida ou movida
+        """
+        prontos, _, _ = select.select([self._fd], [], [], timeout)
+        if not prontos:
+            return []
+        try:
+            dados = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        nomes = {}
+        posicao = 0
+        while posicao < len(dados):
+            _, mascara, _, tamanho = _EVENTO.unpack_from(dados, posicao)
+            posicao += _EVENTO.size
+            nome = dados[posicao:posicao + tamanho].rstrip(b"\0")
+            posicao += tamanho
+            if mascara & IN_Q_OVERFLOW:
+                return None
+            if mascara & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED):
+                raise FileNotFoundError("a pasta vigiada foi removida ou movida")
+            if nome and not mascara & IN_ISDIR:
+                nomes[os.fsdecode(nome)] = None
+        return list(nomes)
+
+    def fechar(self):
+        os.close(self._fd)
+
+
+class _FonteSondagem:
+    """
+    Alternativa ao inotify: confere o mtime da pasta a cada `intervalo`
+
+    A pasta só é relistada quando o mtime dela muda (arquivo criado,
+    renomeado ou removido); alterações dentro de arquivos já conhecidos
+    são vistas pela conferência de estabilidade do vigia.
+    """
+
+    def __init__(self, pasta: str, intervalo: float, parar: Optional[threading.Event]):
+        self.pasta = pasta
+        self.intervalo = intervalo
+        self.descricao = f"sondagem a cada {intervalo:g}s"
+        self._parar = parar or threading.Event()
+        self._mtime_ns: Optional[int] = None
+        self._proxima = 0.0
+
+    def ler(self, timeout: Optional[float]) -> Optional[List[str]]:
+        espera = max(0.0, self._proxima - time.monotonic())
+        if timeout is not None and timeout < espera:
+            self._parar.wait(timeout)
+            return []
+        self._parar.wait(espera)
+        self._proxima = time.monotonic() + self.intervalo
+        st = os.stat(self.pasta)
+        # Mtime muito recente: outra criação no mesmo instante não mudaria
+        # o valor, então a pasta é relida de novo na próxima vez
+        recente = time.time() - st.st_mtime < 2
+        if st.st_mtime_ns == self._mtime_ns and not recente:
+            return []
+        self._mtime_ns = st.st_mtime_ns
+        return [e.nome for e in varrer(self.pasta) if not e.eh_dir]
+
+    def fechar(self):
+        pass
+
+
+class VigiaPasta:
+    """Organiza os arquivos que chegam numa pasta, em lotes, à medida que ficam prontos"""
+
+    def __init__(self,
+                 organizador,
+                 pasta: str,
+                 criterio: str = "modificacao",
+                 formato: str = "%Y-%m",
+                 backup: bool = False,
+                 workers: int = 1,
+                 espera: float = 2.0,
+                 lote: int = 1000,
+                 sondagem: bool = False,
+                 intervalo: float = 1.0):
+        """
+        Args:
+            organizador: Organizador usado para planejar e mover cada lote
+            pasta: Pasta de entrada vigiada
+            criterio: "modificacao", "criacao", "acesso", "exif", "video",
+                      "audio" ou "midia"
+            formato: Formato strftime das pastas de data
+            backup: Se True, cada lote ganha sua pasta backup_*
+            workers: Threads para stat/cópia/movimentação de cada lote
+            espera: Segundos sem mudança de tamanho/mtime para um arquivo
+                    ser considerado pronto
+            lote: Máximo de arquivos organizados de uma vez
+            sondagem: Se True, não usa inotify (ex.: pastas em rede)
+            intervalo: Segundos entre conferências no modo sondagem
+        """
+        self.org = organizador
+        self.pasta = os.path.abspath(os.path.expanduser(pasta))
+        self.criterio = criterio
+        self.formato = formato
+        self.backup = backup
+        self.workers = workers
+        self.espera = espera
+        self.lote = max(1, lote)
+        self.sondagem = sondagem
+        self.intervalo = intervalo
+        self.totais: Dict[str, int] = {}
+        self.lotes = 0
+        # Caminho -> (assinatura, instante da última mudança); a ordem de
+        # inserção é a ordem dos prazos, pois quem muda volta para o fim
+        self._pendentes: Dict[str, Tuple[Assinatura, float]] = {}
+        # Arquivos que já foram tentados e ficaram (erro): só voltam se mudarem
+        self._tentados: Dict[str, Assinatura] = {}
+
+    def _abrir_fonte(self, parar: Optional[threading.Event]):
+        if not self.sondagem:
+            try:
+                return _FonteInotify(self.pasta)
+            except (OSError, AttributeError):
+                pass
+        return _FonteSondagem(self.pasta, self.intervalo, parar)
+
+    def executar(self, parar: Optional[threading.Event] = None) -> Dict[str, int]:
+        """
+        Vigia a pasta até KeyboardInterrupt ou até `parar` ser marcado
+
+        Os arquivos que já estão na pasta entram como se tivessem acabado
+        de chegar. As estatísticas somadas de todos os lotes ficam em
+        self.totais (e são devolvidas ao parar).
+        """
+        if not os.path.isdir(self.pasta):
+            raise FileNotFoundError(f"Pasta não encontrada: {self.pasta}")
+        fonte = self._abrir_fonte(parar)
+        print(f"👁️ Vigiando {self.pasta} ({fonte.descricao}); Ctrl+C para parar")
+        try:
+            self._notar_pasta()
+            while parar is None or not parar.is_set():
+                timeout = self._proximo_prazo()
+                if parar is not None:
+                    timeout = 0.5 if timeout is None else min(timeout, 0.5)
+                nomes = fonte.ler(timeout)
+                if nomes is None:
+                    self._notar_pasta()
+                else:
+                    for nome in nomes:
+                        self._notar(os.path.join(self.pasta, nome))
+                prontos = self._prontos()
+                for inicio in range(0, len(prontos), self.lote):
+                    self._organizar(prontos[inicio:inicio + self.lote])
+        finally:
+            fonte.fechar()
+        return self.totais
+
+    def _notar_pasta(self):
+        """Confere todos os arquivos da pasta (início ou eventos perdidos)"""
+        for entrada in varrer(self.pasta):
+            if entrada.eh_arquivo:
+                self._notar(entrada.caminho, entrada.stat)
+
+    def _notar(self, caminho: str, st: Optional[os.stat_result] = None):
+        """Registra um arquivo que pode ter mudado; o prazo recomeça se mudou"""
+        nome = os.path.basename(caminho)
+        if nome.startswith(".") or nome.lower().endswith(SUFIXOS_TEMPORARIOS):
+            return
+        try:
+            st = st or os.lstat(caminho)
+        except FileNotFoundError:
+            self._pendentes.pop(caminho, None)
+            return
+        if not stat.S_ISREG(st.st_mode):
+            self._pendentes.pop(caminho, None)
+            return
+        assinatura = (st.st_size, st.st_mtime_ns)
+        pendente = self._pendentes.get(caminho)
+        if pendente is not None and pendente[0] == assinatura:
+            return
+        if pendente is None and self._tentados.get(caminho) == assinatura:
+            return
+        self._tentados.pop(caminho, None)
+        self._pendentes.pop(caminho, None)
+        self._pendentes[caminho] = (assinatura, time.monotonic())
+
+    def _proximo_prazo(self) -> Optional[float]:
+        """Segundos até o próximo arquivo poder ficar pronto (None = nenhum)"""
+        for _, desde in self._pendentes.values():
+            return max(0.0, desde + self.espera - time.monotonic())
+        return None
+
+    def _prontos(self) -> List[Entrada]:
+        """Tira dos pendentes os arquivos parados há pelo menos `espera` segundos"""
+        agora = time.monotonic()
+        vencidos = []
+        for caminho, (assinatura, desde) in self._pendentes.items():
+            if agora - desde < self.espera:
+                break
+            vencidos.append((caminho, assinatura))
+        prontos = []
+        mudaram = []
+        for caminho, assinatura in vencidos:
+            del self._pendentes[caminho]
+            try:
+                st = os.lstat(caminho)
+            except FileNotFoundError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            if (st.st_size, st.st_mtime_ns) != assinatura:
+                mudaram.append((caminho, st))
+                continue
+            prontos.append(Entrada.de_stat(caminho, st))
+        # Mudou sem gerar evento (ex.: escrita por outra máquina): novo prazo
+        for caminho, st in mudaram:
+            self._notar(caminho, st)
+        return prontos
+
+    def _organizar(self, entradas: List[Entrada]):
+        """Planeja e executa um lote; arquivos que ficaram só voltam se mudarem"""
+        plano = self.org.planejar(self.pasta, self.criterio, self.formato,
+                                  workers=self.workers, mostrar=False, entradas=entradas)
+        if plano is None:
+            return
+        stats = self.org.executar_plano(plano, backup=self.backup, workers=self.workers)
+        self.lotes += 1
+        for chave, valor in stats.items():
+            if isinstance(valor, int):
+                self.totais[chave] = self.totais.get(chave, 0) + valor
+        for entrada in entradas:
+            try:
+                st = os.lstat(entrada.caminho)
+            except FileNotFoundError:
+                continue
+            self._tentados[entrada.caminho] = (st.st_size, st.st_mtime_ns)